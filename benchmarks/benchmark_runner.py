@@ -0,0 +1,219 @@
+import os
+import sys
+import json
+import time
+import platform
+import resource
+import itertools
+import subprocess
+import multiprocessing as _mp
+from queue import Empty as _Empty
+from sqlalchemy import text
+from benchmarks.data_generator import DataGenerator
+from src.utils.log.log_utils import LogUtils
+from src.utils.metrics.metrics_sinks import MetricsSink
+from src.utils.table.table_manager import TableManager
+from src.connection.postgres_connection_factory import PostgresConnectionFactory
+from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread
+
+
+TARGET_TABLE = 'bench_target'
+
+
+class _CaptureSink(MetricsSink):
+    def __init__(self) -> None:
+        self.summary = None
+
+    def export(self, summary: dict) -> None:
+        self.summary = summary
+
+
+def _peak_rss_bytes(who: int) -> int:
+    peak = resource.getrusage(who).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _run_case(case: dict, conn_id: str, file_path: str, results) -> None:
+    """
+    Run one benchmark case in a fresh process, so its peak RSS is not inflated by previous cases, and send back its measurements.
+    """
+    engine = PostgresConnectionFactory().create_engine_by_file(conn_id=conn_id, file_path=file_path)
+    sink = _CaptureSink()
+    stage = StageCopyTableMultiThread(
+        table_name_source=case['source'],
+        table_name_target=case['target'],
+        conn_input=engine,
+        conn_output=engine,
+        log_utils=LogUtils(),
+        table_manager=TableManager(),
+        chunksize=case['chunksize'],
+        consumers=case['consumers'],
+        monitor_buffer_size=case['monitor_buffer_size'],
+        load_strategy=case['load_strategy'],
+        backend=case['backend'],
+        metrics_sinks=[sink]
+    )
+
+    result = {'status': 'ok', 'error': None}
+    start = time.perf_counter()
+    try:
+        stage.run()
+    except Exception as e:
+        result.update(status='failed', error=repr(e))
+    result['seconds'] = time.perf_counter() - start
+
+    with engine.connect() as conn:
+        result['rows_loaded'] = conn.execute(text(f"SELECT count(*) FROM {case['target']}")).scalar()
+    engine.dispose()
+
+    result['peak_rss_bytes'] = _peak_rss_bytes(resource.RUSAGE_SELF)
+    result['peak_children_rss_bytes'] = _peak_rss_bytes(resource.RUSAGE_CHILDREN)
+    if sink.summary is not None:
+        result['bottleneck'] = sink.summary['bottleneck']
+        result['roles'] = sink.summary['roles']
+        result['latency_seconds'] = {
+            name: {k: v for k, v in histogram.items() if k != 'buckets'}
+            for name, histogram in sink.summary['latency_seconds'].items()
+        }
+    results.put(result)
+
+
+class BenchmarkRunner:
+    def __init__(self, conn_id: str, file_path: str, output_path: str, log_utils: LogUtils = None) -> None:
+        """
+        Initialize a runner that sweeps pipeline settings over synthetic tables and writes a machine-readable report.
+
+        Every case copies a generated source table into an empty target with StageCopyTableMultiThread, in its own process, and records its duration, rows/s, peak RSS and the pipeline metrics summary.
+
+        Parameters:
+            conn_id (str): Connection id of the benchmark database in the connections file, e.g. the postgres_compose.yml service.
+            file_path (str): Path to the JSON connections file.
+            output_path (str): Path of the JSON report. It is rewritten after every case, so an interrupted sweep keeps its results.
+            log_utils (LogUtils, optional): Logging utilities. Defaults to a new LogUtils.
+        """
+        self._conn_id = conn_id
+        self._file_path = file_path
+        self._output_path = output_path
+        self._log_utils = log_utils or LogUtils()
+        self._logger = self._log_utils.get_logger(__name__)
+        self._engine = PostgresConnectionFactory().create_engine_by_file(conn_id=conn_id, file_path=file_path)
+        self._generator = DataGenerator(self._engine)
+
+    def _environment(self) -> dict:
+        try:
+            commit = subprocess.run(
+                ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        with self._engine.connect() as conn:
+            server_version = conn.execute(text("SHOW server_version")).scalar()
+
+        return {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'postgres': server_version,
+            'commit': commit,
+        }
+
+    def _write_report(self, report: dict) -> None:
+        directory = os.path.dirname(self._output_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{self._output_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(report, f, indent=2)
+        os.replace(tmp_path, self._output_path)
+
+    def _run_in_process(self, context, case: dict) -> dict:
+        results = context.Queue()
+        process = context.Process(target=_run_case, args=(case, self._conn_id, self._file_path, results))
+        process.start()
+        try:
+            while True:
+                try:
+                    result = results.get(timeout=1)
+                    break
+                except _Empty:
+                    if not process.is_alive():
+                        result = {
+                            'status': 'failed', 'error': f'benchmark process exited with code {process.exitcode}',
+                            'seconds': None, 'rows_loaded': None, 'peak_rss_bytes': None, 'peak_children_rss_bytes': None
+                        }
+                        break
+        except KeyboardInterrupt:
+            process.terminate()
+            raise
+        process.join()
+
+        return result
+
+    def sweep(
+        self,
+        shapes: list[str],
+        rows: list[int],
+        chunksizes: list[int],
+        consumers: list[int],
+        monitor_buffer_sizes: list[int],
+        load_strategies: list[str],
+        backend: str = 'thread',
+        repeat: int = 1
+    ) -> dict:
+        """
+        Run every combination of the given settings and write the report.
+
+        Parameters:
+            shapes (list[str]): Table shapes generated by DataGenerator.
+            rows (list[int]): Row counts of the source tables.
+            chunksizes (list[int]): Values of chunksize.
+            consumers (list[int]): Values of consumers.
+            monitor_buffer_sizes (list[int]): Values of monitor_buffer_size.
+            load_strategies (list[str]): Load strategies, e.g. 'insert', 'copy_csv', 'copy_binary'.
+            backend (str, optional): Consumer backend of every case. Defaults to 'thread'.
+            repeat (int, optional): Number of runs of each case. Defaults to 1.
+
+        Returns:
+            dict: The report, with the environment and one entry per run.
+        """
+        report = {'environment': self._environment(), 'started_at': time.time(), 'cases': []}
+        context = _mp.get_context('spawn')
+
+        for shape, row_count in itertools.product(shapes, rows):
+            self._logger.info(f'generating {shape} table with {row_count} rows')
+            source = self._generator.create_table(shape, row_count)
+
+            for chunksize, consumer_count, buffer_size, strategy, run in itertools.product(
+                chunksizes, consumers, monitor_buffer_sizes, load_strategies, range(repeat)
+            ):
+                case = {
+                    'shape': shape,
+                    'rows': row_count,
+                    'chunksize': chunksize,
+                    'consumers': consumer_count,
+                    'monitor_buffer_size': buffer_size,
+                    'load_strategy': strategy,
+                    'backend': backend,
+                    'run': run,
+                    'source': source,
+                    'target': self._generator.create_target(source, TARGET_TABLE),
+                }
+                self._logger.info(f'running case {case}')
+
+                result = self._run_in_process(context, case)
+
+                if result['status'] == 'ok' and result['rows_loaded'] != row_count:
+                    result.update(status='failed', error=f"loaded {result['rows_loaded']} of {row_count} rows")
+                result['rows_per_second'] = row_count / result['seconds'] if result['status'] == 'ok' else None
+
+                report['cases'].append({**case, **result})
+                self._write_report(report)
+                self._logger.info(
+                    f"{result['status']}: {result['rows_per_second'] or 0:.0f} rows/s, "
+                    f"peak rss {(result['peak_rss_bytes'] or 0) / 2 ** 20:.0f} MiB"
+                )
+
+        report['finished_at'] = time.time()
+        self._write_report(report)
+
+        return report
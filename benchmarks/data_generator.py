@@ -0,0 +1,117 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine as _Engine
+
+
+WIDE_COLUMNS = 48
+
+
+def _wide_columns() -> list[tuple[str, str, str]]:
+    columns = []
+    for i in range(WIDE_COLUMNS):
+        kind = i % 4
+        if kind == 0:
+            columns.append((f"c{i}", "integer", "(random() * 1000000)::integer"))
+        elif kind == 1:
+            columns.append((f"c{i}", "double precision", "random() * 1000"))
+        elif kind == 2:
+            columns.append((f"c{i}", "varchar(16)", "substr(md5(random()::text), 1, 16)"))
+        else:
+            columns.append((f"c{i}", "boolean", "random() < 0.5"))
+    return columns
+
+
+TABLE_SHAPES: dict[str, list[tuple[str, str, str]]] = {
+    'narrow': [
+        ("value", "integer", "(random() * 1000000)::integer"),
+        ("created_at", "timestamp", "timestamp '2020-01-01' + random() * interval '1000 days'"),
+    ],
+    'wide': _wide_columns(),
+    'text_heavy': [
+        ("title", "varchar(255)", "substr(repeat(md5(random()::text), 4), 1, 96)"),
+        ("body", "text", "repeat(md5(random()::text), 16)"),
+        ("tags", "text", "md5(random()::text) || ',' || md5(random()::text)"),
+        ("notes", "text", "CASE WHEN random() < 0.2 THEN NULL ELSE repeat(md5(random()::text), 4) END"),
+    ],
+    'numeric_heavy': [
+        (f"n{i}", column_type, expression)
+        for i, (column_type, expression) in enumerate([
+            ("bigint", "(random() * 1e12)::bigint"),
+            ("integer", "(random() * 1e6)::integer"),
+            ("smallint", "(random() * 1000)::smallint"),
+            ("double precision", "random() * 1e6"),
+            ("real", "(random() * 1e3)::real"),
+            ("numeric(18, 4)", "(random() * 1e9)::numeric(18, 4)"),
+        ] * 4)
+    ],
+}
+
+
+class DataGenerator:
+    def __init__(self, engine: _Engine, schema: str = 'public') -> None:
+        """
+        Initialize a generator of synthetic source tables for the benchmarks.
+
+        Rows are generated server-side with generate_series, so large tables are created without moving data through the client. The random generator is seeded, so a table of a given shape and size has the same content on every run.
+
+        Parameters:
+            engine (_Engine): Engine of the benchmark database.
+            schema (str, optional): Schema the tables are created in. Defaults to 'public'.
+        """
+        self._engine = engine
+        self._schema = schema
+
+    def table_name(self, shape: str, rows: int) -> str:
+        return f"bench_{shape}_{rows}"
+
+    def create_table(self, shape: str, rows: int, seed: float = 0.42, replace: bool = False) -> str:
+        """
+        Create and fill a source table of the given shape, reusing it when it already holds the requested number of rows.
+
+        Parameters:
+            shape (str): One of TABLE_SHAPES: 'narrow', 'wide', 'text_heavy' or 'numeric_heavy'.
+            rows (int): Number of rows of the table.
+            seed (float, optional): Seed of the server random generator, between -1 and 1. Defaults to 0.42.
+            replace (bool, optional): Recreate the table even if it already exists. Defaults to False.
+
+        Returns:
+            str: Qualified name of the source table.
+
+        Raises:
+            ValueError: If the shape is unknown.
+        """
+        if shape not in TABLE_SHAPES:
+            raise ValueError(f"Invalid table shape {shape}. Use one of {', '.join(TABLE_SHAPES)}.")
+
+        table = f"{self._schema}.{self.table_name(shape, rows)}"
+        columns = TABLE_SHAPES[shape]
+
+        with self._engine.begin() as conn:
+            exists = conn.execute(text("SELECT to_regclass(:table)"), {"table": table}).scalar()
+            if exists and not replace:
+                if conn.execute(text(f"SELECT count(*) FROM {table}")).scalar() == rows:
+                    return table
+
+            definitions = ", ".join(f"{name} {column_type}" for name, column_type, _ in columns)
+            expressions = ", ".join(expression for _, _, expression in columns)
+
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            conn.execute(text(f"CREATE TABLE {table} (id bigint PRIMARY KEY, {definitions})"))
+            conn.execute(text("SELECT setseed(:seed)"), {"seed": seed})
+            conn.execute(text(f"INSERT INTO {table} SELECT g, {expressions} FROM generate_series(1, {int(rows)}) AS g"))
+            conn.execute(text(f"ANALYZE {table}"))
+
+        return table
+
+    def create_target(self, source: str, target: str) -> str:
+        """
+        Recreate an empty target table with the columns of a source table and no indexes.
+
+        Returns:
+            str: Qualified name of the target table.
+        """
+        target = f"{self._schema}.{target}"
+        with self._engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {target}"))
+            conn.execute(text(f"CREATE TABLE {target} (LIKE {source} INCLUDING DEFAULTS)"))
+
+        return target
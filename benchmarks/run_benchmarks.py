@@ -0,0 +1,53 @@
+import argparse
+from benchmarks.data_generator import TABLE_SHAPES
+from benchmarks.benchmark_runner import BenchmarkRunner
+from src.workers.sqlalchemy_consumer import LOAD_STRATEGIES
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    """
+    Parse the settings swept by the benchmark. Every option takes one or more values and every combination is run.
+    """
+    parser = argparse.ArgumentParser(description="Sweep pipeline settings over synthetic tables and report rows/s and peak RSS.")
+    parser.add_argument('--conn-id', default='dbdw', help="Connection id of the benchmark database (default: the postgres_compose.yml service).")
+    parser.add_argument('--conn-file', default='src/resources/postgres_connections.json')
+    parser.add_argument('--output', default='benchmarks/results/report.json')
+    parser.add_argument('--shapes', nargs='+', default=['narrow', 'wide'], choices=list(TABLE_SHAPES))
+    parser.add_argument('--rows', nargs='+', type=int, default=[100000])
+    parser.add_argument('--chunksize', nargs='+', type=int, default=[10000, 40000])
+    parser.add_argument('--consumers', nargs='+', type=int, default=[2, 5])
+    parser.add_argument('--monitor-buffer-size', nargs='+', type=int, default=[10])
+    parser.add_argument('--load-strategy', nargs='+', default=['insert', 'copy_binary'], choices=[s for s in LOAD_STRATEGIES if s != 'upsert'])
+    parser.add_argument('--backend', default='thread', choices=['thread', 'process'])
+    parser.add_argument('--repeat', type=int, default=1)
+
+    return parser.parse_args(argv)
+
+
+def main():
+    """
+    Run the benchmark sweep against a local PostgreSQL and write the JSON report.
+
+    Start the database with `docker compose -f postgres_compose.yml up -d`, then run `python -m benchmarks.run_benchmarks` from the repository root.
+    """
+    args = parse_args()
+
+    runner = BenchmarkRunner(
+        conn_id=args.conn_id,
+        file_path=args.conn_file,
+        output_path=args.output
+    )
+
+    runner.sweep(
+        shapes=args.shapes,
+        rows=args.rows,
+        chunksizes=args.chunksize,
+        consumers=args.consumers,
+        monitor_buffer_sizes=args.monitor_buffer_size,
+        load_strategies=args.load_strategy,
+        backend=args.backend,
+        repeat=args.repeat
+    )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2 @@
+from .job_spec import JobSpec, load_job_specs
+from .runner import JobRunner, main
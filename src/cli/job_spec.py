@@ -0,0 +1,316 @@
+import os
+import json
+
+
+SPEC_EXTENSIONS = ('.json', '.yaml', '.yml')
+
+DEFAULT_CONN_FILE = 'src/resources/postgres_connections.json'
+
+_INT, _BOOL, _STR, _LIST = 'int', 'bool', 'str', 'list'
+
+TUNING_OPTIONS = {
+    'consumers': _INT,
+    'chunksize': _INT,
+    'max_rows_buffer': _INT,
+    'monitor_timeout': _INT,
+    'monitor_buffer_size': _INT,
+    'monitor_buffer_bytes': _INT,
+    'backend': _STR,
+    'chunk_format': _STR,
+    'adaptive': _BOOL,
+    'max_consumers': _INT,
+    'swap': _BOOL,
+    'index_workers': _INT,
+    'spill_bytes': _INT,
+    'spill_dir': _STR,
+    'profile_dir': _STR,
+}
+"""Tuning options of both templates, with their expected type."""
+
+COPY_TUNING_OPTIONS = {
+    'producers': _INT,
+    'split_column': _STR,
+    'partitioned': _BOOL,
+    'max_parallel_partitions': _INT,
+    'truncate': _BOOL,
+}
+"""Tuning options of StageCopyTableMultiThread only."""
+
+LOAD_STRATEGIES = ('insert', 'copy_csv', 'copy_binary', 'upsert', 'upsert_copy')
+"""Load strategies of both templates."""
+
+COPY_LOAD_STRATEGIES = ('passthrough_binary', 'passthrough_text')
+"""Load strategies of StageCopyTableMultiThread only."""
+
+CHUNK_FORMATS = ('rows', 'columnar')
+
+_SPEC_KEYS = {
+    'job_id', 'source', 'target', 'conn_file', 'load_strategy', 'conflict_columns', 'update_columns',
+    'incremental', 'checkpoint', 'metrics', 'depends_on', 'tuning', 'distributed',
+}
+
+DISTRIBUTED_OPTIONS = {
+    'conn_id': _STR,
+    'table': _STR,
+    'split_column': _STR,
+    'ranges': _INT,
+    'lease_seconds': _INT,
+    'max_attempts': _INT,
+    'consistent': _BOOL,
+}
+"""Options of distributed table copies: control database and table, ranges and leases."""
+
+
+def _check_type(value: object, expected: str) -> bool:
+    if expected == _INT:
+        return isinstance(value, int) and not isinstance(value, bool)
+    if expected == _BOOL:
+        return isinstance(value, bool)
+    if expected == _STR:
+        return isinstance(value, str) and bool(value)
+
+    return isinstance(value, list) and bool(value) and all(isinstance(v, str) and v for v in value)
+
+
+class JobSpec:
+    def __init__(self, spec: dict, path: str = None) -> None:
+        """
+        Initialize a declarative job spec, as read from a JSON or YAML file, and collect its errors.
+
+        A spec copies a table (source.table, with StageCopyTableMultiThread) or loads a query (source.query, with StageAdHocMultiThread) into target.table:
+
+            job_id: orders                     # optional, defaults to the target table
+            conn_file: src/resources/postgres_connections.json   # optional, per side too
+            source: {conn_id: dbdw, table: orders}
+            target: {conn_id: dw, table: orders_copy}
+            load_strategy: copy_binary         # optional
+            conflict_columns: [id]             # upsert strategies
+            update_columns: [status]           # optional
+            incremental: {column: updated_at, state_file: state/watermarks.json}
+            checkpoint: {journal: state/checkpoints.sqlite, column: id, resume: true}   # table copies only
+            metrics: {json: metrics/orders.json, prometheus: /var/lib/node_exporter/orders.prom}
+            depends_on: [customers]
+            tuning: {consumers: 5, chunksize: 40000, producers: 2, split_column: id}
+            distributed: {conn_id: dw, split_column: id, ranges: 64}   # table copies run by 'coordinate' and 'work'
+
+        Only the structure, the load strategy and the chunk format are checked here; option combinations are checked by the templates when the stages are built.
+
+        Parameters:
+            spec (dict): The parsed spec.
+            path (str, optional): File the spec was read from, used in error messages.
+        """
+        self.path = path
+        self.errors: list[str] = []
+        if not isinstance(spec, dict):
+            self.errors.append('a job spec must be a mapping')
+            spec = {}
+        self._spec = spec
+
+        unknown = set(spec) - _SPEC_KEYS
+        if unknown:
+            self.errors.append(f"unknown keys {sorted(unknown)}")
+
+        conn_file = spec.get('conn_file', DEFAULT_CONN_FILE)
+        if not _check_type(conn_file, _STR):
+            self.errors.append('conn_file must be a non-empty string')
+        self.source = self._side('source', conn_file, ('table', 'query'))
+        self.target = self._side('target', conn_file, ('table',))
+        self.kind = 'query' if 'query' in self.source else 'table'
+        self.job_id = spec.get('job_id') or self.target.get('table')
+        if not isinstance(self.job_id, str) or not self.job_id:
+            self.errors.append('job_id must be a non-empty string')
+
+        self.load_strategy = spec.get('load_strategy', 'insert')
+        if not _check_type(self.load_strategy, _STR):
+            self.errors.append('load_strategy must be a non-empty string')
+        else:
+            strategies = LOAD_STRATEGIES + (COPY_LOAD_STRATEGIES if self.kind == 'table' else ())
+            if self.load_strategy not in strategies:
+                self.errors.append(f"unknown load_strategy {self.load_strategy}, use one of {', '.join(strategies)}")
+        self.conflict_columns = self._optional('conflict_columns', _LIST)
+        self.update_columns = self._optional('update_columns', _LIST)
+        self.depends_on = self._optional('depends_on', _LIST) or []
+
+        self.incremental = self._section('incremental', {'column': _STR, 'state_file': _STR}, required=('column', 'state_file'))
+        self.checkpoint = self._section('checkpoint', {'journal': _STR, 'column': _STR, 'resume': _BOOL}, required=('journal',))
+        if self.checkpoint and self.kind == 'query':
+            self.errors.append('checkpoint is only available for table copies')
+        self.metrics = self._section('metrics', {'json': _STR, 'prometheus': _STR})
+
+        self.distributed = self._section('distributed', DISTRIBUTED_OPTIONS, required=('split_column',))
+        if self.distributed and self.kind == 'query':
+            self.errors.append('distributed is only available for table copies')
+
+        options = dict(TUNING_OPTIONS, **(COPY_TUNING_OPTIONS if self.kind == 'table' else {}))
+        self.tuning = self._section('tuning', options)
+        chunk_format = self.tuning.get('chunk_format')
+        if isinstance(chunk_format, str) and chunk_format and chunk_format not in CHUNK_FORMATS:
+            self.errors.append(f"unknown tuning.chunk_format {chunk_format}, use one of {', '.join(CHUNK_FORMATS)}")
+
+    def _side(self, name: str, conn_file: str, sources: tuple) -> dict:
+        side = self._spec.get(name)
+        if not isinstance(side, dict):
+            self.errors.append(f"{name} must be a mapping with conn_id and {' or '.join(sources)}")
+            return {}
+
+        unknown = set(side) - {'conn_id', 'conn_file', *sources}
+        if unknown:
+            self.errors.append(f"unknown {name} keys {sorted(unknown)}")
+        if not _check_type(side.get('conn_id'), _STR):
+            self.errors.append(f"{name}.conn_id must be a non-empty string")
+        given = [key for key in sources if key in side]
+        if len(given) != 1:
+            required = f"one of {', '.join(sources)}" if len(sources) > 1 else sources[0]
+            self.errors.append(f"{name} needs exactly {required}")
+        for key in given:
+            if not _check_type(side[key], _STR):
+                self.errors.append(f"{name}.{key} must be a non-empty string")
+
+        return {'conn_file': conn_file, **side}
+
+    def _optional(self, key: str, expected: str) -> object:
+        value = self._spec.get(key)
+        if value is not None and not _check_type(value, expected):
+            self.errors.append(f"{key} must be a non-empty list of strings")
+            return None
+
+        return value
+
+    def _section(self, key: str, options: dict[str, str], required: tuple = ()) -> dict:
+        section = self._spec.get(key)
+        if section is None:
+            return {}
+        if not isinstance(section, dict):
+            self.errors.append(f"{key} must be a mapping")
+            return {}
+
+        for option, value in section.items():
+            expected = options.get(option)
+            if expected is None:
+                self.errors.append(f"unknown {key} option {option}")
+            elif not _check_type(value, expected):
+                self.errors.append(f"{key}.{option} must be of type {expected}")
+        for option in required:
+            if option not in section:
+                self.errors.append(f"{key}.{option} is required")
+
+        return dict(section)
+
+    @property
+    def consumers(self) -> int:
+        return self.tuning.get('consumers', 2)
+
+    @property
+    def producers(self) -> int:
+        return self.tuning.get('producers', 1)
+
+    @property
+    def max_consumers(self) -> int:
+        """
+        Most consumers of the job: the adaptive upper bound, or the fixed consumers.
+        """
+        if not self.tuning.get('adaptive'):
+            return self.consumers
+        return max(self.tuning.get('max_consumers', 8), self.consumers)
+
+    @property
+    def parallel_stages(self) -> int:
+        """
+        Pipelines the job runs at the same time: the partitions copied at once by a partitioned copy, else 1.
+        """
+        if not self.tuning.get('partitioned'):
+            return 1
+        return max(self.tuning.get('max_parallel_partitions', 4), 1)
+
+    def __repr__(self) -> str:
+        return f"JobSpec(job_id={self.job_id!r}, kind={self.kind!r}, path={self.path!r})"
+
+
+def _parse_file(file_path: str) -> object:
+    """
+    Parse a JSON or YAML file. PyYAML is imported only for YAML files.
+
+    Raises:
+        ImportError: If the file is YAML and PyYAML is not installed.
+        ValueError: If the file is not valid JSON or YAML.
+    """
+    with open(file_path) as file:
+        if file_path.lower().endswith('.json'):
+            return json.load(file)
+        try:
+            import yaml as _yaml
+        except ImportError as e:
+            raise ImportError("YAML job specs require PyYAML. Install it with 'pip install pyyaml'.") from e
+        try:
+            return _yaml.safe_load(file)
+        except _yaml.YAMLError as e:
+            raise ValueError(str(e)) from e
+
+
+def expand_spec_paths(paths: list[str]) -> list[str]:
+    """
+    Expand files and directories (not recursively) into the sorted list of JSON and YAML spec files.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or nothing matches.
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(
+                os.path.join(path, name) for name in os.listdir(path)
+                if name.lower().endswith(SPEC_EXTENSIONS) and os.path.isfile(os.path.join(path, name))
+            ))
+        elif os.path.isfile(path):
+            files.append(path)
+        else:
+            raise FileNotFoundError(f"Job spec {path} not found")
+
+    if not files:
+        raise FileNotFoundError(f"No job spec in {', '.join(paths)}")
+
+    return files
+
+
+def load_job_specs(paths: list[str]) -> list[JobSpec]:
+    """
+    Read and validate every job spec of the given files and directories before any job runs.
+
+    A file holds one spec, or a list of specs. Every error of every spec is reported at once, with its file.
+
+    Parameters:
+        paths (list[str]): Spec files and directories of spec files.
+
+    Returns:
+        list[JobSpec]: The specs, in file order.
+
+    Raises:
+        FileNotFoundError: If a path does not exist or holds no spec.
+        ValueError: If any spec is invalid, job ids are duplicated or a dependency is unknown.
+    """
+    specs: list[JobSpec] = []
+    errors = []
+    for file_path in expand_spec_paths(paths):
+        try:
+            content = _parse_file(file_path)
+        except ValueError as e:
+            errors.append(f"{file_path}: cannot be parsed: {e}")
+            continue
+        for spec in content if isinstance(content, list) else [content]:
+            specs.append(JobSpec(spec, path=file_path))
+
+    seen = {}
+    for spec in specs:
+        errors.extend(f"{spec.path}: job {spec.job_id}: {error}" for error in spec.errors)
+        if spec.job_id in seen:
+            errors.append(f"{spec.path}: job {spec.job_id}: duplicated, first defined in {seen[spec.job_id]}")
+        seen.setdefault(spec.job_id, spec.path)
+    for spec in specs:
+        unknown = [d for d in spec.depends_on if d not in seen]
+        if unknown:
+            errors.append(f"{spec.path}: job {spec.job_id}: depends on unknown jobs {unknown}")
+
+    if errors:
+        raise ValueError("Invalid job specs:\n" + '\n'.join(f"  {error}" for error in errors))
+
+    return specs
@@ -0,0 +1,372 @@
+import sys
+import time
+import argparse
+from .job_spec import JobSpec as _JobSpec, load_job_specs as _load_job_specs
+
+
+def _stage_options(spec: _JobSpec) -> dict:
+    """
+    Build the template arguments of a spec other than its tables, engines and utilities.
+    """
+    from src.utils.state.watermark_store import WatermarkStore
+    from src.utils.state.checkpoint_journal import CheckpointJournal
+    from src.utils.metrics.metrics_sinks import JsonSummarySink, PrometheusTextfileSink
+
+    options = dict(
+        load_strategy=spec.load_strategy,
+        conflict_columns=spec.conflict_columns,
+        update_columns=spec.update_columns,
+        **spec.tuning
+    )
+    if spec.incremental:
+        options.update(
+            incremental_column=spec.incremental['column'],
+            watermark_store=WatermarkStore(spec.incremental['state_file'])
+        )
+    if spec.checkpoint:
+        options.update(
+            checkpoint_journal=CheckpointJournal(spec.checkpoint['journal']),
+            checkpoint_column=spec.checkpoint.get('column'),
+            resume=spec.checkpoint.get('resume', False)
+        )
+    sinks = []
+    if 'json' in spec.metrics:
+        sinks.append(JsonSummarySink(spec.metrics['json']))
+    if 'prometheus' in spec.metrics:
+        sinks.append(PrometheusTextfileSink(spec.metrics['prometheus']))
+    if sinks:
+        options['metrics_sinks'] = sinks
+
+    return options
+
+
+def _engine(side: dict, pool_size: int = None):
+    from src.connection.postgres_connection_factory import PostgresConnectionFactory
+
+    return PostgresConnectionFactory().create_engine_by_file(
+        conn_id=side['conn_id'],
+        file_path=side['conn_file'],
+        pool_size=pool_size
+    )
+
+
+class JobRunner:
+    def __init__(
+        self,
+        specs: list[_JobSpec],
+        parallel_jobs: int = 1,
+        max_source_connections: int = None,
+        max_target_connections: int = None
+    ) -> None:
+        """
+        Initialize a runner of declarative job specs in one process.
+
+        SQLAlchemy, psycopg2 and the templates are imported by build(), not when this module is imported. pandas is imported only by the jobs that need it. Engines are shared by every job of a database, so a directory of specs opens one pool per database instead of one per job.
+
+        Parameters:
+            specs (list[_JobSpec]): Validated specs, e.g. from load_job_specs.
+            parallel_jobs (int, optional): Jobs running at the same time. Defaults to 1.
+            max_source_connections (int, optional): Cap on source connections of the running jobs. Defaults to what parallel_jobs of the largest jobs need.
+            max_target_connections (int, optional): Cap on target connections of the running jobs. Defaults to what parallel_jobs of the largest jobs need.
+        """
+        self._specs = specs
+        self._parallel_jobs = max(parallel_jobs, 1)
+        self._max_source_connections = max_source_connections
+        self._max_target_connections = max_target_connections
+        self._engines: dict[tuple, object] = {}
+        self._jobs = []
+        self._scheduler = None
+
+    def _pool_sizes(self) -> dict[tuple, int]:
+        """
+        Size the pool of every database for the largest jobs using it, times the jobs running at the same time.
+        """
+        from src.connection.postgres_connection_factory import PostgresConnectionFactory
+
+        factory = PostgresConnectionFactory()
+        sizes: dict[tuple, int] = {}
+        for spec in self._specs:
+            size = factory.pool_size_for(spec.producers * spec.parallel_stages, spec.max_consumers * spec.parallel_stages)
+            for side in (spec.source, spec.target):
+                key = (side['conn_file'], side['conn_id'])
+                sizes[key] = max(sizes.get(key, 0), size)
+
+        return {key: size * self._parallel_jobs for key, size in sizes.items()}
+
+    def build(self) -> None:
+        """
+        Create the engines and build the stage of every job once, so option combinations rejected by the templates fail before any job starts. Engines connect lazily: no connection is opened here.
+
+        Raises:
+            ValueError: If any stage rejects its options, with the errors of every job.
+            KeyError: If a connection id is missing from its connection file.
+        """
+        from src.utils.log.log_utils import LogUtils
+        from src.utils.table.table_manager import TableManager
+        from src.scheduler.stage_job import StageJob
+        from src.scheduler.job_scheduler import JobScheduler
+        from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread
+        from src.templates.template_stage_ad_hoc_query_multithread import StageAdHocMultiThread
+
+        log_utils = LogUtils()
+        table_manager = TableManager()
+        pool_sizes = self._pool_sizes()
+        for key, size in pool_sizes.items():
+            self._engines[key] = _engine({'conn_file': key[0], 'conn_id': key[1]}, size)
+
+        errors = []
+        self._jobs = []
+        for spec in self._specs:
+            conn_input = self._engines[(spec.source['conn_file'], spec.source['conn_id'])]
+            conn_output = self._engines[(spec.target['conn_file'], spec.target['conn_id'])]
+            kwargs = dict(
+                _stage_options(spec),
+                table_name_target=spec.target['table'],
+                log_utils=log_utils,
+                table_manager=table_manager,
+                job_id=spec.job_id
+            )
+            if spec.kind == 'table':
+                stage_cls = StageCopyTableMultiThread
+                kwargs.update(table_name_source=spec.source['table'])
+            else:
+                stage_cls = StageAdHocMultiThread
+                kwargs.update(query=spec.source['query'])
+            kwargs.update(conn_input=conn_input, conn_output=conn_output)
+
+            def stage_factory(consumers: int, stage_cls=stage_cls, kwargs=kwargs, initial=spec.consumers):
+                # The grant caps every connection the stage opens on the target: adaptive consumers and index builds too.
+                return stage_cls(**dict(
+                    kwargs,
+                    consumers=min(initial, consumers),
+                    max_consumers=consumers,
+                    index_workers=min(kwargs.get('index_workers', 2), consumers)
+                ))
+
+            try:
+                stage_factory(spec.max_consumers)
+            except ValueError as e:
+                errors.append(f"{spec.path}: job {spec.job_id}: {e}")
+                continue
+
+            self._jobs.append(StageJob(
+                job_id=spec.job_id,
+                stage_factory=stage_factory,
+                depends_on=spec.depends_on,
+                source_table=spec.source.get('table'),
+                source_engine=conn_input,
+                producers=spec.producers,
+                min_consumers=spec.consumers,
+                max_consumers=spec.max_consumers,
+                parallel_stages=spec.parallel_stages,
+                shared_snapshot=bool(spec.tuning.get('partitioned'))
+            ))
+
+        if errors:
+            raise ValueError("Invalid job specs:\n" + '\n'.join(f"  {error}" for error in errors))
+
+        def largest(connections: list[int]) -> int:
+            return sum(sorted(connections, reverse=True)[:self._parallel_jobs])
+
+        self._scheduler = JobScheduler(
+            max_source_connections=self._max_source_connections or largest([job.source_connections for job in self._jobs]),
+            max_target_connections=self._max_target_connections or largest([job.target_connections(job.max_consumers) for job in self._jobs]),
+            table_manager=table_manager,
+            log_utils=log_utils,
+            max_parallel_jobs=self._parallel_jobs
+        )
+        for job in self._jobs:
+            self._scheduler.add_job(job)
+
+    def run(self) -> dict[str, dict]:
+        """
+        Run every job with the JobScheduler: jobs start in dependency order, largest first, and the jobs depending on a failed job are skipped.
+
+        Returns:
+            dict[str, dict]: Per job id, its status ('succeeded', 'failed' or 'skipped'), consumers, duration and error.
+        """
+        if self._scheduler is None:
+            self.build()
+        try:
+            return self._scheduler.run(raise_on_failure=False)
+        finally:
+            for engine in self._engines.values():
+                engine.dispose()
+
+
+def build_distributed(spec: _JobSpec, role: str, resume: bool = False, linger: bool = True) -> object:
+    """
+    Build the coordinator or a worker of a spec with a distributed section. The control table lives in distributed.conn_id, or the target database by default.
+
+    Parameters:
+        role (str): 'coordinate' or 'work'.
+        resume (bool, optional): Let the coordinator keep the unfinished ranges of a previous run. Defaults to False.
+        linger (bool, optional): Let the worker wait for the ranges held by other workers. Defaults to True.
+
+    Raises:
+        ValueError: If the spec is not distributed or the worker rejects its options.
+    """
+    from src.utils.log.log_utils import LogUtils
+    from src.utils.table.table_manager import TableManager
+    from src.utils.state.work_queue import WorkQueue
+    from src.connection.postgres_connection_factory import PostgresConnectionFactory
+    from src.scheduler.distributed_copy import DistributedCopyCoordinator, DistributedCopyWorker
+
+    if not spec.distributed:
+        raise ValueError(f"Job {spec.job_id} has no distributed section")
+    distributed = spec.distributed
+    pool_size = PostgresConnectionFactory().pool_size_for(spec.producers, spec.consumers)
+    conn_input = _engine(spec.source, pool_size)
+    conn_output = _engine(spec.target, pool_size)
+    control = {'conn_file': spec.target['conn_file'], 'conn_id': distributed.get('conn_id', spec.target['conn_id'])}
+    work_queue = WorkQueue(_engine(control), distributed.get('table', 'data_tools_work_queue'))
+    common = dict(
+        table_name_source=spec.source['table'],
+        table_name_target=spec.target['table'],
+        conn_input=conn_input,
+        conn_output=conn_output,
+        work_queue=work_queue,
+        table_manager=TableManager(),
+        log_utils=LogUtils(),
+        job_id=spec.job_id,
+        max_attempts=distributed.get('max_attempts', 3)
+    )
+    if role == 'coordinate':
+        return DistributedCopyCoordinator(
+            split_column=distributed['split_column'],
+            ranges=distributed.get('ranges', 64),
+            load_strategy=spec.load_strategy,
+            truncate=spec.tuning.get('truncate', True),
+            resume=resume,
+            consistent=distributed.get('consistent', False),
+            **common
+        )
+
+    options = _stage_options(spec)
+    options.pop('truncate', None)
+    return DistributedCopyWorker(
+        lease_seconds=distributed.get('lease_seconds', 300),
+        linger=linger,
+        **common,
+        **options
+    )
+
+
+def parse_args(argv: list[str] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog='data_tools', description="Run ETL jobs described by JSON or YAML job specs.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="Validate every spec, then run the jobs.")
+    run.add_argument('specs', nargs='+', help="Spec files, or directories of .json, .yaml and .yml specs.")
+    run.add_argument('--parallel-jobs', type=int, default=1, help="Jobs running at the same time (default: 1).")
+    run.add_argument('--max-source-connections', type=int, help="Cap on source connections of the running jobs.")
+    run.add_argument('--max-target-connections', type=int, help="Cap on target connections of the running jobs.")
+
+    validate = commands.add_parser('validate', help="Check the structure of every spec without importing the ETL stack.")
+    validate.add_argument('specs', nargs='+', help="Spec files, or directories of .json, .yaml and .yml specs.")
+
+    coordinate = commands.add_parser('coordinate', help="Split the table of a distributed spec into ranges and wait for the workers to copy them.")
+    coordinate.add_argument('spec', help="Spec file of the job.")
+    coordinate.add_argument('--job', help="Job id, when the file holds several specs.")
+    coordinate.add_argument('--resume', action='store_true', help="Keep the unfinished ranges of the previous run.")
+
+    work = commands.add_parser('work', help="Claim and copy ranges of a distributed spec; run it on any number of hosts.")
+    work.add_argument('spec', help="Spec file of the job.")
+    work.add_argument('--job', help="Job id, when the file holds several specs.")
+    work.add_argument('--workers', type=int, default=1, help="Workers in this process (default: 1).")
+    work.add_argument('--no-linger', action='store_true', help="Exit once nothing can be claimed, instead of waiting for the ranges of other workers.")
+
+    return parser.parse_args(argv)
+
+
+def _select_spec(specs: list[_JobSpec], job_id: str = None) -> _JobSpec:
+    """
+    Pick the distributed spec of a file, by job id when it holds several.
+
+    Raises:
+        ValueError: If no spec or several specs match.
+    """
+    matches = [spec for spec in specs if spec.distributed and job_id in (None, spec.job_id)]
+    if len(matches) != 1:
+        found = ', '.join(spec.job_id for spec in matches) or 'none'
+        raise ValueError(f"Expected one distributed job spec, found {found}. Use --job to choose one.")
+
+    return matches[0]
+
+
+def _run_distributed(args: argparse.Namespace, specs: list[_JobSpec]) -> int:
+    try:
+        spec = _select_spec(specs, args.job)
+        if args.command == 'coordinate':
+            stages = [build_distributed(spec, 'coordinate', resume=args.resume)]
+        else:
+            stages = [build_distributed(spec, 'work', linger=not args.no_linger) for _ in range(max(args.workers, 1))]
+    except (ValueError, KeyError, IOError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if len(stages) == 1:
+        try:
+            stages[0].run()
+        except Exception as e:
+            print(f"{spec.job_id}: failed ({e!r})", file=sys.stderr)
+            return 1
+        return 0
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    try:
+        with ThreadPoolExecutor(max_workers=len(stages), thread_name_prefix='DistributedWorker') as executor:
+            copied = sum(executor.map(lambda worker: worker.run(), stages))
+    except Exception as e:
+        print(f"{spec.job_id}: failed ({e!r})", file=sys.stderr)
+        return 1
+    print(f"{spec.job_id}: {copied} ranges copied by {len(stages)} workers")
+
+    return 0
+
+
+def main(argv: list[str] = None) -> int:
+    """
+    Entry point of the data_tools command.
+
+    Returns:
+        int: Exit status: 0 when every job succeeded, 1 when a job failed or was skipped, 2 when the specs are invalid.
+    """
+    args = parse_args(argv)
+    try:
+        specs = _load_job_specs(args.specs if args.command in ('run', 'validate') else [args.spec])
+    except (FileNotFoundError, ValueError, ImportError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    if args.command == 'validate':
+        print(f"{len(specs)} valid job specs")
+        return 0
+    if args.command in ('coordinate', 'work'):
+        return _run_distributed(args, specs)
+
+    runner = JobRunner(
+        specs,
+        parallel_jobs=args.parallel_jobs,
+        max_source_connections=args.max_source_connections,
+        max_target_connections=args.max_target_connections
+    )
+    try:
+        runner.build()
+    except (ValueError, KeyError, IOError) as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    start = time.time()
+    results = runner.run()
+    for job_id, result in results.items():
+        line = f"{job_id}: {result['status']}"
+        if result['seconds'] is not None:
+            line += f" in {result['seconds']:.1f}s"
+        if result['error']:
+            line += f" ({result['error']})"
+        print(line)
+    print(f"{len(results)} jobs in {time.time() - start:.1f}s")
+
+    return 0 if all(result['status'] == 'succeeded' for result in results.values()) else 1
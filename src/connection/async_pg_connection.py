@@ -0,0 +1,84 @@
+import asyncio
+import psycopg2
+from psycopg2 import extensions as _extensions
+from sqlalchemy.engine import Engine as _Engine
+
+
+class AsyncPgConnection:
+    def __init__(self, connect_kwargs: dict) -> None:
+        """
+        Initialize a non-blocking PostgreSQL connection driven by the asyncio event loop.
+
+        It uses psycopg2's asynchronous mode: queries are sent without blocking and the loop is woken through the connection socket when results arrive, so one thread can serve many connections. Asynchronous connections are always in autocommit mode; transactions are opened with explicit BEGIN/COMMIT statements. COPY and named cursors are not available in this mode.
+
+        Parameters:
+            connect_kwargs (dict): Keyword arguments of psycopg2.connect (host, port, user, password, database, ...).
+        """
+        self._connect_kwargs = connect_kwargs
+        self._conn = None
+
+    @classmethod
+    def from_engine(cls, engine: _Engine) -> 'AsyncPgConnection':
+        """
+        Build an asynchronous connection to the database of a SQLAlchemy psycopg2 engine.
+        """
+        kwargs = engine.url.translate_connect_args(username='user')
+        kwargs.update(engine.url.query)
+        return cls(kwargs)
+
+    async def _wait(self):
+        loop = asyncio.get_running_loop()
+        fd = self._conn.fileno()
+        while True:
+            state = self._conn.poll()
+            if state == _extensions.POLL_OK:
+                return
+
+            ready = loop.create_future()
+            def wake():
+                if not ready.done():
+                    ready.set_result(None)
+
+            if state == _extensions.POLL_READ:
+                loop.add_reader(fd, wake)
+                remove = loop.remove_reader
+            elif state == _extensions.POLL_WRITE:
+                loop.add_writer(fd, wake)
+                remove = loop.remove_writer
+            else:
+                raise psycopg2.OperationalError(f"Unexpected poll state {state}")
+            try:
+                await ready
+            finally:
+                remove(fd)
+
+    async def connect(self) -> 'AsyncPgConnection':
+        self._conn = psycopg2.connect(async_=True, **self._connect_kwargs)
+        await self._wait()
+        return self
+
+    async def execute(self, query: object, params: object = None):
+        """
+        Run a statement and wait for its result without blocking the event loop.
+
+        Returns:
+            The psycopg2 cursor holding the result, fetched locally with fetchall().
+        """
+        cursor = self._conn.cursor()
+        cursor.execute(query, params)
+        await self._wait()
+        return cursor
+
+    def mogrify(self, query: str, params: object) -> bytes:
+        return self._conn.cursor().mogrify(query, params)
+
+    async def close(self):
+        if self._conn is not None and not self._conn.closed:
+            self._conn.close()
+        self._conn = None
+
+    async def __aenter__(self) -> 'AsyncPgConnection':
+        return await self.connect()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
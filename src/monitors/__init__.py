@@ -1 +1,4 @@
 from .monitor import Monitor
+from .process_monitor import ProcessMonitor
+from .adaptive_controller import AdaptiveController
+from .async_monitor import AsyncMonitor
\ No newline at end of file
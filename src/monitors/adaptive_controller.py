@@ -0,0 +1,181 @@
+import time
+from typing import Callable
+from logging import Logger as _Logger
+from threading import (
+    Thread as _Thread,
+    Event as _Event
+)
+from .monitor import Monitor as _Monitor
+
+
+class AdaptiveController(_Thread):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        consumer_factory: Callable[[], object],
+        min_consumers: int = 1,
+        max_consumers: int = 8,
+        min_chunksize: int = 1000,
+        max_chunksize: int = 200000,
+        target_chunk_bytes: int = 8 * 1024 * 1024,
+        max_chunk_bytes: int = 64 * 1024 * 1024,
+        interval: float = 5.0,
+        high_occupancy: float = 0.75,
+        low_occupancy: float = 0.25,
+        min_gain: float = 0.05,
+        logger: _Logger = None
+    ) -> None:
+        """
+        Initialize a controller thread that tunes a running pipeline from the occupancy and throughput observed in its monitor.
+
+        Every interval the controller:
+        - sizes producer fetches so each chunk holds about target_chunk_bytes, so narrow and wide tables get chunk sizes that differ by as much as their rows do;
+        - adds a consumer when the buffer stays full (the target is the bottleneck) and keeps it only if the read throughput grows by at least min_gain;
+        - when the buffer stays empty (the source is the bottleneck), retires a consumer and tries doubling the chunk byte target, kept only if the write throughput grows by at least min_gain.
+
+        A rejected change is reverted and that knob is left alone for the next intervals, so the controller settles instead of oscillating.
+
+        Parameters:
+            monitor (_Monitor): The thread monitor of the pipeline.
+            consumer_factory (Callable[[], object]): Function returning a new, not yet started consumer for the monitor.
+            min_consumers (int, optional): Lowest number of consumers. Defaults to 1.
+            max_consumers (int, optional): Highest number of consumers, i.e. the connection budget of the target. Defaults to 8.
+            min_chunksize (int, optional): Smallest number of rows per chunk. Defaults to 1000.
+            max_chunksize (int, optional): Largest number of rows per chunk. Defaults to 200000.
+            target_chunk_bytes (int, optional): Initial estimated size of a chunk in bytes. Defaults to 8 MiB.
+            max_chunk_bytes (int, optional): Largest chunk byte target tried. Defaults to 64 MiB.
+            interval (float, optional): Seconds between two control steps. Defaults to 5.
+            high_occupancy (float, optional): Buffer occupancy above which consumers are added. Defaults to 0.75.
+            low_occupancy (float, optional): Buffer occupancy below which consumers are retired. Defaults to 0.25.
+            min_gain (float, optional): Relative throughput gain required to keep a change. Defaults to 0.05.
+            logger (_Logger, optional): Logger of the tuning decisions.
+
+        Raises:
+            ValueError: If the consumer or chunk size bounds are inconsistent.
+        """
+        super().__init__(name='AdaptiveController', daemon=True)
+        if not 1 <= min_consumers <= max_consumers:
+            raise ValueError("AdaptiveController requires 1 <= min_consumers <= max_consumers")
+        if not 1 <= min_chunksize <= max_chunksize:
+            raise ValueError("AdaptiveController requires 1 <= min_chunksize <= max_chunksize")
+
+        self._monitor = monitor
+        self._consumer_factory = consumer_factory
+        self._min_consumers = min_consumers
+        self._max_consumers = max_consumers
+        self._min_chunksize = min_chunksize
+        self._max_chunksize = max_chunksize
+        self._chunk_bytes = target_chunk_bytes
+        self._max_chunk_bytes = max_chunk_bytes
+        self._interval = interval
+        self._high_occupancy = high_occupancy
+        self._low_occupancy = low_occupancy
+        self._min_gain = min_gain
+        self._logger = logger
+        self._stop_event = _Event()
+        self._last: dict = None
+        self._last_at: float = None
+        self._trial: tuple = None
+        self._frozen: dict = {'scale_up': 0, 'chunk': 0}
+        self.history: list[dict] = []
+
+    def stop(self):
+        self._stop_event.set()
+
+    def _log(self, message: str):
+        if self._logger is not None:
+            self._logger.info(f'adaptive controller: {message}')
+
+    def _producers(self) -> list:
+        return [w for w in self._monitor.workers if w.is_producer and hasattr(w, 'set_chunksize')]
+
+    def _consumers(self) -> list:
+        return [w for w in self._monitor.workers if not w.is_producer and w.is_alive() and not w.stopping]
+
+    def run(self):
+        while not self._stop_event.wait(self._interval):
+            stats = self._monitor.stats()
+            if self._monitor.stopped or stats['producers_online'] <= 0:
+                break
+            self.step(stats, time.monotonic())
+
+    def step(self, stats: dict, now: float):
+        """
+        Run one control step from a monitor snapshot. Rates are measured since the previous step.
+        """
+        previous, previous_at = self._last, self._last_at
+        self._last, self._last_at = stats, now
+        if previous is None or now <= previous_at:
+            return
+
+        elapsed = now - previous_at
+        rate_in = (stats['rows_written'] - previous['rows_written']) / elapsed
+        rate_out = (stats['rows_read'] - previous['rows_read']) / elapsed
+        occupancy = stats['chunks'] / stats['buffer_size'] if stats['buffer_size'] else 0.0
+        self.history.append({
+            'at': now, 'rate_in': rate_in, 'rate_out': rate_out, 'occupancy': occupancy,
+            'consumers': stats['consumers_online'], 'chunk_bytes': self._chunk_bytes,
+        })
+
+        for knob in self._frozen:
+            self._frozen[knob] = max(self._frozen[knob] - 1, 0)
+
+        if self._trial is not None:
+            self._evaluate_trial(rate_in, rate_out)
+            return
+
+        self._resize_chunks(stats)
+
+        consumers = self._consumers()
+        if occupancy >= self._high_occupancy:
+            if len(consumers) < self._max_consumers and not self._frozen['scale_up']:
+                consumer = self._consumer_factory()
+                if self._monitor.add_worker(consumer):
+                    self._trial = ('scale_up', rate_out, consumer)
+                    self._log(f'buffer at {occupancy:.0%}, added a consumer ({len(consumers) + 1} online)')
+        elif occupancy <= self._low_occupancy:
+            if len(consumers) > self._min_consumers:
+                consumers[-1].stop()
+                self._monitor.notify_all()
+                self._log(f'buffer at {occupancy:.0%}, retired a consumer ({len(consumers) - 1} online)')
+            elif self._chunk_bytes < self._max_chunk_bytes and not self._frozen['chunk']:
+                self._trial = ('chunk', rate_in, self._chunk_bytes)
+                self._chunk_bytes = min(self._chunk_bytes * 2, self._max_chunk_bytes)
+                self._resize_chunks(stats)
+                self._log(f'buffer at {occupancy:.0%}, trying chunks of {self._chunk_bytes} bytes')
+
+    def _evaluate_trial(self, rate_in: float, rate_out: float):
+        knob, baseline, undo = self._trial
+        self._trial = None
+        rate = rate_out if knob == 'scale_up' else rate_in
+        if baseline > 0 and rate >= baseline * (1 + self._min_gain):
+            self._log(f'kept {knob}: {baseline:.0f} -> {rate:.0f} rows/s')
+            return
+
+        self._frozen[knob] = 6
+        if knob == 'scale_up':
+            undo.stop()
+            self._monitor.notify_all()
+        else:
+            self._chunk_bytes = undo
+            if self._last is not None:
+                self._resize_chunks(self._last)
+        self._log(f'reverted {knob}: {baseline:.0f} -> {rate:.0f} rows/s')
+
+    def _resize_chunks(self, stats: dict):
+        """
+        Size producer fetches from the average row size seen so far, so a chunk holds about the chunk byte target.
+        """
+        if not stats['rows_written']:
+            return
+        row_bytes = max(stats['bytes_written'] / stats['rows_written'], 1)
+        chunk_bytes = self._chunk_bytes
+        if stats['max_buffer_bytes'] and stats['buffer_size']:
+            chunk_bytes = min(chunk_bytes, stats['max_buffer_bytes'] // stats['buffer_size'])
+        chunksize = int(min(max(chunk_bytes / row_bytes, self._min_chunksize), self._max_chunksize))
+
+        for producer in self._producers():
+            current = producer.chunksize
+            if abs(chunksize - current) > current * 0.25:
+                producer.set_chunksize(chunksize)
+                self._log(f'{producer.name} chunksize {current} -> {chunksize} ({row_bytes:.0f} bytes per row)')
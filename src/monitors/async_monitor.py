@@ -0,0 +1,174 @@
+import asyncio
+from collections import deque as _deque
+from .monitor import estimate_size as _estimate_size
+
+
+class AsyncMonitor:
+    def __init__(self, buffer_size: int, max_buffer_bytes: int = None):
+        """
+        Initialize an AsyncMonitor coordinating asyncio producer and consumer tasks with a bounded FIFO buffer.
+
+        It mirrors the Monitor API with coroutines: workers are tasks of one event loop instead of threads, so many pipelines can run side by side in one thread. Backpressure applies to the number of chunks and, optionally, to their estimated size in bytes.
+
+        Parameters:
+            buffer_size (int): Maximum number of chunks the buffer can hold.
+            max_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks held in the buffer. Defaults to None (no byte limit).
+        """
+        self._buffer: _deque = _deque()
+        self._buffer_size: int = buffer_size
+        self._buffer_bytes: int = 0
+        self._max_buffer_bytes: int = max_buffer_bytes
+        self._workers: list = []
+        self._tasks: list[asyncio.Task] = []
+        self._producers_online: int = 0
+        self._consumers_online: int = 0
+        self._condition: asyncio.Condition = None
+        self._stopped: bool = False
+        self._error: BaseException = None
+        self._insert_query = None
+        self._columns: list[str] = None
+
+    def _cond(self) -> asyncio.Condition:
+        # Created lazily so the condition is bound to the loop that runs the pipeline.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    def _is_full(self, size: int) -> bool:
+        if len(self._buffer) >= self._buffer_size:
+            return True
+        if self._max_buffer_bytes and self._buffer:
+            return self._buffer_bytes + size > self._max_buffer_bytes
+        return False
+
+    async def write(self, data: object):
+        """
+        Append a chunk to the end of the buffer, waiting while the buffer is over its chunk or byte limit.
+
+        If the pipeline is stopped while waiting, the chunk is discarded.
+        """
+        size = _estimate_size(data)
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self._stopped or not self._is_full(size))
+            if self._stopped:
+                return
+            self._buffer.append((data, size))
+            self._buffer_bytes += size
+            cond.notify_all()
+
+    async def read(self):
+        """
+        Retrieve and remove the oldest chunk from the buffer, waiting while it is empty and producers are still active.
+
+        Returns:
+            The next chunk, or None once the buffer is drained and no producers remain, or the pipeline was stopped.
+        """
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self._stopped or self._buffer or self._producers_online <= 0)
+            if self._stopped or not self._buffer:
+                return None
+            data, size = self._buffer.popleft()
+            self._buffer_bytes -= size
+            cond.notify_all()
+
+        return data
+
+    async def stop_all_workers(self, error: BaseException = None):
+        """
+        Stop the pipeline: discard buffered chunks, stop all subscribed workers and wake every waiting task.
+
+        Parameters:
+            error (BaseException, optional): The failure that caused the stop. The first error recorded is re-raised by wait_for_completion.
+        """
+        cond = self._cond()
+        async with cond:
+            self._stopped = True
+            if error is not None and self._error is None:
+                self._error = error
+            self._buffer.clear()
+            self._buffer_bytes = 0
+            for worker in self._workers:
+                worker.stop()
+            cond.notify_all()
+
+    async def producer_end_process(self):
+        """
+        Record that a producer finished writing. Once the last producer ends, waiting consumers are woken to drain the buffer.
+        """
+        cond = self._cond()
+        async with cond:
+            self._producers_online -= 1
+            cond.notify_all()
+
+    async def signal_end_process(self):
+        """
+        Record that a consumer finished.
+        """
+        async with self._cond():
+            self._consumers_online -= 1
+
+    def subscribe(self, worker):
+        if worker.is_producer:
+            self._producers_online += 1
+        else:
+            self._consumers_online += 1
+        self._workers.append(worker)
+
+    def start(self):
+        """
+        Schedule every subscribed worker as a task of the running event loop.
+        """
+        self._tasks = [asyncio.create_task(worker.run(), name=worker.name) for worker in self._workers]
+
+    async def set_insert_query(self, query: str):
+        cond = self._cond()
+        async with cond:
+            self._insert_query = query
+            cond.notify_all()
+
+    async def get_insert_query(self):
+        """
+        Return the insert query published by the producer, waiting until it is available or the pipeline is stopped.
+        """
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self._insert_query or self._stopped)
+            return self._insert_query
+
+    async def set_columns(self, columns: list[str]):
+        cond = self._cond()
+        async with cond:
+            self._columns = list(columns)
+            cond.notify_all()
+
+    async def get_columns(self) -> list[str]:
+        """
+        Return the column names published by the producer, waiting until they are available or the pipeline is stopped.
+        """
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self._columns or self._stopped)
+            return self._columns
+
+    async def wait_for_completion(self):
+        """
+        Wait until every worker task has finished.
+
+        Raises:
+            RuntimeError: If the pipeline was stopped because a worker failed.
+        """
+        results = await asyncio.gather(*self._tasks, return_exceptions=True)
+
+        error = self._error or next((r for r in results if isinstance(r, BaseException)), None)
+        if error is not None:
+            raise RuntimeError(f"Pipeline stopped after a worker failed: {error}") from error
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def metrics(self):
+        return None
@@ -1,89 +1,313 @@
+import sys
+import time
+from collections import deque as _deque
 from threading import (
-    Semaphore as _Semaphore,
+    Lock as _Lock,
     Condition as _Condition,
     Event as _Event
 )
+from src.monitors.spill_store import SpillStore as _SpillStore
+from src.utils.metrics.pipeline_metrics import (
+    PipelineMetrics as _PipelineMetrics,
+    current_worker_name as _current_worker_name
+)
+
+
+def estimate_size(data: object, sample_rows: int = 10) -> int:
+    """
+    Estimate the memory held by a chunk, in bytes.
+
+    Objects exposing `nbytes` or byte strings are measured directly. Sequences of rows are measured on an evenly spaced sample of rows and extrapolated, so the cost does not grow with the chunk size.
+
+    Parameters:
+        data (object): Chunk written to the monitor.
+        sample_rows (int, optional): Maximum number of rows measured. Defaults to 10.
+
+    Returns:
+        int: Estimated size of the chunk in bytes.
+    """
+    nbytes = getattr(data, 'nbytes', None)
+    if nbytes is not None:
+        return int(nbytes)
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return len(data)
+
+    try:
+        rows = len(data)
+    except TypeError:
+        return sys.getsizeof(data)
+    if rows == 0:
+        return sys.getsizeof(data)
+
+    step = max(rows // sample_rows, 1)
+    sampled = 0
+    sampled_bytes = 0
+    for i in range(0, rows, step):
+        row = data[i]
+        sampled_bytes += sys.getsizeof(row)
+        try:
+            sampled_bytes += sum(sys.getsizeof(value) for value in row)
+        except TypeError:
+            pass
+        sampled += 1
+        if sampled == sample_rows:
+            break
+
+    return sys.getsizeof(data) + sampled_bytes * rows // sampled
+
+
+def _row_count(data: object) -> int:
+    try:
+        return len(data)
+    except TypeError:
+        return 0
 
 
 class Monitor:
-    def __init__(self, buffer_size: int, timeout: int = 5):
+    def __init__(
+        self,
+        buffer_size: int,
+        timeout: int = 5,
+        max_buffer_bytes: int = None,
+        metrics: _PipelineMetrics = None,
+        spill_bytes: int = None,
+        spill_dir: str = None
+    ):
         """
-        Initialize a Monitor instance for coordinating producer and consumer threads with a bounded buffer.
-        
+        Initialize a Monitor instance for coordinating producer and consumer threads with a bounded FIFO buffer.
+
+        The buffer applies backpressure on two limits: the number of chunks and, optionally, their estimated size in bytes. A chunk larger than the byte budget is still accepted when the buffer is empty, so a single wide chunk never deadlocks the pipeline.
+
+        With a spill budget, chunks written while the in-memory buffer is full are serialized to memory-mapped temporary files instead of blocking the producer, and read back in order by the consumers. Extraction then runs at the source's speed and releases the source connection and snapshot early, while producers only block once the disk budget is exhausted too.
+
         Parameters:
-            buffer_size (int): Maximum number of items the buffer can hold.
-            timeout (int, optional): Timeout in seconds for thread synchronization operations. Defaults to 5.
+            buffer_size (int): Maximum number of chunks the buffer can hold.
+            timeout (int, optional): Interval in seconds at which blocked threads re-check whether the pipeline was stopped. Defaults to 5.
+            max_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks held in the buffer. Defaults to None (no byte limit).
+            metrics (_PipelineMetrics, optional): Collector of the time workers spend blocked on the buffer and of its depth, shared with the workers. Defaults to None.
+            spill_bytes (int, optional): Disk space the buffer can spill to once full. Defaults to None (no spill).
+            spill_dir (str, optional): Directory of the spill files. Defaults to None (the system temporary directory).
         """
-        self._buffer: list[tuple] = []
+        self._buffer: _deque = _deque()
         self._buffer_size: int = buffer_size
+        self._buffer_bytes: int = 0
+        self._memory_chunks: int = 0
+        self._spill: _SpillStore = _SpillStore(spill_bytes, spill_dir) if spill_bytes else None
+        self._max_buffer_bytes: int = max_buffer_bytes
         self._workers: list = []
+        self._linked: list['Monitor'] = []
         self._producers_online: int = 0
-        self._mutex: _Semaphore = _Semaphore(1)
-        self._full: _Condition = _Condition(self._mutex)
-        self._empty: _Condition = _Condition(self._mutex)
-        self._insert_query_available: _Condition = _Condition(self._mutex)
+        self._consumers_online: int = 0
+        self._mutex: _Lock = _Lock()
+        self._not_empty: _Condition = _Condition(self._mutex)
+        self._not_full: _Condition = _Condition(self._mutex)
+        self._metadata_available: _Condition = _Condition(self._mutex)
         self._end_process: _Event = _Event()
+        self._stopped: bool = False
+        self._error: BaseException = None
         self._timeout: int = timeout
         self._insert_query = None
+        self._columns: list[str] = None
+        self._metrics: _PipelineMetrics = metrics
+        self._rows_written: int = 0
+        self._rows_read: int = 0
+        self._bytes_written: int = 0
+
+    def _is_full(self, size: int) -> bool:
+        if self._memory_chunks >= self._buffer_size:
+            return True
+        if self._max_buffer_bytes and self._memory_chunks:
+            return self._buffer_bytes + size > self._max_buffer_bytes
+        return False
 
     def write(self, data: object):
+        """
+        Append a chunk to the end of the buffer, blocking while the buffer is over its chunk or byte limit and, with a spill budget, the spill files are full as well.
+
+        If the pipeline is stopped while waiting, the chunk is discarded.
+        """
+        size = estimate_size(data)
+        rows = _row_count(data)
+        payload = None
         with self._mutex:
-            if len(self._buffer) == self._buffer_size:
-                self._empty.wait()
-            self._buffer.append(data)
-            self._full.notify()
+            waited_since = None
+            while not self._stopped:
+                if not self._is_full(size):
+                    self._buffer.append((data, size, rows, None))
+                    self._buffer_bytes += size
+                    self._memory_chunks += 1
+                    break
+                if self._spill is not None:
+                    if payload is None:
+                        # Serialize without holding the mutex, then re-check the buffer.
+                        self._mutex.release()
+                        try:
+                            payload = self._spill.dumps(data)
+                        finally:
+                            self._mutex.acquire()
+                        continue
+                    location = self._spill.append(payload)
+                    if location is not None:
+                        self._buffer.append((None, size, rows, location))
+                        break
+                if waited_since is None:
+                    waited_since = time.perf_counter()
+                self._not_full.wait(self._timeout)
+            if self._stopped:
+                return
+            self._rows_written += rows
+            self._bytes_written += size
+            self._not_empty.notify()
+            self._record(waited_since)
 
     def read(self):
         """
-        Retrieve and remove an item from the buffer, blocking if the buffer is empty and producers are still active.
-        
+        Retrieve and remove the oldest chunk from the buffer, blocking while the buffer is empty and producers are still active.
+
         Returns:
-            The next item from the buffer, or None if the buffer is empty and no producers remain.
+            The next chunk from the buffer, or None once the buffer is drained and no producers remain, or the pipeline was stopped.
         """
-        data = None
         with self._mutex:
-            if len(self._buffer) == 0 and self._producers_online > 0:
-                self._full.wait()
-            if self._buffer:
-                data = self._buffer.pop()
-                self._empty.notify()
-            elif self._producers_online <= 0:
-                self.stop_all_workers()
-            
+            waited_since = time.perf_counter() if not self._buffer else None
+            while not self._buffer and self._producers_online > 0 and not self._stopped:
+                self._not_empty.wait(self._timeout)
+            if self._stopped or not self._buffer:
+                return None
+            data, size, rows, location = self._buffer.popleft()
+            payload = None
+            if location is None:
+                self._buffer_bytes -= size
+                self._memory_chunks -= 1
+            else:
+                payload = self._spill.read(location)
+            self._rows_read += rows
+            self._not_full.notify()
+            self._record(waited_since)
+
+        if payload is not None:
+            data = self._spill.loads(payload)
+
         return data
-    
+
+    def _record(self, waited_since: float):
+        if self._metrics is None:
+            return
+        if waited_since is not None:
+            self._metrics.record_blocked(_current_worker_name(), time.perf_counter() - waited_since)
+        self._metrics.sample_queue(self._memory_chunks, self._buffer_bytes)
+
     def notify_all(self):
         """
-        Notify all threads waiting on buffer state changes and release the mutex.
-        
-        This method releases the internal mutex and wakes all threads waiting on both the full and empty condition variables. Exceptions during this process are silently ignored.
+        Wake every thread waiting on the buffer or on the pipeline metadata so it can re-check the pipeline state.
         """
-        try:
-            self._mutex.release()
-            self._full.notify_all()
-            self._empty.notify_all()
-        except:
-            pass
+        with self._mutex:
+            self._not_empty.notify_all()
+            self._not_full.notify_all()
+            self._metadata_available.notify_all()
 
-    def stop_all_workers(self):        
+    def stop_all_workers(self, error: BaseException = None):
         """
-        Stops all subscribed workers, notifies waiting threads, and signals the end of processing.
+        Stop the pipeline: discard buffered chunks, stop all subscribed workers and wake every waiting thread.
+
+        Parameters:
+            error (BaseException, optional): The failure that caused the stop. The first error recorded is re-raised by wait_for_completion.
         """
+        with self._mutex:
+            already_stopped = self._stopped
+            self._stopped = True
+            if error is not None and self._error is None:
+                self._error = error
+            self._buffer.clear()
+            self._buffer_bytes = 0
+            self._memory_chunks = 0
+            if self._spill is not None:
+                self._spill.close()
+
         for worker in self._workers:
             worker.stop()
         self.notify_all()
+        if not already_stopped:
+            for monitor in self._linked:
+                monitor.stop_all_workers(error)
+
+    def link(self, other: 'Monitor', both_ways: bool = True):
+        """
+        Link two monitors of one pipeline, e.g. the monitors before and after a transform stage, so stopping either one stops the other with the same error.
 
-        self._end_process.set()
+        Parameters:
+            other (Monitor): Monitor to link.
+            both_ways (bool, optional): Also stop this monitor when the other one stops. Without it, only stopping this monitor stops the other, e.g. from the monitor of a fan-out to the monitor of one of its targets. Defaults to True.
+        """
+        self._linked.append(other)
+        if both_ways:
+            other._linked.append(self)
 
     def producer_end_process(self):
+        """
+        Record that a producer finished writing. Once the last producer ends, waiting consumers are woken to drain the buffer.
+        """
         with self._mutex:
             self._producers_online -= 1
+            if self._producers_online <= 0:
+                self._not_empty.notify_all()
 
-    def subscribe(self, worker):
-        if worker.is_producer:
+    def register_producer(self):
+        """
+        Count a producer subscribed to another monitor, e.g. a TransformWorker reading from an upstream monitor and writing to this one. It is started by its own monitor and must call producer_end_process when it finishes.
+        """
+        with self._mutex:
             self._producers_online += 1
-        self._workers.append(worker)
-            
+
+    def subscribe(self, worker):
+        with self._mutex:
+            if worker.is_producer:
+                self._producers_online += 1
+            else:
+                self._consumers_online += 1
+            self._workers.append(worker)
+
+    def add_worker(self, worker) -> bool:
+        """
+        Subscribe and start a worker while the pipeline is running, e.g. an extra consumer started by the adaptive controller.
+
+        Returns:
+            bool: False if the worker was not added because the producers already finished or the pipeline was stopped.
+        """
+        with self._mutex:
+            if self._stopped or self._producers_online <= 0:
+                return False
+            if worker.is_producer:
+                self._producers_online += 1
+            else:
+                self._consumers_online += 1
+            self._workers.append(worker)
+            worker.start()
+
+        return True
+
+    def stats(self) -> dict:
+        """
+        Return a snapshot of the buffer occupancy and of the rows and bytes that went through it, used to tune the pipeline at runtime.
+        """
+        with self._mutex:
+            return {
+                'chunks': self._memory_chunks,
+                'bytes': self._buffer_bytes,
+                'spilled_chunks': self._spill.chunks if self._spill is not None else 0,
+                'spill_bytes': self._spill.allocated_bytes if self._spill is not None else 0,
+                'buffer_size': self._buffer_size,
+                'max_buffer_bytes': self._max_buffer_bytes,
+                'rows_written': self._rows_written,
+                'rows_read': self._rows_read,
+                'bytes_written': self._bytes_written,
+                'producers_online': self._producers_online,
+                'consumers_online': self._consumers_online,
+            }
+
+    @property
+    def workers(self) -> list:
+        return list(self._workers)
+
     def start(self):
         """
         Start all subscribed worker threads managed by the monitor.
@@ -94,19 +318,68 @@ class Monitor:
     def set_insert_query(self, query: str):
         with self._mutex:
             self._insert_query = query
-            self._insert_query_available.notify_all()
+            self._metadata_available.notify_all()
 
     def get_insert_query(self):
+        """
+        Return the insert query published by the producer, blocking until it is available or the pipeline is stopped.
+        """
         with self._mutex:
-            if not self._insert_query:
-                self._insert_query_available.wait()
+            while not self._insert_query and not self._stopped:
+                self._metadata_available.wait(self._timeout)
             query = self._insert_query
 
         return query
 
+    def set_columns(self, columns: list[str]):
+        """
+        Publish the column names of the rows written to the buffer and wake any consumer waiting for them.
+        """
+        with self._mutex:
+            self._columns = list(columns)
+            self._metadata_available.notify_all()
+
+    def get_columns(self) -> list[str]:
+        """
+        Return the column names published by the producer, blocking until they are available or the pipeline is stopped.
+        """
+        with self._mutex:
+            while not self._columns and not self._stopped:
+                self._metadata_available.wait(self._timeout)
+            columns = self._columns
+
+        return columns
+
     def wait_for_completion(self):
+        """
+        Block until every consumer has signalled the end of its processing and all workers have exited.
+
+        Raises:
+            RuntimeError: If the pipeline was stopped because a worker failed.
+        """
         self._end_process.wait()
-    
-    def signal_end_process(self): 
-        self._end_process.set()
-        
\ No newline at end of file
+        for worker in self._workers:
+            worker.join()
+        if self._spill is not None:
+            with self._mutex:
+                self._spill.close()
+
+        if self._error is not None:
+            raise RuntimeError(f"Pipeline stopped after a worker failed: {self._error}") from self._error
+
+    def signal_end_process(self):
+        """
+        Record that a consumer finished. The end of the process is signalled only after every consumer has called this method.
+        """
+        with self._mutex:
+            self._consumers_online -= 1
+            if self._consumers_online <= 0:
+                self._end_process.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def metrics(self) -> _PipelineMetrics:
+        return self._metrics
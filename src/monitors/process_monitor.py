@@ -0,0 +1,296 @@
+import os
+import time
+import pickle
+import multiprocessing as _mp
+from queue import Empty as _Empty, Full as _Full
+from threading import Lock as _Lock
+from multiprocessing import resource_tracker as _resource_tracker
+from multiprocessing.shared_memory import SharedMemory as _SharedMemory
+from src.utils.metrics.pipeline_metrics import (
+    PipelineMetrics as _PipelineMetrics,
+    current_worker_name as _current_worker_name
+)
+
+
+# Consumer processes start from a fresh interpreter instead of a fork of the parent: producer threads, and the other
+# stages of a batch, may hold locks (logging, pools, schema cache) that a forked child would inherit held forever.
+PROCESS_CONTEXT = _mp.get_context('forkserver' if 'forkserver' in _mp.get_all_start_methods() else 'spawn')
+
+
+class ProcessMonitor:
+    def __init__(self, buffer_size: int, timeout: int = 5, metrics: _PipelineMetrics = None):
+        """
+        Initialize a ProcessMonitor that coordinates producer threads in the parent process with consumer processes.
+
+        Consumer processes are created from PROCESS_CONTEXT (forkserver, or spawn where it is missing), so they must be picklable and the main module of a script must be guarded by if __name__ == '__main__'.
+
+        It exposes the same API as Monitor. Each chunk is pickled once into a shared memory block and only the block name travels through a bounded multiprocessing queue, so chunks are not copied through a pipe. Consumers unlink each block once they have read it.
+
+        Parameters:
+            buffer_size (int): Maximum number of chunks waiting to be read by the consumer processes.
+            timeout (int, optional): Interval in seconds at which blocked workers re-check whether the pipeline was stopped. Defaults to 5.
+            metrics (_PipelineMetrics, optional): Collector of the pipeline metrics. Each consumer process records into its own copy, which is sent back and merged when the process ends. Defaults to None.
+        """
+        self._buffer_size: int = buffer_size
+        self._timeout: int = timeout
+        self._queue = PROCESS_CONTEXT.Queue(maxsize=buffer_size)
+        self._errors = PROCESS_CONTEXT.Queue()
+        self._metrics = metrics
+        self._metrics_queue = PROCESS_CONTEXT.Queue()
+        self._owner_pid = os.getpid()
+        self._process_metrics: _PipelineMetrics = None
+        self._stop_event = PROCESS_CONTEXT.Event()
+        self._end_process = PROCESS_CONTEXT.Event()
+        self._consumers_online = PROCESS_CONTEXT.Value('i', 0)
+        self._metadata_available = PROCESS_CONTEXT.Condition()
+        self._manager = PROCESS_CONTEXT.Manager()
+        self._metadata = self._manager.dict()
+        self._workers: list = []
+        self._producers_online: int = 0
+        self._lock: _Lock = _Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_workers'] = []
+        state['_lock'] = None
+        state['_manager'] = None
+        return state
+
+    def write(self, data: object):
+        """
+        Publish a chunk to the consumer processes through shared memory, blocking while the queue is full.
+
+        If the pipeline is stopped while waiting, the chunk is discarded and the local workers are stopped.
+        """
+        if isinstance(data, list):
+            data = [tuple(row) for row in data]
+        payload = pickle.dumps(data, protocol=5)
+
+        shm = _SharedMemory(create=True, size=max(len(payload), 1))
+        shm.buf[:len(payload)] = payload
+        handle = (shm.name, len(payload))
+        shm.close()
+
+        started = time.perf_counter()
+        while True:
+            if self._stop_event.is_set():
+                self._release(handle)
+                self._stop_local_workers()
+                return
+            try:
+                self._queue.put(handle, timeout=self._timeout)
+                break
+            except _Full:
+                continue
+
+        if self.metrics is not None:
+            self.metrics.record_blocked(_current_worker_name(), time.perf_counter() - started)
+            try:
+                self.metrics.sample_queue(self._queue.qsize())
+            except NotImplementedError:
+                pass
+
+    def read(self):
+        """
+        Retrieve the next chunk from the queue, blocking while it is empty.
+
+        Returns:
+            The next chunk, or None once the producers have finished or the pipeline was stopped.
+        """
+        started = time.perf_counter()
+        while not self._stop_event.is_set():
+            try:
+                handle = self._queue.get(timeout=self._timeout)
+            except _Empty:
+                continue
+            if self.metrics is not None:
+                self.metrics.record_blocked(_current_worker_name(), time.perf_counter() - started)
+            if handle is None:
+                return None
+
+            name, size = handle
+            shm = _SharedMemory(name=name)
+            view = shm.buf[:size]
+            try:
+                return pickle.loads(view)
+            finally:
+                view.release()
+                shm.close()
+                shm.unlink()
+
+        return None
+
+    def _release(self, handle: tuple):
+        try:
+            shm = _SharedMemory(name=handle[0])
+        except FileNotFoundError:
+            return
+        shm.close()
+        shm.unlink()
+
+    def _stop_local_workers(self):
+        for worker in self._workers:
+            worker.stop()
+
+    def notify_all(self):
+        """
+        Wake every process waiting on the pipeline metadata so it can re-check the pipeline state.
+        """
+        with self._metadata_available:
+            self._metadata_available.notify_all()
+
+    def stop_all_workers(self, error: BaseException = None):
+        """
+        Stop the pipeline in every process. Consumer processes observe the shared stop event; producer threads of the parent are stopped directly.
+
+        Parameters:
+            error (BaseException, optional): The failure that caused the stop, reported back to the parent process.
+        """
+        if error is not None:
+            self._errors.put(repr(error))
+        self._stop_event.set()
+        self._stop_local_workers()
+        self.notify_all()
+
+    def producer_end_process(self):
+        """
+        Record that a producer finished writing. Once the last producer ends, one end-of-stream marker is queued per consumer.
+        """
+        with self._lock:
+            self._producers_online -= 1
+            if self._producers_online > 0:
+                return
+
+        for _ in range(self._consumers_online.value):
+            while not self._stop_event.is_set():
+                try:
+                    self._queue.put(None, timeout=self._timeout)
+                    break
+                except _Full:
+                    continue
+
+    def subscribe(self, worker):
+        if worker.is_producer:
+            self._producers_online += 1
+        else:
+            with self._consumers_online.get_lock():
+                self._consumers_online.value += 1
+        self._workers.append(worker)
+
+    def start(self):
+        """
+        Start all subscribed worker threads and processes managed by the monitor.
+
+        The shared memory resource tracker is started first so every consumer process shares it and blocks unlinked by consumers are not reported as leaked.
+        """
+        _resource_tracker.ensure_running()
+        for worker in self._workers:
+            worker.start()
+
+    def _set_metadata(self, key: str, value: object):
+        with self._metadata_available:
+            self._metadata[key] = value
+            self._metadata_available.notify_all()
+
+    def _get_metadata(self, key: str):
+        with self._metadata_available:
+            while key not in self._metadata and not self._stop_event.is_set():
+                self._metadata_available.wait(self._timeout)
+            return self._metadata.get(key)
+
+    def set_insert_query(self, query: str):
+        self._set_metadata('insert_query', query)
+
+    def get_insert_query(self):
+        return self._get_metadata('insert_query')
+
+    def set_columns(self, columns: list[str]):
+        self._set_metadata('columns', list(columns))
+
+    def get_columns(self) -> list[str]:
+        return self._get_metadata('columns')
+
+    def wait_for_completion(self):
+        """
+        Block until every consumer process has finished and all workers have exited, then release the shared resources.
+
+        Raises:
+            RuntimeError: If a worker failed or a consumer process exited abnormally.
+        """
+        try:
+            processes = [w for w in self._workers if isinstance(w, PROCESS_CONTEXT.Process)]
+            while not self._end_process.wait(self._timeout):
+                if processes and not any(p.is_alive() for p in processes):
+                    self.stop_all_workers()
+                    break
+            self._collect_metrics(len(processes))
+            for worker in self._workers:
+                worker.join()
+
+            errors = []
+            while True:
+                try:
+                    errors.append(self._errors.get_nowait())
+                except _Empty:
+                    break
+            errors += [
+                f'{worker.name} exited with code {worker.exitcode}'
+                for worker in self._workers
+                if getattr(worker, 'exitcode', 0) not in (0, None)
+            ]
+            if errors:
+                raise RuntimeError(f"Pipeline stopped after a worker failed: {errors[0]}")
+        finally:
+            self._drain()
+            self._manager.shutdown()
+
+    def _collect_metrics(self, expected: int):
+        """
+        Merge the metrics sent back by the consumer processes. They are read before joining the processes, which cannot exit while their queue still holds unread data.
+        """
+        if self._metrics is None:
+            return
+        processes = [w for w in self._workers if isinstance(w, PROCESS_CONTEXT.Process)]
+        received = 0
+        while received < expected:
+            try:
+                self._metrics.merge(self._metrics_queue.get(timeout=self._timeout))
+                received += 1
+            except _Empty:
+                if not any(p.is_alive() for p in processes):
+                    break
+
+    def _drain(self):
+        while True:
+            try:
+                handle = self._queue.get_nowait()
+            except _Empty:
+                break
+            if handle is not None:
+                self._release(handle)
+
+    def signal_end_process(self):
+        """
+        Record that a consumer finished, sending its metrics back to the parent process. The end of the process is signalled only after every consumer has called this method.
+        """
+        if self.metrics is not None:
+            self._metrics_queue.put(self.metrics)
+        with self._consumers_online.get_lock():
+            self._consumers_online.value -= 1
+            if self._consumers_online.value <= 0:
+                self._end_process.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop_event.is_set()
+
+    @property
+    def metrics(self) -> _PipelineMetrics:
+        """
+        The metrics collector of the calling process. A consumer process gets its own empty collector, so only what it recorded is merged back into the parent's.
+        """
+        if self._metrics is None or os.getpid() == self._owner_pid:
+            return self._metrics
+        if self._process_metrics is None:
+            self._process_metrics = _PipelineMetrics(self._metrics.job)
+        return self._process_metrics
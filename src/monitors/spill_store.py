@@ -0,0 +1,135 @@
+import os
+import mmap
+import pickle
+import tempfile
+
+
+class _Segment:
+    def __init__(self, directory: str, size: int) -> None:
+        """
+        Allocate a memory-mapped temporary file. The file is unlinked as soon as it is mapped, so its disk space is released when the mapping is closed, even if the process dies.
+        """
+        fd, path = tempfile.mkstemp(prefix='data_tools_spill_', dir=directory)
+        try:
+            os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+            os.unlink(path)
+        self.size = size
+        self.offset = 0
+        self.pending = 0
+        self.sealed = False
+
+    def close(self):
+        self.map.close()
+
+
+class SpillStore:
+    def __init__(self, max_bytes: int, directory: str = None, segment_bytes: int = 64 * 1024 * 1024) -> None:
+        """
+        Initialize a store of serialized chunks in memory-mapped temporary files, used by Monitor to hold the chunks over its in-memory budget.
+
+        Chunks are appended to the current segment and read back once each; a segment is unmapped, releasing its disk space, once every chunk it holds was read. The store is not thread safe: the monitor only uses it while holding its mutex.
+
+        Parameters:
+            max_bytes (int): Maximum disk space allocated to segments.
+            directory (str, optional): Directory of the temporary files. Defaults to None (the system temporary directory).
+            segment_bytes (int, optional): Size of a segment. A larger chunk gets a segment of its own. Defaults to 64 MiB.
+
+        Raises:
+            ValueError: If max_bytes or segment_bytes is not positive.
+        """
+        if max_bytes <= 0 or segment_bytes <= 0:
+            raise ValueError("max_bytes and segment_bytes must be positive")
+        self._max_bytes = max_bytes
+        self._directory = directory
+        self._segment_bytes = min(segment_bytes, max_bytes)
+        self._segments: list[_Segment] = []
+        self._current: _Segment = None
+        self._allocated = 0
+        self._chunks = 0
+
+    @staticmethod
+    def dumps(data: object) -> bytes:
+        """
+        Serialize a chunk. Called by producers outside of the monitor's mutex.
+        """
+        return pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def loads(payload: bytes) -> object:
+        return pickle.loads(payload)
+
+    def append(self, payload: bytes) -> tuple:
+        """
+        Copy a serialized chunk to the current segment, allocating a new segment when it does not fit.
+
+        Returns:
+            tuple: The location of the chunk, to pass to read, or None when the disk budget is exhausted.
+        """
+        length = len(payload)
+        segment = self._current
+        if segment is None or segment.offset + length > segment.size:
+            size = max(self._segment_bytes, length)
+            if self._allocated + size > self._max_bytes:
+                return None
+            if segment is not None:
+                self._seal(segment)
+            segment = _Segment(self._directory, size)
+            self._segments.append(segment)
+            self._current = segment
+            self._allocated += size
+
+        offset = segment.offset
+        segment.map[offset:offset + length] = payload
+        segment.offset += length
+        segment.pending += 1
+        self._chunks += 1
+
+        return segment, offset, length
+
+    def read(self, location: tuple) -> bytes:
+        """
+        Copy a chunk out of its segment and release it. The segment is unmapped once all its chunks were read.
+        """
+        segment, offset, length = location
+        payload = segment.map[offset:offset + length]
+        segment.pending -= 1
+        self._chunks -= 1
+        if segment.pending == 0:
+            if segment.sealed:
+                self._release(segment)
+            else:
+                segment.offset = 0
+
+        return payload
+
+    def _seal(self, segment: _Segment):
+        segment.sealed = True
+        if segment.pending == 0:
+            self._release(segment)
+
+    def _release(self, segment: _Segment):
+        segment.close()
+        self._segments.remove(segment)
+        self._allocated -= segment.size
+
+    @property
+    def chunks(self) -> int:
+        return self._chunks
+
+    @property
+    def allocated_bytes(self) -> int:
+        return self._allocated
+
+    def close(self):
+        """
+        Unmap every segment, discarding the chunks not read yet.
+        """
+        for segment in self._segments:
+            segment.close()
+        self._segments.clear()
+        self._current = None
+        self._allocated = 0
+        self._chunks = 0
@@ -0,0 +1,3 @@
+from .stage_job import StageJob
+from .job_scheduler import JobScheduler
+from .distributed_copy import DistributedCopyCoordinator, DistributedCopyWorker
@@ -0,0 +1,298 @@
+import os
+import time
+import socket
+import uuid
+from threading import (
+    Event as _Event,
+    Thread as _Thread
+)
+from sqlalchemy.engine import Engine as _Engine
+from src.utils.log.log_utils import LogUtils as _LogUtils
+from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.state.work_queue import WorkQueue as _WorkQueue
+from src.templates.template_stage_copy_table_multithread import (
+    StageCopyTableMultiThread as _StageCopyTableMultiThread,
+    UPSERT_STRATEGIES as _UPSERT_STRATEGIES
+)
+
+
+class DistributedCopyCoordinator:
+    def __init__(
+        self,
+        table_name_source: str,
+        table_name_target: str,
+        conn_input: _Engine,
+        conn_output: _Engine,
+        work_queue: _WorkQueue,
+        table_manager: _TableManager,
+        log_utils: _LogUtils,
+        split_column: str,
+        ranges: int = 64,
+        job_id: str = None,
+        load_strategy: str = 'insert',
+        truncate: bool = True,
+        resume: bool = False,
+        consistent: bool = False,
+        max_attempts: int = 3,
+        poll_interval: float = 5
+    ) -> None:
+        """
+        Initialize the coordinator of a table copy spread over worker processes on any number of hosts.
+
+        The coordinator splits the source into ranges of an integer key, stores them in the work queue, truncates the target and waits while DistributedCopyWorker processes claim and copy the ranges. Use many more ranges than workers, so fast workers take more of them and a retried range is cheap.
+
+        Parameters:
+            table_name_source (str): Table to copy.
+            table_name_target (str): Table receiving the rows, with the split column.
+            work_queue (_WorkQueue): Control table shared with the workers.
+            split_column (str): Integer column splitting the source into ranges.
+            ranges (int, optional): Number of ranges. Defaults to 64.
+            job_id (str, optional): Job of the ranges in the work queue, given to the workers. Defaults to the target table name.
+            load_strategy (str, optional): Load strategy of the workers, used to skip the truncate of the upsert strategies. Defaults to 'insert'.
+            truncate (bool, optional): Truncate the target before the ranges are submitted, except with the upsert strategies. Defaults to True.
+            resume (bool, optional): Keep the ranges of an unfinished run of the job, so only the ranges not done are copied, without truncating. Ranges that failed on every attempt get new attempts. Defaults to False.
+            consistent (bool, optional): Export a snapshot of the source and hold it open until every range is done, so every worker reads the same data. The source and the coordinator must then stay up for the whole copy. Defaults to False (each range reads the data committed when it starts).
+            max_attempts (int, optional): Attempts of a range before it is given up. Defaults to 3.
+            poll_interval (float, optional): Seconds between two progress reads. Defaults to 5.
+        """
+        self._table_name_source = table_name_source
+        self._table_name_target = table_name_target
+        self._conn_input = conn_input
+        self._conn_output = conn_output
+        self._work_queue = work_queue
+        self._table_manager = table_manager
+        self._split_column = split_column
+        self._ranges = ranges
+        self._job_id = job_id or table_name_target
+        self._load_strategy = load_strategy
+        self._truncate = truncate
+        self._resume = resume
+        self._consistent = consistent
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._snapshot_conn = None
+        self._logger = log_utils.get_logger(__name__)
+
+    @property
+    def job_id(self) -> str:
+        return self._job_id
+
+    def prepare(self) -> int:
+        """
+        Create the control table, then submit the ranges of the job and truncate the target, or keep the unfinished ranges when resuming.
+
+        Returns:
+            int: Number of ranges left to copy.
+        """
+        self._work_queue.create_table()
+        snapshot_id = None
+        if self._consistent:
+            self._snapshot_conn, snapshot_id = self._table_manager.export_snapshot(self._conn_input)
+
+        progress = self._work_queue.get_progress(self._job_id, self._max_attempts)
+        left = sum(count for status, count in progress.items() if status != 'done')
+        if self._resume and left:
+            self._work_queue.reopen(self._job_id, snapshot_id)
+            self._logger.info(f"resuming job {self._job_id}: {progress['done']} ranges done, {left} left")
+            return left
+
+        predicates = self._table_manager.get_key_ranges(
+            conn=self._conn_input,
+            table_name=self._table_name_source,
+            key_column=self._split_column,
+            ranges=self._ranges
+        )
+        if self._truncate and self._load_strategy not in _UPSERT_STRATEGIES:
+            self._logger.info(f'truncating table: {self._table_name_target}...\n')
+            self._table_manager.truncate_table(self._conn_output, self._table_name_target)
+        self._work_queue.submit(self._job_id, predicates, snapshot_id)
+        self._logger.info(f'job {self._job_id}: {len(predicates)} ranges submitted to {self._work_queue.table_name}')
+
+        return len(predicates)
+
+    def wait(self) -> dict[str, int]:
+        """
+        Wait until every range is done or has no attempts left, logging the progress.
+
+        Returns:
+            dict[str, int]: The final ranges per status.
+
+        Raises:
+            RuntimeError: If ranges failed on every attempt.
+        """
+        last = None
+        while True:
+            progress = self._work_queue.get_progress(self._job_id, self._max_attempts)
+            if progress != last:
+                self._logger.info(f'job {self._job_id}: ' + ', '.join(f'{count} {status}' for status, count in progress.items()))
+                last = progress
+            if not progress['pending'] and not progress['running'] and not progress['failed']:
+                break
+            time.sleep(self._poll_interval)
+
+        if progress['exhausted']:
+            errors = self._work_queue.get_errors(self._job_id)
+            raise RuntimeError(
+                f"Ranges failed in job {self._job_id}: "
+                + '; '.join(f'range {range_id}: {error}' for range_id, error in errors.items())
+            )
+
+        return progress
+
+    def run(self) -> dict[str, int]:
+        """
+        Prepare the job and wait for the workers to copy every range.
+        """
+        start = time.time()
+        try:
+            self.prepare()
+            progress = self.wait()
+            self._logger.info(f'execution time: {time.time() - start}')
+            return progress
+        finally:
+            if self._snapshot_conn is not None:
+                self._snapshot_conn.close()
+                self._snapshot_conn = None
+
+
+class DistributedCopyWorker:
+    def __init__(
+        self,
+        job_id: str,
+        table_name_source: str,
+        table_name_target: str,
+        conn_input: _Engine,
+        conn_output: _Engine,
+        work_queue: _WorkQueue,
+        table_manager: _TableManager,
+        log_utils: _LogUtils,
+        worker_id: str = None,
+        lease_seconds: int = 300,
+        max_attempts: int = 3,
+        poll_interval: float = 5,
+        linger: bool = True,
+        **stage_kwargs
+    ) -> None:
+        """
+        Initialize a worker claiming the ranges of a distributed copy and copying each of them with a local StageCopyTableMultiThread pipeline.
+
+        Run any number of workers, in any number of processes and hosts, against the same work queue. While a range is copied, a thread renews its lease every third of lease_seconds; a range whose worker died is claimed again once its lease expired. A worker that finds its lease lost stops the copy of the range after the chunks in flight and abandons it to the new owner, without completing or failing it. A range loaded again after a failed or interrupted attempt first has its rows deleted from the target, unless the load strategy is an upsert.
+
+        Parameters:
+            job_id (str): Job of the ranges, as submitted by the coordinator.
+            work_queue (_WorkQueue): Control table shared with the coordinator.
+            worker_id (str, optional): Name of the worker in the control table. Defaults to host:pid:random suffix.
+            lease_seconds (int, optional): Seconds without heartbeat after which a claimed range is given to another worker. Defaults to 300.
+            max_attempts (int, optional): Attempts of a range before it is given up. Defaults to 3.
+            poll_interval (float, optional): Seconds between two claims while other workers still hold ranges. Defaults to 5.
+            linger (bool, optional): Keep polling while ranges are running elsewhere, to take over the ranges of dead workers, instead of exiting once nothing can be claimed. Defaults to True.
+            **stage_kwargs: Other StageCopyTableMultiThread arguments of the range stages (consumers, chunksize, load_strategy, ...).
+
+        Raises:
+            ValueError: If the stage arguments cannot be used per range.
+        """
+        for option in ('swap', 'partitioned', 'checkpoint_journal', 'incremental_column'):
+            if stage_kwargs.get(option):
+                raise ValueError(f"{option} cannot be used by the ranges of a distributed copy")
+        if stage_kwargs.get('load_strategy') == 'upsert_copy':
+            raise ValueError("upsert_copy cannot be used by the ranges of a distributed copy: they would share one staging table")
+        self._job_id = job_id
+        self._table_name_source = table_name_source
+        self._table_name_target = table_name_target
+        self._conn_input = conn_input
+        self._conn_output = conn_output
+        self._work_queue = work_queue
+        self._table_manager = table_manager
+        self._log_utils = log_utils
+        self._worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}'
+        self._lease_seconds = lease_seconds
+        self._max_attempts = max_attempts
+        self._poll_interval = poll_interval
+        self._linger = linger
+        self._stage_kwargs = stage_kwargs
+        self._abandoned = 0
+        self._logger = log_utils.get_logger(__name__)
+
+    @property
+    def worker_id(self) -> str:
+        return self._worker_id
+
+    def _keep_lease(self, range_id: int, stage: _StageCopyTableMultiThread, stop_event: _Event, lost: _Event):
+        while not stop_event.wait(self._lease_seconds / 3):
+            try:
+                if not self._work_queue.heartbeat(self._job_id, range_id, self._worker_id):
+                    lost.set()
+                    stage.stop(RuntimeError(f'lost the lease of range {range_id} of job {self._job_id}'))
+                    return
+            except Exception as e:
+                self._logger.warning(f'failed to renew the lease of range {range_id}: {e}')
+
+    def _copy_range(self, claimed: dict) -> bool:
+        range_id, predicate = claimed['range_id'], claimed['predicate']
+        self._logger.info(f"copying range {range_id} of job {self._job_id} (attempt {claimed['attempts']}): {predicate}")
+        stage = _StageCopyTableMultiThread(
+            table_name_source=self._table_name_source,
+            table_name_target=self._table_name_target,
+            conn_input=self._conn_input,
+            conn_output=self._conn_output,
+            log_utils=self._log_utils,
+            table_manager=self._table_manager,
+            job_id=f'{self._job_id}/{range_id}',
+            truncate=False,
+            where=predicate,
+            snapshot_id=claimed['snapshot_id'],
+            **self._stage_kwargs
+        )
+        stop_event, lost = _Event(), _Event()
+        heartbeat = _Thread(target=self._keep_lease, args=(range_id, stage, stop_event, lost), name=f'Lease-{range_id}', daemon=True)
+        heartbeat.start()
+        try:
+            if claimed['attempts'] > 1 and self._stage_kwargs.get('load_strategy') not in _UPSERT_STRATEGIES:
+                deleted = self._table_manager.delete_rows(self._conn_output, self._table_name_target, predicate)
+                self._logger.info(f'deleted {deleted} rows of the previous attempt of range {range_id}')
+            stage.run()
+        except Exception as e:
+            if lost.is_set():
+                self._abandoned += 1
+                self._logger.warning(f'abandoned range {range_id} of job {self._job_id}: its lease expired and another worker claimed it')
+                return False
+            self._logger.error(f'range {range_id} of job {self._job_id} failed: {e}')
+            self._work_queue.fail(self._job_id, range_id, self._worker_id, repr(e))
+            return False
+        finally:
+            stop_event.set()
+            heartbeat.join()
+
+        if not self._work_queue.complete(self._job_id, range_id, self._worker_id):
+            self._abandoned += 1
+            self._logger.warning(f'abandoned range {range_id} of job {self._job_id}: it was claimed by another worker while being copied')
+            return False
+
+        return True
+
+    def run(self) -> int:
+        """
+        Claim and copy ranges until none is left to claim, and, when lingering, no other worker holds one either.
+
+        A failed range is recorded in the work queue with its error and does not stop the worker.
+
+        Returns:
+            int: Number of ranges this worker copied.
+        """
+        copied = 0
+        self._logger.info(f'worker {self._worker_id} joining job {self._job_id}')
+        while True:
+            claimed = self._work_queue.claim(self._job_id, self._worker_id, self._lease_seconds, self._max_attempts)
+            if claimed is not None:
+                copied += self._copy_range(claimed)
+                continue
+            progress = self._work_queue.get_progress(self._job_id, self._max_attempts)
+            if not self._linger or not (progress['pending'] or progress['running'] or progress['failed']):
+                break
+            time.sleep(self._poll_interval)
+
+        self._logger.info(
+            f'worker {self._worker_id} copied {copied} ranges of job {self._job_id}, abandoned {self._abandoned} whose lease was lost'
+        )
+
+        return copied
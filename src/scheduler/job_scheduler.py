@@ -0,0 +1,208 @@
+import time
+from concurrent.futures import (
+    ThreadPoolExecutor as _ThreadPoolExecutor,
+    FIRST_COMPLETED as _FIRST_COMPLETED,
+    wait as _wait
+)
+from src.utils.log.log_utils import LogUtils as _LogUtils
+from src.utils.table.table_manager import TableManager as _TableManager
+from .stage_job import StageJob as _StageJob
+
+
+class JobScheduler:
+    def __init__(
+        self,
+        max_source_connections: int,
+        max_target_connections: int,
+        table_manager: _TableManager,
+        log_utils: _LogUtils,
+        max_parallel_jobs: int = None
+    ) -> None:
+        """
+        Initialize a scheduler running a DAG of stage jobs concurrently under a global connection budget.
+
+        A job starts once all its dependencies succeeded and enough connections are free. Among ready jobs, the one with the heaviest remaining chain of work (its own estimated size plus the heaviest chain of jobs depending on it) starts first, so the largest tables do not end up running alone at the end of the batch. Target connections are split evenly between the jobs that can run, within each job's consumer bounds.
+
+        Parameters:
+            max_source_connections (int): Cap on connections held by producers of all running jobs.
+            max_target_connections (int): Cap on connections held by consumers of all running jobs.
+            table_manager (_TableManager): Manager used to read the pg_class size estimates.
+            log_utils (_LogUtils): Logging utilities.
+            max_parallel_jobs (int, optional): Cap on jobs running at the same time. Defaults to None (bounded by the connection budget only).
+        """
+        self._max_source_connections = max_source_connections
+        self._max_target_connections = max_target_connections
+        self._max_parallel_jobs = max_parallel_jobs
+        self._table_manager = table_manager
+        self._logger = log_utils.get_logger(__name__)
+        self._jobs: dict[str, _StageJob] = {}
+
+    def add_job(self, job: _StageJob) -> None:
+        """
+        Register a job.
+
+        Raises:
+            ValueError: If a job with the same id was already added, or the job cannot fit in the connection budget.
+        """
+        if job.job_id in self._jobs:
+            raise ValueError(f"Job {job.job_id} already added")
+        if job.source_connections > self._max_source_connections:
+            raise ValueError(f"Job {job.job_id} needs {job.source_connections} source connections, above the budget of {self._max_source_connections}")
+        if job.target_connections(job.min_consumers) > self._max_target_connections:
+            raise ValueError(
+                f"Job {job.job_id} needs {job.target_connections(job.min_consumers)} target connections, above the budget of {self._max_target_connections}"
+            )
+        self._jobs[job.job_id] = job
+
+    def _topological_order(self) -> list[str]:
+        """
+        Order the jobs so every job comes after its dependencies.
+
+        Raises:
+            ValueError: If a dependency is unknown or the dependencies form a cycle.
+        """
+        pending = {job_id: set(job.depends_on) for job_id, job in self._jobs.items()}
+        for job_id, dependencies in pending.items():
+            unknown = dependencies - self._jobs.keys()
+            if unknown:
+                raise ValueError(f"Job {job_id} depends on unknown jobs {sorted(unknown)}")
+
+        order = []
+        while pending:
+            ready = [job_id for job_id, dependencies in pending.items() if not dependencies]
+            if not ready:
+                raise ValueError(f"Dependency cycle between jobs {sorted(pending)}")
+            for job_id in ready:
+                order.append(job_id)
+                del pending[job_id]
+            for dependencies in pending.values():
+                dependencies.difference_update(ready)
+
+        return order
+
+    def _estimate_sizes(self) -> dict[str, int]:
+        """
+        Read the size of every source table from pg_class, with one catalog query per source engine.
+        """
+        sizes = {job_id: job.estimated_bytes or 0 for job_id, job in self._jobs.items()}
+        by_engine: dict = {}
+        for job in self._jobs.values():
+            if job.estimated_bytes is None and job.source_table and job.source_engine is not None:
+                by_engine.setdefault(job.source_engine, []).append(job)
+
+        for engine, jobs in by_engine.items():
+            estimates = self._table_manager.get_table_size_estimates(engine, [job.source_table for job in jobs])
+            for job in jobs:
+                sizes[job.job_id] = estimates.get(job.source_table, (0, 0))[1]
+
+        return sizes
+
+    def _priorities(self, order: list[str], sizes: dict[str, int]) -> dict[str, int]:
+        dependents: dict[str, list[str]] = {job_id: [] for job_id in self._jobs}
+        for job_id, job in self._jobs.items():
+            for dependency in job.depends_on:
+                dependents[dependency].append(job_id)
+
+        priorities = {}
+        for job_id in reversed(order):
+            priorities[job_id] = sizes[job_id] + max((priorities[d] for d in dependents[job_id]), default=0)
+
+        return priorities
+
+    def run(self, raise_on_failure: bool = True) -> dict[str, dict]:
+        """
+        Run every job, respecting dependencies and the connection budget, until all jobs have finished or been skipped.
+
+        A failed job does not stop the batch; the jobs depending on it, directly or not, are skipped.
+
+        Parameters:
+            raise_on_failure (bool, optional): Raise once the batch is over if any job failed. Defaults to True.
+
+        Returns:
+            dict[str, dict]: Per job id, its status ('succeeded', 'failed' or 'skipped'), granted consumers per stage, duration and error.
+
+        Raises:
+            ValueError: If the dependencies are invalid.
+            RuntimeError: If raise_on_failure is set and a job failed.
+        """
+        order = self._topological_order()
+        sizes = self._estimate_sizes()
+        priorities = self._priorities(order, sizes)
+
+        results = {job_id: {'status': 'pending', 'consumers': None, 'seconds': None, 'error': None} for job_id in order}
+        source_free = self._max_source_connections
+        target_free = self._max_target_connections
+        running = {}
+        start = time.time()
+
+        def dependencies_state(job):
+            states = {results[d]['status'] for d in job.depends_on}
+            if states & {'failed', 'skipped'}:
+                return 'skipped'
+            return 'ready' if states <= {'succeeded'} else 'waiting'
+
+        def run_job(job, consumers):
+            job_start = time.time()
+            try:
+                job.stage_factory(consumers).run()
+            finally:
+                results[job.job_id]['seconds'] = time.time() - job_start
+
+        workers = self._max_parallel_jobs or len(order) or 1
+        with _ThreadPoolExecutor(max_workers=workers, thread_name_prefix='JobScheduler') as executor:
+            while True:
+                pending = [job_id for job_id in order if results[job_id]['status'] == 'pending']
+                for job_id in pending:
+                    if dependencies_state(self._jobs[job_id]) == 'skipped':
+                        results[job_id]['status'] = 'skipped'
+                        self._logger.warning(f'job {job_id} skipped: a dependency did not succeed')
+
+                ready = sorted(
+                    (job_id for job_id in pending
+                     if results[job_id]['status'] == 'pending' and dependencies_state(self._jobs[job_id]) == 'ready'),
+                    key=lambda job_id: priorities[job_id],
+                    reverse=True
+                )
+
+                runnable = min(len(ready) + len(running), workers)
+                for job_id in ready:
+                    job = self._jobs[job_id]
+                    if self._max_parallel_jobs and len(running) >= self._max_parallel_jobs:
+                        break
+                    if job.source_connections > source_free or job.target_connections(job.min_consumers) > target_free:
+                        continue
+                    share = self._max_target_connections // max(runnable, 1) // job.parallel_stages
+                    consumers = min(max(share, job.min_consumers), job.max_consumers, target_free // job.parallel_stages)
+
+                    source_free -= job.source_connections
+                    target_free -= job.target_connections(consumers)
+                    results[job_id].update(status='running', consumers=consumers)
+                    self._logger.info(
+                        f'starting job {job_id} with {consumers} consumers '
+                        f'(estimated {sizes[job_id]} bytes, priority {priorities[job_id]})'
+                    )
+                    running[executor.submit(run_job, job, consumers)] = job
+
+                if not running:
+                    break
+
+                done, _ = _wait(running, return_when=_FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    source_free += job.source_connections
+                    target_free += job.target_connections(results[job.job_id]['consumers'])
+                    error = future.exception()
+                    if error is None:
+                        results[job.job_id]['status'] = 'succeeded'
+                        self._logger.info(f"job {job.job_id} succeeded in {results[job.job_id]['seconds']:.1f}s")
+                    else:
+                        results[job.job_id].update(status='failed', error=repr(error))
+                        self._logger.error(f'job {job.job_id} failed: {error}')
+
+        self._logger.info(f'batch finished in {time.time() - start:.1f}s')
+
+        failed = [job_id for job_id, result in results.items() if result['status'] == 'failed']
+        if failed and raise_on_failure:
+            raise RuntimeError(f"Jobs failed: {', '.join(failed)}")
+
+        return results
@@ -0,0 +1,121 @@
+from typing import Callable
+from sqlalchemy.engine import Engine as _Engine
+from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread as _StageCopyTableMultiThread
+
+
+class StageJob:
+    def __init__(
+        self,
+        job_id: str,
+        stage_factory: Callable[[int], object],
+        depends_on: list[str] = None,
+        source_table: str = None,
+        source_engine: _Engine = None,
+        producers: int = 1,
+        min_consumers: int = 1,
+        max_consumers: int = 8,
+        estimated_bytes: int = None,
+        parallel_stages: int = 1,
+        shared_snapshot: bool = False
+    ) -> None:
+        """
+        Describe one stage job of a batch run by JobScheduler.
+
+        The stage is built only when the job starts, by calling stage_factory with the number of consumers granted by the scheduler. The stage must not open more connections than it is granted: with adaptive consumers, the grant is their upper bound.
+
+        Parameters:
+            job_id (str): Unique identifier of the job, referenced by the depends_on of other jobs.
+            stage_factory (Callable[[int], object]): Function taking the number of consumers and returning a stage with a run() method.
+            depends_on (list[str], optional): Jobs that must succeed before this one starts.
+            source_table (str, optional): Source table whose pg_class estimates rank the job. Defaults to None.
+            source_engine (_Engine, optional): Engine of the source database, used to read the estimates.
+            producers (int, optional): Number of source connections held by the job's producers. Defaults to 1.
+            min_consumers (int, optional): Fewest consumers the job can run with. Defaults to 1.
+            max_consumers (int, optional): Most consumers the job can use. Defaults to 8.
+            estimated_bytes (int, optional): Size of the job, overriding the pg_class estimate.
+            parallel_stages (int, optional): Pipelines the job runs at the same time, e.g. the partitions of a partitioned copy, each with the producers and the granted consumers. Defaults to 1.
+            shared_snapshot (bool, optional): The job holds a snapshot connection for its whole run even with a single producer, as a partitioned copy does. Defaults to False.
+
+        Raises:
+            ValueError: If the consumer bounds are inconsistent.
+        """
+        if not 1 <= min_consumers <= max_consumers:
+            raise ValueError(f"Job {job_id} requires 1 <= min_consumers <= max_consumers")
+        if parallel_stages < 1:
+            raise ValueError(f"Job {job_id} requires parallel_stages >= 1")
+        self.job_id = job_id
+        self.stage_factory = stage_factory
+        self.depends_on = list(depends_on or [])
+        self.source_table = source_table
+        self.source_engine = source_engine
+        self.producers = producers
+        self.min_consumers = min_consumers
+        self.max_consumers = max_consumers
+        self.estimated_bytes = estimated_bytes
+        self.parallel_stages = parallel_stages
+        self.shared_snapshot = shared_snapshot
+
+    @property
+    def source_connections(self) -> int:
+        """
+        Source connections held while the job runs: one per producer of every parallel stage, plus the snapshot connection of parallel producers.
+        """
+        return self.producers * self.parallel_stages + (1 if self.producers > 1 or self.shared_snapshot else 0)
+
+    def target_connections(self, consumers: int) -> int:
+        """
+        Target connections held while the job runs with the given consumers per stage.
+        """
+        return consumers * self.parallel_stages
+
+    @classmethod
+    def copy_table(
+        cls,
+        table_name_source: str,
+        table_name_target: str,
+        conn_input: _Engine,
+        conn_output: _Engine,
+        job_id: str = None,
+        depends_on: list[str] = None,
+        min_consumers: int = 1,
+        max_consumers: int = 8,
+        **stage_kwargs
+    ) -> 'StageJob':
+        """
+        Build a job running StageCopyTableMultiThread, ranked by the size of its source table.
+
+        The granted consumers also bound the adaptive consumers and the index builds of a swap. A partitioned copy counts its producers and consumers once per partition copied at a time.
+
+        Parameters:
+            job_id (str, optional): Defaults to the target table name.
+            min_consumers (int, optional): Fewest consumers per stage the job can run with. Defaults to 1.
+            max_consumers (int, optional): Most consumers per stage the job can use, adaptive consumers included. Defaults to 8.
+            **stage_kwargs: Other StageCopyTableMultiThread arguments (log_utils, table_manager, producers, load_strategy, ...). consumers is set by the scheduler.
+        """
+        partitioned = bool(stage_kwargs.get('partitioned'))
+        index_workers = stage_kwargs.pop('index_workers', 2)
+
+        def stage_factory(consumers: int):
+            return _StageCopyTableMultiThread(
+                table_name_source=table_name_source,
+                table_name_target=table_name_target,
+                conn_input=conn_input,
+                conn_output=conn_output,
+                consumers=consumers,
+                max_consumers=consumers,
+                index_workers=min(index_workers, consumers),
+                **stage_kwargs
+            )
+
+        return cls(
+            job_id=job_id or table_name_target,
+            stage_factory=stage_factory,
+            depends_on=depends_on,
+            source_table=table_name_source,
+            source_engine=conn_input,
+            producers=stage_kwargs.get('producers', 1),
+            min_consumers=min_consumers,
+            max_consumers=max_consumers,
+            parallel_stages=max(stage_kwargs.get('max_parallel_partitions', 4), 1) if partitioned else 1,
+            shared_snapshot=partitioned
+        )
@@ -3,9 +3,23 @@ from sqlalchemy.engine import Engine as _Engine
 
 from src.utils.table.table_manager import TableManager
 from src.monitors.monitor import Monitor
+from src.monitors.process_monitor import ProcessMonitor
+from src.monitors.adaptive_controller import AdaptiveController
 from src.utils.log.log_utils import LogUtils
+from src.utils.state.watermark_store import WatermarkStore
+from src.utils.metrics.pipeline_metrics import PipelineMetrics
+from src.utils.metrics.metrics_sinks import MetricsSink
+from src.utils.metrics.worker_profiler import WorkerProfiler
 from src.workers.sqlalchemy_producer import SQLAlchemyProducer
-from src.workers.sqlalchemy_consumer import SQLAlchemyConsumer
+from src.workers.sqlalchemy_consumer import SQLAlchemyConsumer, LOAD_STRATEGIES
+from src.workers.sqlalchemy_process_consumer import SQLAlchemyProcessConsumer
+from src.workers.transform_worker import TransformWorker
+from src.utils.transform.chunk_transform import ChunkTransform
+
+
+UPSERT_STRATEGIES = ('upsert', 'upsert_copy')
+
+AD_HOC_STRATEGIES = LOAD_STRATEGIES + ('upsert_copy',)
 
 
 class StageAdHocMultiThread:
@@ -20,8 +34,27 @@ class StageAdHocMultiThread:
         consumers: int = 2,
         monitor_timeout:int = 5,
         monitor_buffer_size: int = 10,
+        monitor_buffer_bytes: int = 256 * 1024 * 1024,
         max_rows_buffer:int = 100000,
-        chunksize: int = 20000
+        chunksize: int = 20000,
+        load_strategy: str = 'insert',
+        backend: str = 'thread',
+        chunk_format: str = 'rows',
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        incremental_column: str = None,
+        watermark_store: WatermarkStore = None,
+        job_id: str = None,
+        metrics_sinks: list[MetricsSink] = None,
+        adaptive: bool = False,
+        max_consumers: int = 8,
+        swap: bool = False,
+        index_workers: int = 2,
+        spill_bytes: int = None,
+        spill_dir: str = None,
+        transform: ChunkTransform = None,
+        transform_workers: int = 1,
+        profile_dir: str = None
     ) -> None:
         """
         Initialize a StageAdHocMultiThread instance for multi-threaded ETL processing.
@@ -32,8 +65,27 @@ class StageAdHocMultiThread:
             consumers (int, optional): Number of consumer threads to use. Defaults to 2.
             monitor_timeout (int, optional): Timeout in seconds for the monitor's polling interval. Defaults to 5.
             monitor_buffer_size (int, optional): Number of data chunks the monitor can buffer. Defaults to 10.
+            monitor_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks held in the monitor's buffer. Defaults to 256 MiB.
             max_rows_buffer (int, optional): Maximum number of rows to buffer in memory. Defaults to 100000.
             chunksize (int, optional): Number of rows per data chunk processed by the producer. Defaults to 20000.
+            load_strategy (str, optional): How consumers write chunks to the target: 'insert', 'copy_csv', 'copy_binary', 'upsert' or 'upsert_copy'. The upsert strategies merge rows on conflict_columns and never truncate the target: 'upsert' sends multi-row INSERT ... ON CONFLICT pages through a prepared statement, 'upsert_copy' COPYs every chunk into an UNLOGGED staging table and merges it into the target with a single statement at the end. Defaults to 'insert'.
+            backend (str, optional): Execution backend of the consumers: 'thread' or 'process' (one process and connection per consumer). Defaults to 'thread'.
+            chunk_format (str, optional): Format of the chunks passed from producers to consumers: 'rows' or 'columnar' (per-column NumPy arrays). Defaults to 'rows'.
+            conflict_columns (list[str], optional): Conflict key used by the upsert load strategies.
+            update_columns (list[str], optional): Columns overwritten on conflict by the upsert load strategies. Defaults to every column outside the conflict key.
+            incremental_column (str, optional): Watermark column (e.g. updated_at or a serial id). When set, only rows newer than the last persisted watermark are extracted and the target is not truncated; combine with load_strategy='upsert' to merge instead of append. Defaults to None (full reload).
+            watermark_store (WatermarkStore, optional): Store persisting the watermark between runs. Required with incremental_column.
+            job_id (str, optional): Key of the job in the watermark store and label of its metrics. Defaults to the target table name.
+            metrics_sinks (list[MetricsSink], optional): Sinks receiving the pipeline metrics (throughput, blocked time, queue depth, stage latencies) at the end of the run. Defaults to None (no metrics).
+            adaptive (bool, optional): Tune the pipeline at runtime: chunksize is sized from the observed row width and consumers are added or retired from the buffer occupancy, starting from `consumers`. Requires the 'thread' backend. Defaults to False.
+            max_consumers (int, optional): Upper bound of consumers, i.e. target connections, used by the adaptive controller. Defaults to 8.
+            swap (bool, optional): Load into an UNLOGGED shadow table without indexes instead of truncating the target, then build the target's indexes on it in parallel, set it LOGGED and swap it in place of the target in one transaction. Readers keep seeing the old rows until the swap. Not available with incremental_column or the upsert load strategies. Defaults to False.
+            index_workers (int, optional): Indexes built at the same time on the shadow table, each on its own connection. Defaults to 2.
+            spill_bytes (int, optional): Disk space the monitor can spill chunks to once its in-memory buffer is full, so extraction is not slowed down by the target and the source transaction ends early. Requires the 'thread' backend. Defaults to None (no spill).
+            spill_dir (str, optional): Directory of the spill files. Defaults to None (the system temporary directory).
+            transform (ChunkTransform, optional): Transformations (renames, casts, derived columns, filters, hashing, masking) applied to whole chunks by transform workers between the producers and the consumers, instead of in the source query. Requires the 'thread' backend. Defaults to None.
+            transform_workers (int, optional): Transform workers, scaled independently of the consumers. Defaults to 1.
+            profile_dir (str, optional): Sample the stacks of the pipeline threads and trace allocations during the run, then write per-thread collapsed stacks (flamegraph-ready), a summary and the top allocation sites to {profile_dir}/{job_id}. Consumer processes of the 'process' backend are not sampled. Adds overhead: use it to find hot paths, not in regular runs. Defaults to None (no profiling).
         
         This constructor sets up the ETL workflow configuration, including database connections, threading parameters, and logging.
         """
@@ -44,11 +96,53 @@ class StageAdHocMultiThread:
         self._consumers = consumers
         self._monitor_timeout = monitor_timeout
         self._monitor_buffer_size = monitor_buffer_size
+        self._monitor_buffer_bytes = monitor_buffer_bytes
         self._max_rows_buffer = max_rows_buffer
         self._chunksize = chunksize
+        if load_strategy not in AD_HOC_STRATEGIES:
+            raise ValueError(f"Invalid load strategy {load_strategy}. Use one of {', '.join(AD_HOC_STRATEGIES)}.")
+        if load_strategy in UPSERT_STRATEGIES and not conflict_columns:
+            raise ValueError(f"Load strategy {load_strategy} requires conflict_columns")
+        self._load_strategy = load_strategy
+        if backend not in ('thread', 'process'):
+            raise ValueError(f"Invalid backend {backend}. Use 'thread' or 'process'.")
+        self._backend = backend
+        if chunk_format not in ('rows', 'columnar'):
+            raise ValueError(f"Invalid chunk format {chunk_format}. Use 'rows' or 'columnar'.")
+        self._chunk_format = chunk_format
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+        if incremental_column and watermark_store is None:
+            raise ValueError("incremental_column requires a watermark_store")
+        self._incremental_column = incremental_column
+        self._watermark_store = watermark_store
+        self._job_id = job_id or table_name_target
+        self._watermark_predicate = None
+        if adaptive and backend != 'thread':
+            raise ValueError("adaptive requires the 'thread' backend")
+        self._adaptive = adaptive
+        self._max_consumers = max(max_consumers, consumers)
+        self._controller = None
+        if swap and (incremental_column or load_strategy in UPSERT_STRATEGIES):
+            raise ValueError("swap cannot be combined with incremental_column or the upsert load strategies")
+        if spill_bytes and backend != 'thread':
+            raise ValueError("spill_bytes requires the 'thread' backend")
+        if transform is not None and backend != 'thread':
+            raise ValueError("transform requires the 'thread' backend")
+        self._transform = transform
+        self._transform_workers = max(transform_workers, 1)
+        self._output_monitor = None
+        self._spill_bytes = spill_bytes
+        self._spill_dir = spill_dir
+        self._swap = swap
+        self._index_workers = index_workers
+        self._load_table = table_name_target
+        self._metrics_sinks = metrics_sinks or []
+        self._metrics = PipelineMetrics(job=self._job_id) if self._metrics_sinks else None
         self._table_manager = table_manager
         self._log_utils = log_utils
         self._logger = self._log_utils.get_logger(__name__)
+        self._profiler = WorkerProfiler(profile_dir, job=self._job_id, logger=self._logger) if profile_dir else None
             
     def init_services(self):
         """
@@ -56,29 +150,178 @@ class StageAdHocMultiThread:
         
         Sets up a monitor with the specified buffer size and timeout, subscribes a single SQLAlchemyProducer for data extraction, and subscribes multiple SQLAlchemyConsumer instances for data loading based on the configured number of consumers.
         """
-        self._monitor = Monitor(self._monitor_buffer_size, self._monitor_timeout)
+        if self._backend == 'process':
+            self._monitor = ProcessMonitor(self._monitor_buffer_size, self._monitor_timeout, self._metrics)
+            consumer_cls = SQLAlchemyProcessConsumer
+        else:
+            self._monitor = Monitor(
+                self._monitor_buffer_size, self._monitor_timeout, self._monitor_buffer_bytes, self._metrics,
+                self._spill_bytes, self._spill_dir
+            )
+            consumer_cls = SQLAlchemyConsumer
+
+        query = self._query
+        if self._watermark_predicate:
+            query = f"SELECT * FROM ({self._query}) AS incremental_source WHERE {self._watermark_predicate}"
 
         self._monitor.subscribe(
             SQLAlchemyProducer(
                 monitor=self._monitor,
                 engine=self._conn_input,
-                query=self._query,
+                query=query,
                 max_rows_buffer=self._max_rows_buffer,
                 chunksize=self._chunksize,
                 table_manager=self._table_manager,
-                table_target=self._table_name_target
+                table_target=self._load_table,
+                chunk_format=self._chunk_format
             )
         )
 
+        self._subscribe_transform_workers()
         for _ in range(self._consumers):
+            self._output_monitor.subscribe(self._create_consumer(consumer_cls))
+
+        if self._adaptive:
+            self._controller = AdaptiveController(
+                monitor=self._output_monitor,
+                consumer_factory=lambda: self._create_consumer(SQLAlchemyConsumer),
+                min_consumers=1,
+                max_consumers=self._max_consumers,
+                max_chunksize=max(self._chunksize, self._max_rows_buffer),
+                logger=self._logger
+            )
+
+    def _subscribe_transform_workers(self):
+        """
+        Put a second monitor between the producers and the consumers, with transform workers moving chunks from the first to the second. Without a transform the consumers read the producers' monitor directly.
+        """
+        self._output_monitor = self._monitor
+        if self._transform is None:
+            return
+
+        self._output_monitor = Monitor(
+            self._monitor_buffer_size, self._monitor_timeout, self._monitor_buffer_bytes, self._metrics
+        )
+        self._monitor.link(self._output_monitor)
+        for _ in range(self._transform_workers):
             self._monitor.subscribe(
-                SQLAlchemyConsumer(
+                TransformWorker(
                     monitor=self._monitor,
-                    engine=self._conn_output,
-                    table_manager=self._table_manager
+                    output_monitor=self._output_monitor,
+                    transform=self._transform,
+                    table_manager=self._table_manager,
+                    table_target=self._load_table,
+                    chunk_format=self._chunk_format
                 )
             )
+            self._output_monitor.register_producer()
+
+    def _start_monitors(self):
+        self._output_monitor.start()
+        if self._output_monitor is not self._monitor:
+            self._monitor.start()
+
+    def _wait_for_completion(self):
+        try:
+            self._monitor.wait_for_completion()
+        finally:
+            if self._output_monitor is not self._monitor:
+                self._output_monitor.wait_for_completion()
+
+    def _create_consumer(self, consumer_cls: type):
+        return consumer_cls(
+            monitor=self._output_monitor,
+            engine=self._conn_output,
+            table_manager=self._table_manager,
+            load_strategy='copy_binary' if self._load_strategy == 'upsert_copy' else self._load_strategy,
+            table_target=self._load_table,
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns
+        )
             
+    def _swap_shadow_table(self):
+        """
+        Build the target's indexes on the loaded shadow table and swap it in place of the target.
+        """
+        self._logger.info(f'building indexes on {self._load_table}...\n')
+        renames = self._table_manager.rebuild_indexes(
+            self._conn_output, self._table_name_target, self._load_table, self._index_workers
+        )
+        self._logger.info(f'swapping {self._load_table} into {self._table_name_target}...\n')
+        self._table_manager.swap_shadow_table(self._conn_output, self._table_name_target, self._load_table, renames)
+        self._load_table = self._table_name_target
+
+    def _create_staging_table(self):
+        self._load_table = self._table_manager.get_staging_table_name(self._table_name_target)
+        self._logger.info(f'creating staging table: {self._load_table}...\n')
+        self._table_manager.create_staging_table(self._conn_output, self._table_name_target, self._load_table)
+
+    def _merge_staging_table(self, columns: list[str]):
+        """
+        Merge the loaded columns of the staging table into the target with a single statement and drop it.
+        """
+        self._logger.info(f'merging {self._load_table} into {self._table_name_target}...\n')
+        merged = self._table_manager.merge_staging_table(
+            conn=self._conn_output,
+            staging_name=self._load_table,
+            table_name=self._table_name_target,
+            columns=columns,
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns
+        )
+        self._logger.info(f'{merged} rows merged')
+        self._load_table = self._table_name_target
+
+    def _drop_load_table(self):
+        if self._load_table == self._table_name_target:
+            return
+        try:
+            self._table_manager.drop_table(self._conn_output, self._load_table)
+        except Exception as e:
+            self._logger.warning(f'failed to drop work table {self._load_table}: {e}')
+        self._load_table = self._table_name_target
+
+    def _export_metrics(self):
+        """
+        Send the metrics of the run to the configured sinks. A failing sink is logged and does not fail the run.
+        """
+        if self._metrics is None or self._metrics.started_at is None:
+            return
+        self._metrics.finish()
+        try:
+            self._metrics.export(self._metrics_sinks)
+        except Exception as e:
+            self._logger.warning(f'failed to export metrics: {e}')
+
+    def _export_profile(self):
+        """
+        Stop the profiler and write its reports. A failing report is logged and does not fail the run.
+        """
+        if self._profiler is None:
+            return
+        try:
+            self._profiler.stop()
+        except Exception as e:
+            self._logger.warning(f'failed to write profile: {e}')
+
+    def _prepare_incremental(self, source: str) -> tuple:
+        """
+        Read the last persisted watermark and capture the current one from the source.
+
+        Rows are extracted in the interval (last watermark, current watermark], so rows committed during the run are picked up by the next one.
+
+        Returns:
+            tuple: The last and current watermarks. The current one is None when the source is empty.
+        """
+        low = self._watermark_store.get(self._job_id)
+        high = self._table_manager.get_column_max(self._conn_input, source, self._incremental_column)
+        self._watermark_predicate = self._table_manager.build_watermark_predicate(
+            self._incremental_column, low, high
+        )
+        self._logger.info(f'incremental column: {self._incremental_column} from {low} to {high}')
+
+        return low, high
+
     def run(self):
         """
         Executes the multi-threaded ETL process, including logging, service initialization, target table truncation, and monitoring until completion.
@@ -91,16 +334,54 @@ class StageAdHocMultiThread:
             self._logger.info(f'table target: {self._table_name_target}')
             self._logger.info(f'connection input: {self._conn_input.__repr__()}')
             self._logger.info(f'connection output: {self._conn_output.__repr__()}')
+            self._logger.info(f'load strategy: {self._load_strategy}')
+            self._logger.info(f'backend: {self._backend}')
+            if self._profiler is not None:
+                self._profiler.start()
+
+            low = high = None
+            if self._incremental_column:
+                low, high = self._prepare_incremental(self._query)
+                if high is None or (low is not None and high <= low):
+                    self._logger.info('no new rows since the last watermark, nothing to load\n')
+                    return
+
+            if self._swap:
+                self._load_table = self._table_manager.get_shadow_table_name(self._table_name_target)
+                self._logger.info(f'creating shadow table: {self._load_table}...\n')
+                self._table_manager.create_shadow_table(self._conn_output, self._table_name_target, self._load_table)
+            elif self._load_strategy == 'upsert_copy':
+                self._create_staging_table()
 
             self._logger.info('starting services...\n')
             self.init_services()
-            self._logger.info(f'truncating table: {self._table_name_target}...\n')
-            self._table_manager.truncate_table(self._conn_output, self._table_name_target)
+            if low is None and not self._swap and self._load_strategy not in UPSERT_STRATEGIES:
+                self._logger.info(f'truncating table: {self._table_name_target}...\n')
+                self._table_manager.truncate_table(self._conn_output, self._table_name_target)
             self._logger.info('processing etl...\n')
-            self._monitor.start()
-            self._monitor.wait_for_completion()
+            if self._metrics is not None:
+                self._metrics.start()
+            self._start_monitors()
+            if self._controller is not None:
+                self._controller.start()
+            # Read before waiting: a process monitor releases its shared metadata once completed.
+            loaded_columns = self._output_monitor.get_columns() if self._load_strategy == 'upsert_copy' else None
+            self._wait_for_completion()
+            if self._swap:
+                self._swap_shadow_table()
+            elif self._load_strategy == 'upsert_copy':
+                self._merge_staging_table(loaded_columns)
+            if self._incremental_column:
+                self._watermark_store.set(self._job_id, high)
+                self._logger.info(f'watermark saved: {high}')
             end = time.time() - start
             self._logger.info(f'execution time: {end}')
         except Exception as e: 
             self._logger.error(f'ETL process failed: {e}') 
+            self._drop_load_table()
             raise
+        finally:
+            if self._controller is not None:
+                self._controller.stop()
+            self._export_metrics()
+            self._export_profile()
@@ -0,0 +1,151 @@
+import time
+import asyncio
+from sqlalchemy.engine import Engine as _Engine
+from src.utils.log.log_utils import LogUtils
+from src.utils.table.table_manager import TableManager
+from src.monitors.async_monitor import AsyncMonitor
+from src.workers.async_producer import AsyncProducer
+from src.workers.async_consumer import AsyncConsumer
+
+
+UPSERT_STRATEGIES = ('upsert',)
+
+class StageCopyTableAsync:
+    def __init__(
+        self,
+        table_name_source: str,
+        table_name_target: str,
+        conn_input: _Engine,
+        conn_output: _Engine,
+        log_utils: LogUtils,
+        table_manager: TableManager,
+        consumers: int = 2,
+        monitor_buffer_size: int = 10,
+        monitor_buffer_bytes: int = 64 * 1024 * 1024,
+        chunksize: int = 20000,
+        load_strategy: str = 'insert',
+        driver: str = 'psycopg2_async',
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        truncate: bool = True
+    ) -> None:
+        """
+        Initialize a StageCopyTableAsync instance copying a table with asyncio tasks instead of threads.
+
+        The producer and consumers are tasks of the caller's event loop, so many copies can run concurrently in one thread (see run_stages) with one non-blocking connection per worker.
+
+        Parameters:
+            table_name_source (str): Name of the source table to copy data from.
+            table_name_target (str): Name of the target table to copy data into.
+            consumers (int, optional): Number of consumer tasks writing data. Defaults to 2.
+            monitor_buffer_size (int, optional): Maximum number of data chunks held in the monitor's buffer. Defaults to 10.
+            monitor_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks held in the monitor's buffer. Defaults to 64 MiB.
+            chunksize (int, optional): Number of rows to fetch per chunk from the source table. Defaults to 20000.
+            load_strategy (str, optional): 'insert', 'copy_csv', 'copy_binary' or 'upsert'. COPY strategies run in the event loop's thread pool. Defaults to 'insert'.
+            driver (str, optional): 'psycopg2_async' (non-blocking psycopg2) or 'executor' (blocking psycopg2 in the event loop's thread pool). Defaults to 'psycopg2_async'.
+            conflict_columns (list[str], optional): Conflict key used by the 'upsert' load strategy.
+            update_columns (list[str], optional): Columns overwritten on conflict by the 'upsert' load strategy.
+            truncate (bool, optional): Truncate the target before loading, except with the 'upsert' load strategy. Defaults to True.
+        """
+        self._table_name_source = table_name_source
+        self._table_name_target = table_name_target
+        self._conn_input = conn_input
+        self._conn_output = conn_output
+        self._consumers = consumers
+        self._monitor_buffer_size = monitor_buffer_size
+        self._monitor_buffer_bytes = monitor_buffer_bytes
+        self._chunksize = chunksize
+        self._load_strategy = load_strategy
+        self._driver = driver
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+        self._truncate = truncate
+        self._log_utils = log_utils
+        self._table_manager = table_manager
+        self._logger = self._log_utils.get_logger(__name__)
+
+    async def init_services(self):
+        """
+        Create the monitor, subscribe one producer reading the source table and the consumers writing to the target table.
+        """
+        loop = asyncio.get_running_loop()
+        columns = await loop.run_in_executor(
+            None, self._table_manager.get_table_columns, self._conn_input, self._table_name_source
+        )
+        query = self._table_manager.create_select_query(
+            table_name=self._table_name_source,
+            columns=list(columns)
+        )
+
+        self._monitor = AsyncMonitor(self._monitor_buffer_size, self._monitor_buffer_bytes)
+        self._monitor.subscribe(
+            AsyncProducer(
+                monitor=self._monitor,
+                engine=self._conn_input,
+                query=query,
+                chunksize=self._chunksize,
+                table_manager=self._table_manager,
+                table_target=self._table_name_target,
+                driver=self._driver
+            )
+        )
+
+        for _ in range(self._consumers):
+            self._monitor.subscribe(
+                AsyncConsumer(
+                    monitor=self._monitor,
+                    engine=self._conn_output,
+                    table_manager=self._table_manager,
+                    load_strategy=self._load_strategy,
+                    table_target=self._table_name_target,
+                    conflict_columns=self._conflict_columns,
+                    update_columns=self._update_columns,
+                    driver=self._driver
+                )
+            )
+
+    async def run(self):
+        try:
+            start = time.time()
+            self._logger.info(f'table source: {self._table_name_source}')
+            self._logger.info(f'table target: {self._table_name_target}')
+            self._logger.info(f'load strategy: {self._load_strategy}')
+            self._logger.info(f'driver: {self._driver}')
+
+            self._logger.info('starting services...\n')
+            await self.init_services()
+            if self._truncate and self._load_strategy not in UPSERT_STRATEGIES:
+                self._logger.info(f'truncating table: {self._table_name_target}...\n')
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._table_manager.truncate_table, self._conn_output, self._table_name_target
+                )
+            self._logger.info('processing etl...\n')
+            self._monitor.start()
+            await self._monitor.wait_for_completion()
+            end = time.time() - start
+            self._logger.info(f'execution time: {end}')
+        except Exception as e:
+            self._logger.error(f'ETL process failed: {e}')
+            raise
+
+
+async def run_stages(stages: list, max_concurrency: int = None) -> list:
+    """
+    Run many async stages concurrently on the current event loop.
+
+    Parameters:
+        stages (list): Stages exposing an async run(), e.g. StageCopyTableAsync.
+        max_concurrency (int, optional): Maximum number of stages running at the same time. Defaults to None (all at once).
+
+    Returns:
+        list: One entry per stage: None when it succeeded, or the exception it raised.
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or len(stages) or 1)
+
+    async def run_stage(stage):
+        async with semaphore:
+            await stage.run()
+
+    results = await asyncio.gather(*(run_stage(stage) for stage in stages), return_exceptions=True)
+
+    return [r if isinstance(r, BaseException) else None for r in results]
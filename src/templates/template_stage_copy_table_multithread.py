@@ -1,10 +1,30 @@
 import time
+from concurrent.futures import (
+    ThreadPoolExecutor as _ThreadPoolExecutor,
+    as_completed as _as_completed
+)
 from src.utils.log.log_utils import LogUtils
+from src.utils.state.watermark_store import WatermarkStore
+from src.utils.metrics.pipeline_metrics import PipelineMetrics
+from src.utils.metrics.metrics_sinks import MetricsSink
+from src.utils.metrics.worker_profiler import WorkerProfiler
+from src.utils.state.checkpoint_journal import CheckpointJournal
 from src.utils.table.table_manager import TableManager
 from sqlalchemy.engine import Engine as _Engine
 from src.monitors.monitor import Monitor
+from src.monitors.process_monitor import ProcessMonitor
+from src.monitors.adaptive_controller import AdaptiveController
 from src.workers.sqlalchemy_producer import SQLAlchemyProducer
-from src.workers.sqlalchemy_consumer import SQLAlchemyConsumer
+from src.workers.copy_passthrough_producer import CopyPassthroughProducer
+from src.workers.sqlalchemy_consumer import SQLAlchemyConsumer, LOAD_STRATEGIES, PASSTHROUGH_STRATEGIES
+from src.workers.sqlalchemy_process_consumer import SQLAlchemyProcessConsumer
+from src.workers.transform_worker import TransformWorker
+from src.utils.transform.chunk_transform import ChunkTransform
+
+
+UPSERT_STRATEGIES = ('upsert', 'upsert_copy')
+
+COPY_TABLE_STRATEGIES = LOAD_STRATEGIES + ('upsert_copy',) + PASSTHROUGH_STRATEGIES
 
 
 class StageCopyTableMultiThread:
@@ -19,8 +39,37 @@ class StageCopyTableMultiThread:
         consumers: int = 2,
         monitor_timeout:int = 5,
         monitor_buffer_size: int = 10,
+        monitor_buffer_bytes: int = 256 * 1024 * 1024,
         max_rows_buffer:int = 100000,
-        chunksize: int = 20000
+        chunksize: int = 20000,
+        load_strategy: str = 'insert',
+        producers: int = 1,
+        split_column: str = None,
+        backend: str = 'thread',
+        chunk_format: str = 'rows',
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        incremental_column: str = None,
+        watermark_store: WatermarkStore = None,
+        job_id: str = None,
+        checkpoint_journal: CheckpointJournal = None,
+        checkpoint_column: str = None,
+        resume: bool = False,
+        metrics_sinks: list[MetricsSink] = None,
+        adaptive: bool = False,
+        max_consumers: int = 8,
+        swap: bool = False,
+        index_workers: int = 2,
+        spill_bytes: int = None,
+        spill_dir: str = None,
+        partitioned: bool = False,
+        max_parallel_partitions: int = 4,
+        truncate: bool = True,
+        transform: ChunkTransform = None,
+        transform_workers: int = 1,
+        profile_dir: str = None,
+        where: str = None,
+        snapshot_id: str = None
     ) -> None:
         """
         Initialize a StageCopyTableMultiThread instance for multithreaded table copying.
@@ -31,8 +80,37 @@ class StageCopyTableMultiThread:
             consumers (int, optional): Number of consumer threads to use for writing data. Defaults to 2.
             monitor_timeout (int, optional): Timeout in seconds for the monitor's buffer operations. Defaults to 5.
             monitor_buffer_size (int, optional): Maximum number of data chunks held in the monitor's buffer. Defaults to 10.
+            monitor_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks held in the monitor's buffer. Defaults to 256 MiB.
             max_rows_buffer (int, optional): Maximum number of rows buffered before writing. Defaults to 100000.
             chunksize (int, optional): Number of rows to fetch per chunk from the source table. Defaults to 20000.
+            load_strategy (str, optional): How consumers write chunks to the target: 'insert', 'copy_csv', 'copy_binary', 'upsert', 'upsert_copy', or 'passthrough_binary' / 'passthrough_text' to stream rows from COPY TO STDOUT of the source to COPY FROM STDIN of the target without decoding them (source and target columns must match). The upsert strategies merge rows on conflict_columns and never truncate the target: 'upsert' sends multi-row INSERT ... ON CONFLICT pages through a prepared statement, 'upsert_copy' COPYs every chunk into an UNLOGGED staging table and merges it into the target with a single statement at the end. Defaults to 'insert'.
+            producers (int, optional): Number of producer threads reading disjoint ranges of the source table from one shared snapshot. Defaults to 1.
+            split_column (str, optional): Integer column used to split the source table between producers. When None, the table is split by ctid block ranges. Defaults to None.
+            backend (str, optional): Execution backend of the consumers: 'thread' or 'process' (one process and connection per consumer). Defaults to 'thread'.
+            chunk_format (str, optional): Format of the chunks passed from producers to consumers: 'rows' or 'columnar' (per-column NumPy arrays). Defaults to 'rows'.
+            conflict_columns (list[str], optional): Conflict key used by the upsert load strategies.
+            update_columns (list[str], optional): Columns overwritten on conflict by the upsert load strategies. Defaults to every column outside the conflict key.
+            incremental_column (str, optional): Watermark column (e.g. updated_at or a serial id). When set, only rows newer than the last persisted watermark are extracted and the target is not truncated; combine with load_strategy='upsert' to merge instead of append. Defaults to None (full reload).
+            watermark_store (WatermarkStore, optional): Store persisting the watermark between runs. Required with incremental_column.
+            job_id (str, optional): Key of the job in the watermark store and the checkpoint journal, and label of its metrics. Defaults to the target table name.
+            checkpoint_journal (CheckpointJournal, optional): Journal recording every chunk committed to the target, so an interrupted copy can be resumed. Defaults to None.
+            checkpoint_column (str, optional): Unique, non-null key column identifying the chunks in the journal. Each range is read ordered by it. Defaults to split_column.
+            resume (bool, optional): Resume the job from the journal: the saved ranges are reused, chunks already committed are not extracted again and the target is not truncated. Defaults to False.
+            metrics_sinks (list[MetricsSink], optional): Sinks receiving the pipeline metrics (throughput, blocked time, queue depth, stage latencies) at the end of the run. Defaults to None (no metrics).
+            adaptive (bool, optional): Tune the pipeline at runtime: chunksize is sized from the observed row width and consumers are added or retired from the buffer occupancy, starting from `consumers`. Requires the 'thread' backend. Defaults to False.
+            max_consumers (int, optional): Upper bound of consumers, i.e. target connections, used by the adaptive controller. Defaults to 8.
+            swap (bool, optional): Load into an UNLOGGED shadow table without indexes instead of truncating the target, then build the target's indexes on it in parallel, set it LOGGED and swap it in place of the target in one transaction. Readers keep seeing the old rows until the swap. Not available with incremental_column or the upsert load strategies. Defaults to False.
+            index_workers (int, optional): Indexes built at the same time on the shadow table, each on its own connection. Defaults to 2.
+            spill_bytes (int, optional): Disk space the monitor can spill chunks to once its in-memory buffer is full, so extraction is not slowed down by the target and the source transaction ends early. Requires the 'thread' backend. Defaults to None (no spill).
+            spill_dir (str, optional): Directory of the spill files. Defaults to None (the system temporary directory).
+            partitioned (bool, optional): When the source is declaratively partitioned, copy each leaf partition with its own producers and consumers, several at a time, straight into the target leaf partition with the same bounds, so rows skip the routing of the target parent. Source partitions without a matching target partition, or a target that is not partitioned, are loaded into the target table. Every partition reads one snapshot of the source, and the metrics and profile cover every partition. Not available with incremental_column, checkpoint_journal or swap. Defaults to False.
+            max_parallel_partitions (int, optional): Partitions copied at the same time, largest first. Each one holds its own producer and consumer connections. Defaults to 4.
+            truncate (bool, optional): Truncate the target before a full load, except with the upsert load strategies. Defaults to True.
+            transform (ChunkTransform, optional): Transformations (renames, casts, derived columns, filters, hashing, masking) applied to whole chunks by transform workers between the producers and the consumers, instead of in the source query. Requires the 'thread' backend. Defaults to None.
+            transform_workers (int, optional): Transform workers, scaled independently of the consumers. Defaults to 1.
+            profile_dir (str, optional): Sample the stacks of the pipeline threads and trace allocations during the run, then write per-thread collapsed stacks (flamegraph-ready), a summary and the top allocation sites to {profile_dir}/{job_id}. Consumer processes of the 'process' backend are not sampled. Adds overhead: use it to find hot paths, not in regular runs. Defaults to None (no profiling).
+            where (str, optional): Predicate restricting the source rows copied, e.g. one range of a distributed copy. Combine with truncate=False to load a subset into a shared target. Defaults to None (every row).
+            snapshot_id (str, optional): Snapshot exported by another session with pg_export_snapshot(), imported by every producer instead of one exported by the stage, so stages on several hosts read the same data. The exporting transaction must stay open until the producers started. Defaults to None.
         
         Sets up internal state for managing the producer-consumer workflow and logging.
         """
@@ -43,44 +121,469 @@ class StageCopyTableMultiThread:
         self._consumers = consumers
         self._monitor_timeout = monitor_timeout
         self._monitor_buffer_size = monitor_buffer_size
+        self._monitor_buffer_bytes = monitor_buffer_bytes
         self._max_rows_buffer = max_rows_buffer
         self._chunksize = chunksize
+        if load_strategy not in COPY_TABLE_STRATEGIES:
+            raise ValueError(f"Invalid load strategy {load_strategy}. Use one of {', '.join(COPY_TABLE_STRATEGIES)}.")
+        if load_strategy in UPSERT_STRATEGIES and not conflict_columns:
+            raise ValueError(f"Load strategy {load_strategy} requires conflict_columns")
+        self._load_strategy = load_strategy
+        if backend not in ('thread', 'process'):
+            raise ValueError(f"Invalid backend {backend}. Use 'thread' or 'process'.")
+        self._backend = backend
+        if chunk_format not in ('rows', 'columnar'):
+            raise ValueError(f"Invalid chunk format {chunk_format}. Use 'rows' or 'columnar'.")
+        self._chunk_format = chunk_format
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+        if incremental_column and watermark_store is None:
+            raise ValueError("incremental_column requires a watermark_store")
+        self._incremental_column = incremental_column
+        self._watermark_store = watermark_store
+        self._job_id = job_id or table_name_target
+        self._watermark_predicate = None
+        if adaptive and backend != 'thread':
+            raise ValueError("adaptive requires the 'thread' backend")
+        self._adaptive = adaptive
+        self._max_consumers = max(max_consumers, consumers)
+        self._controller = None
+        if swap and (incremental_column or checkpoint_journal is not None or load_strategy in UPSERT_STRATEGIES):
+            raise ValueError("swap cannot be combined with incremental_column, checkpoint_journal or the upsert load strategies")
+        if load_strategy == 'upsert_copy' and (checkpoint_journal is not None or partitioned):
+            raise ValueError("upsert_copy cannot be combined with checkpoint_journal or partitioned")
+        if spill_bytes and backend != 'thread':
+            raise ValueError("spill_bytes requires the 'thread' backend")
+        if partitioned and (incremental_column or checkpoint_journal is not None or swap):
+            raise ValueError("partitioned cannot be combined with incremental_column, checkpoint_journal or swap")
+        self._partitioned = partitioned
+        self._max_parallel_partitions = max_parallel_partitions
+        self._truncate = truncate
+        self._where = where
+        self._snapshot_id = snapshot_id
+        if transform is not None and backend != 'thread':
+            raise ValueError("transform requires the 'thread' backend")
+        if transform is not None and (checkpoint_journal is not None or load_strategy in PASSTHROUGH_STRATEGIES):
+            raise ValueError("transform cannot be combined with checkpoint_journal or the passthrough load strategies")
+        self._transform = transform
+        self._transform_workers = max(transform_workers, 1)
+        self._monitor = None
+        self._output_monitor = None
+        self._stop_error = None
+        self._spill_bytes = spill_bytes
+        self._spill_dir = spill_dir
+        self._swap = swap
+        self._index_workers = index_workers
+        self._load_table = table_name_target
+        self._metrics_sinks = metrics_sinks or []
+        self._metrics = PipelineMetrics(job=self._job_id) if self._metrics_sinks else None
+        self._producers = producers
+        self._split_column = split_column
+        self._snapshot_conn = None
+        checkpoint_column = checkpoint_column or split_column
+        if checkpoint_journal is not None and not checkpoint_column:
+            raise ValueError("checkpoint_journal requires a checkpoint_column or a split_column")
+        if load_strategy in PASSTHROUGH_STRATEGIES and checkpoint_journal is not None:
+            raise ValueError("passthrough load strategies cannot be combined with checkpoint_journal")
+        if resume and checkpoint_journal is None:
+            raise ValueError("resume requires a checkpoint_journal")
+        self._checkpoint_journal = checkpoint_journal
+        self._checkpoint_column = checkpoint_column
+        self._resume = resume
+        self._resumed = False
         self._log_utils = log_utils
         self._table_manager = table_manager
         self._logger = self._log_utils.get_logger(__name__)
+        self._profiler = WorkerProfiler(profile_dir, job=self._job_id, logger=self._logger) if profile_dir else None
             
     def init_services(self):
         """
         Initializes the producer-consumer services and monitor for multithreaded table copying.
         
-        Retrieves the source table columns and constructs a select query. Sets up a monitor with the configured buffer size and timeout, subscribes a producer to read data from the source table, and subscribes multiple consumers to write data to the target table.
+        Retrieves the source table columns and constructs a select query. Sets up a monitor with the configured buffer size and timeout, subscribes one producer per source range to read data from the source table, and subscribes multiple consumers to write data to the target table.
+
+        With more than one producer, a snapshot is exported from the source and every producer imports it, so the ranges are read consistently.
+
+        With a checkpoint journal, the ranges are saved in the journal. When resuming, the saved ranges are reused and the key intervals already committed are excluded from each range.
         """
-        columns = self._table_manager.get_table_columns(conn=self._conn_output, table_name=self._table_name_source)
-        query = self._table_manager.create_select_query(table_name=self._table_name_source, columns=columns)
+        columns = self._table_manager.get_table_columns(conn=self._conn_input, table_name=self._table_name_source)
 
-        self._monitor = Monitor(self._monitor_buffer_size, self._monitor_timeout)
-        
-        self._monitor.subscribe(
-            SQLAlchemyProducer(
-                monitor=self._monitor,
-                engine=self._conn_input,
-                query=query,
-                max_rows_buffer=self._max_rows_buffer,
-                chunksize=self._chunksize,
-                table_manager=self._table_manager,
-                table_target=self._table_name_target
+        if self._backend == 'process':
+            self._monitor = ProcessMonitor(self._monitor_buffer_size, self._monitor_timeout, self._metrics)
+            consumer_cls = SQLAlchemyProcessConsumer
+        else:
+            self._monitor = Monitor(
+                self._monitor_buffer_size, self._monitor_timeout, self._monitor_buffer_bytes, self._metrics,
+                self._spill_bytes, self._spill_dir
             )
-        )
+            consumer_cls = SQLAlchemyConsumer
+
+        snapshot_id = self._snapshot_id
+        ranges = [None]
+        saved_ranges = []
+        if self._resume:
+            saved_ranges = self._checkpoint_journal.get_ranges(self._job_id)
+            self._resumed = bool(saved_ranges)
+        if snapshot_id is None and (len(saved_ranges) > 1 or (not saved_ranges and self._producers > 1)):
+            self._snapshot_conn, snapshot_id = self._table_manager.export_snapshot(self._conn_input)
+        if saved_ranges:
+            ranges = saved_ranges
+            self._logger.info(
+                f'resuming job {self._job_id}: {self._checkpoint_journal.get_committed_rows(self._job_id)} rows already committed'
+            )
+        elif self._producers > 1:
+            if self._split_column:
+                ranges = self._table_manager.get_key_ranges(
+                    conn=self._conn_input,
+                    table_name=self._table_name_source,
+                    key_column=self._split_column,
+                    ranges=self._producers
+                )
+            else:
+                ranges = self._table_manager.get_ctid_ranges(
+                    conn=self._conn_input,
+                    table_name=self._table_name_source,
+                    ranges=self._producers
+                )
+            self._logger.info(f'splitting source into {len(ranges)} ranges with snapshot {snapshot_id}')
+
+        if self._checkpoint_journal is not None and not self._resumed:
+            self._checkpoint_journal.save_ranges(self._job_id, ranges)
+
+        range_ids = list(range(len(ranges)))
+        if self._resumed:
+            ranges = [
+                self._exclude_committed(where, range_id)
+                for where, range_id in zip(ranges, range_ids)
+            ]
 
+        if self._watermark_predicate:
+            ranges = [
+                self._watermark_predicate if where is None else f"({where}) AND ({self._watermark_predicate})"
+                for where in ranges
+            ]
+
+        if self._where:
+            ranges = [
+                self._where if where is None else f"({where}) AND ({self._where})"
+                for where in ranges
+            ]
+
+        for where, range_id in zip(ranges, range_ids):
+            query = self._table_manager.create_select_query(
+                table_name=self._table_name_source,
+                columns=list(columns),
+                where=where,
+                order_by=self._checkpoint_column if self._checkpoint_journal else None
+            )
+            if self._load_strategy in PASSTHROUGH_STRATEGIES:
+                self._monitor.subscribe(
+                    CopyPassthroughProducer(
+                        monitor=self._monitor,
+                        engine=self._conn_input,
+                        query=query,
+                        columns=list(columns),
+                        chunksize=self._chunksize,
+                        table_manager=self._table_manager,
+                        copy_format=self._load_strategy[len('passthrough_'):],
+                        snapshot_id=snapshot_id
+                    )
+                )
+                continue
+            self._monitor.subscribe(
+                SQLAlchemyProducer(
+                    monitor=self._monitor,
+                    engine=self._conn_input,
+                    query=query,
+                    max_rows_buffer=self._max_rows_buffer,
+                    chunksize=self._chunksize,
+                    table_manager=self._table_manager,
+                    table_target=self._load_table,
+                    snapshot_id=snapshot_id,
+                    chunk_format=self._chunk_format,
+                    checkpoint_journal=self._checkpoint_journal,
+                    job_id=self._job_id,
+                    checkpoint_column=self._checkpoint_column,
+                    range_id=range_id
+                )
+            )
+
+        self._subscribe_transform_workers()
         for _ in range(self._consumers):
+            self._output_monitor.subscribe(self._create_consumer(consumer_cls))
+
+        if self._adaptive:
+            self._controller = AdaptiveController(
+                monitor=self._output_monitor,
+                consumer_factory=lambda: self._create_consumer(SQLAlchemyConsumer),
+                min_consumers=1,
+                max_consumers=self._max_consumers,
+                max_chunksize=max(self._chunksize, self._max_rows_buffer),
+                logger=self._logger
+            )
+
+    def stop(self, error: BaseException = None):
+        """
+        Stop the copy from another thread: the workers stop after their current chunk and run() raises with the error. A copy not started yet fails as soon as it builds its pipeline.
+        """
+        self._stop_error = error or RuntimeError('Copy stopped')
+        if self._monitor is not None:
+            self._monitor.stop_all_workers(self._stop_error)
+
+    def _subscribe_transform_workers(self):
+        """
+        Put a second monitor between the producers and the consumers, with transform workers moving chunks from the first to the second. Without a transform the consumers read the producers' monitor directly.
+        """
+        self._output_monitor = self._monitor
+        if self._transform is None:
+            return
+
+        self._output_monitor = Monitor(
+            self._monitor_buffer_size, self._monitor_timeout, self._monitor_buffer_bytes, self._metrics
+        )
+        self._monitor.link(self._output_monitor)
+        for _ in range(self._transform_workers):
             self._monitor.subscribe(
-                SQLAlchemyConsumer(
+                TransformWorker(
                     monitor=self._monitor,
-                    engine=self._conn_output,
-                    table_manager=self._table_manager
+                    output_monitor=self._output_monitor,
+                    transform=self._transform,
+                    table_manager=self._table_manager,
+                    table_target=self._load_table,
+                    chunk_format=self._chunk_format
                 )
             )
+            self._output_monitor.register_producer()
+
+    def _start_monitors(self):
+        self._output_monitor.start()
+        if self._output_monitor is not self._monitor:
+            self._monitor.start()
+
+    def _wait_for_completion(self):
+        try:
+            self._monitor.wait_for_completion()
+        finally:
+            if self._output_monitor is not self._monitor:
+                self._output_monitor.wait_for_completion()
+
+    def _create_consumer(self, consumer_cls: type):
+        return consumer_cls(
+            monitor=self._output_monitor,
+            engine=self._conn_output,
+            table_manager=self._table_manager,
+            load_strategy='copy_binary' if self._load_strategy == 'upsert_copy' else self._load_strategy,
+            table_target=self._load_table,
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns
+        )
             
+    def _exclude_committed(self, where: str, range_id: int) -> str:
+        """
+        Restrict a source range to the keys outside the intervals already committed according to the journal.
+        """
+        column = self._checkpoint_column
+        predicates = [] if where is None else [f"({where})"]
+        for lo, hi in self._checkpoint_journal.get_committed_intervals(self._job_id, range_id):
+            lo = self._table_manager.format_literal(lo)
+            hi = self._table_manager.format_literal(hi)
+            predicates.append(f"NOT ({column} BETWEEN {lo} AND {hi})")
+
+        return ' AND '.join(predicates) or None
+
+    def _swap_shadow_table(self):
+        """
+        Build the target's indexes on the loaded shadow table and swap it in place of the target.
+        """
+        self._logger.info(f'building indexes on {self._load_table}...\n')
+        renames = self._table_manager.rebuild_indexes(
+            self._conn_output, self._table_name_target, self._load_table, self._index_workers
+        )
+        self._logger.info(f'swapping {self._load_table} into {self._table_name_target}...\n')
+        self._table_manager.swap_shadow_table(self._conn_output, self._table_name_target, self._load_table, renames)
+        self._load_table = self._table_name_target
+
+    def _create_staging_table(self):
+        self._load_table = self._table_manager.get_staging_table_name(self._table_name_target)
+        self._logger.info(f'creating staging table: {self._load_table}...\n')
+        self._table_manager.create_staging_table(self._conn_output, self._table_name_target, self._load_table)
+
+    def _merge_staging_table(self, columns: list[str]):
+        """
+        Merge the loaded columns of the staging table into the target with a single statement and drop it.
+        """
+        self._logger.info(f'merging {self._load_table} into {self._table_name_target}...\n')
+        merged = self._table_manager.merge_staging_table(
+            conn=self._conn_output,
+            staging_name=self._load_table,
+            table_name=self._table_name_target,
+            columns=columns,
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns
+        )
+        self._logger.info(f'{merged} rows merged')
+        self._load_table = self._table_name_target
+
+    def _drop_load_table(self):
+        if self._load_table == self._table_name_target:
+            return
+        try:
+            self._table_manager.drop_table(self._conn_output, self._load_table)
+        except Exception as e:
+            self._logger.warning(f'failed to drop work table {self._load_table}: {e}')
+        self._load_table = self._table_name_target
+
+    def _partition_stage(self, source: str, target: str, snapshot_id: str) -> 'StageCopyTableMultiThread':
+        """
+        Build the stage copying one source leaf partition from the shared snapshot, with the settings of this stage and without truncating its target.
+
+        Its metrics are collected apart and merged into this stage's once it ends, so they are exported once for the whole table. The profiler of this stage already samples its threads.
+        """
+        stage = StageCopyTableMultiThread(
+            table_name_source=source,
+            table_name_target=target,
+            conn_input=self._conn_input,
+            conn_output=self._conn_output,
+            log_utils=self._log_utils,
+            table_manager=self._table_manager,
+            consumers=self._consumers,
+            monitor_timeout=self._monitor_timeout,
+            monitor_buffer_size=self._monitor_buffer_size,
+            monitor_buffer_bytes=self._monitor_buffer_bytes,
+            max_rows_buffer=self._max_rows_buffer,
+            chunksize=self._chunksize,
+            load_strategy=self._load_strategy,
+            producers=self._producers,
+            split_column=self._split_column,
+            backend=self._backend,
+            chunk_format=self._chunk_format,
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns,
+            job_id=f'{self._job_id}/{source}',
+            adaptive=self._adaptive,
+            max_consumers=self._max_consumers,
+            spill_bytes=self._spill_bytes,
+            spill_dir=self._spill_dir,
+            truncate=False,
+            where=self._where,
+            snapshot_id=snapshot_id,
+            transform=self._transform,
+            transform_workers=self._transform_workers
+        )
+        if self._metrics is not None:
+            stage._metrics = PipelineMetrics(job=stage._job_id)
+
+        return stage
+
+    def _copy_partitions(self) -> bool:
+        """
+        Copy the leaf partitions of the source in parallel, each into the target leaf partition with the same bound chain or else into the target table.
+
+        The target is truncated once before the partitions start. Every partition reads the same snapshot, exported here unless one was given, and held until the run ends, so a row moved across partitions during the copy is copied exactly once. When a partition fails, the partitions not started yet are cancelled and the others are left to finish.
+
+        Returns:
+            bool: False when the source is not partitioned and nothing was copied.
+
+        Raises:
+            RuntimeError: If any partition failed.
+        """
+        source_partitions = self._table_manager.get_leaf_partitions(self._conn_input, self._table_name_source)
+        if not source_partitions:
+            self._logger.info(f'{self._table_name_source} is not partitioned, copying it as one table\n')
+            return False
+
+        target_by_bounds = {
+            bounds: name for name, bounds in self._table_manager.get_leaf_partitions(self._conn_output, self._table_name_target)
+        }
+        sizes = self._table_manager.get_table_size_estimates(self._conn_input, [name for name, _ in source_partitions])
+        # One catalog query for every leaf instead of one per partition stage.
+        self._table_manager.get_table_schemas(self._conn_input, [name for name, _ in source_partitions])
+        pairs = sorted(
+            ((source, target_by_bounds.get(bounds, self._table_name_target)) for source, bounds in source_partitions),
+            key=lambda pair: sizes.get(pair[0], (0, 0))[1],
+            reverse=True
+        )
+        routed = sum(1 for _, target in pairs if target == self._table_name_target)
+        self._logger.info(
+            f'copying {len(pairs)} partitions, {len(pairs) - routed} into matching target partitions, '
+            f'{max(self._max_parallel_partitions, 1)} at a time\n'
+        )
+
+        if self._truncate and self._load_strategy not in UPSERT_STRATEGIES:
+            self._logger.info(f'truncating table: {self._table_name_target}...\n')
+            self._table_manager.truncate_table(self._conn_output, self._table_name_target)
+
+        snapshot_id = self._snapshot_id
+        if snapshot_id is None:
+            self._snapshot_conn, snapshot_id = self._table_manager.export_snapshot(self._conn_input)
+        self._logger.info(f'reading every partition from snapshot {snapshot_id}')
+        if self._metrics is not None:
+            self._metrics.start()
+
+        failed = []
+        with _ThreadPoolExecutor(max_workers=max(self._max_parallel_partitions, 1), thread_name_prefix='PartitionCopy') as executor:
+            futures = {}
+            for source, target in pairs:
+                stage = self._partition_stage(source, target, snapshot_id)
+                futures[executor.submit(stage.run)] = stage
+            for future in _as_completed(futures):
+                if future.cancelled():
+                    continue
+                stage = futures[future]
+                if self._metrics is not None:
+                    self._metrics.merge(stage._metrics)
+                if future.exception() is None:
+                    continue
+                failed.append(stage._table_name_source)
+                for pending in futures:
+                    pending.cancel()
+
+        if failed:
+            raise RuntimeError(f"Partitions failed: {', '.join(failed)}")
+
+        return True
+
+    def _export_metrics(self):
+        """
+        Send the metrics of the run to the configured sinks. A failing sink is logged and does not fail the run.
+        """
+        if self._metrics is None or self._metrics.started_at is None:
+            return
+        self._metrics.finish()
+        try:
+            self._metrics.export(self._metrics_sinks)
+        except Exception as e:
+            self._logger.warning(f'failed to export metrics: {e}')
+
+    def _export_profile(self):
+        """
+        Stop the profiler and write its reports. A failing report is logged and does not fail the run.
+        """
+        if self._profiler is None:
+            return
+        try:
+            self._profiler.stop()
+        except Exception as e:
+            self._logger.warning(f'failed to write profile: {e}')
+
+    def _prepare_incremental(self, source: str) -> tuple:
+        """
+        Read the last persisted watermark and capture the current one from the source.
+
+        Rows are extracted in the interval (last watermark, current watermark], so rows committed during the run are picked up by the next one.
+
+        Returns:
+            tuple: The last and current watermarks. The current one is None when the source is empty.
+        """
+        low = self._watermark_store.get(self._job_id)
+        high = self._table_manager.get_column_max(self._conn_input, source, self._incremental_column)
+        self._watermark_predicate = self._table_manager.build_watermark_predicate(
+            self._incremental_column, low, high
+        )
+        self._logger.info(f'incremental column: {self._incremental_column} from {low} to {high}')
+
+        return low, high
+
     def run(self):
         try:
             start = time.time()
@@ -88,16 +591,65 @@ class StageCopyTableMultiThread:
             self._logger.info(f'table target: {self._table_name_target}')
             self._logger.info(f'connection input: {self._conn_input.__repr__()}')
             self._logger.info(f'connection output: {self._conn_output.__repr__()}')
+            self._logger.info(f'load strategy: {self._load_strategy}')
+            self._logger.info(f'backend: {self._backend}')
+            if self._profiler is not None:
+                self._profiler.start()
+
+            if self._partitioned and self._copy_partitions():
+                self._logger.info(f'execution time: {time.time() - start}')
+                return
+
+            low = high = None
+            if self._incremental_column:
+                low, high = self._prepare_incremental(self._table_name_source)
+                if high is None or (low is not None and high <= low):
+                    self._logger.info('no new rows since the last watermark, nothing to load\n')
+                    return
+
+            if self._swap:
+                self._load_table = self._table_manager.get_shadow_table_name(self._table_name_target)
+                self._logger.info(f'creating shadow table: {self._load_table}...\n')
+                self._table_manager.create_shadow_table(self._conn_output, self._table_name_target, self._load_table)
+            elif self._load_strategy == 'upsert_copy':
+                self._create_staging_table()
 
             self._logger.info('starting services...\n')
             self.init_services()
-            self._logger.info(f'truncating table: {self._table_name_target}...\n')
-            self._table_manager.truncate_table(self._conn_output, self._table_name_target)
+            if self._stop_error is not None:
+                raise self._stop_error
+            if low is None and not self._resumed and not self._swap and self._truncate and self._load_strategy not in UPSERT_STRATEGIES:
+                self._logger.info(f'truncating table: {self._table_name_target}...\n')
+                self._table_manager.truncate_table(self._conn_output, self._table_name_target)
             self._logger.info('processing etl...\n')
-            self._monitor.start()
-            self._monitor.wait_for_completion()
+            if self._metrics is not None:
+                self._metrics.start()
+            self._start_monitors()
+            if self._controller is not None:
+                self._controller.start()
+            # Read before waiting: a process monitor releases its shared metadata once completed.
+            loaded_columns = self._output_monitor.get_columns() if self._load_strategy == 'upsert_copy' else None
+            self._wait_for_completion()
+            if self._swap:
+                self._swap_shadow_table()
+            elif self._load_strategy == 'upsert_copy':
+                self._merge_staging_table(loaded_columns)
+            if self._incremental_column:
+                self._watermark_store.set(self._job_id, high)
+                self._logger.info(f'watermark saved: {high}')
+            if self._checkpoint_journal is not None:
+                self._checkpoint_journal.clear(self._job_id)
             end = time.time() - start
             self._logger.info(f'execution time: {end}')
         except Exception as e: 
             self._logger.error(f'ETL process failed: {e}') 
-            raise
\ No newline at end of file
+            self._drop_load_table()
+            raise
+        finally:
+            if self._controller is not None:
+                self._controller.stop()
+            self._export_metrics()
+            self._export_profile()
+            if self._snapshot_conn is not None:
+                self._snapshot_conn.close()
+                self._snapshot_conn = None
\ No newline at end of file
@@ -0,0 +1,313 @@
+import time
+from sqlalchemy.engine import Engine as _Engine
+
+from src.utils.table.table_manager import TableManager
+from src.monitors.monitor import Monitor
+from src.utils.log.log_utils import LogUtils
+from src.utils.metrics.pipeline_metrics import PipelineMetrics
+from src.utils.metrics.metrics_sinks import MetricsSink
+from src.utils.metrics.worker_profiler import WorkerProfiler
+from src.workers.sqlalchemy_producer import SQLAlchemyProducer
+from src.workers.sqlalchemy_consumer import SQLAlchemyConsumer
+from src.workers.fan_out_worker import FanOutWorker
+
+
+UPSERT_STRATEGIES = ('upsert', 'upsert_copy')
+
+FAN_OUT_STRATEGIES = ('insert', 'copy_csv', 'copy_binary') + UPSERT_STRATEGIES
+
+
+class FanOutTarget:
+    def __init__(
+        self,
+        table_name_target: str,
+        conn_output: _Engine,
+        load_strategy: str = 'insert',
+        consumers: int = 2,
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        truncate: bool = True,
+        max_lag_chunks: int = 10,
+        max_lag_bytes: int = 256 * 1024 * 1024,
+        spill_bytes: int = None,
+        spill_dir: str = None
+    ) -> None:
+        """
+        Describe one consumer group of a StageFanOutMultiThread: a target table, its engine, its load strategy and how far it may fall behind the other groups.
+
+        Parameters:
+            table_name_target (str): Table receiving the rows.
+            conn_output (_Engine): Engine of the target database.
+            load_strategy (str, optional): 'insert', 'copy_csv', 'copy_binary', 'upsert' or 'upsert_copy', as in StageAdHocMultiThread. Defaults to 'insert'.
+            consumers (int, optional): Consumer threads, i.e. target connections, of the group. Defaults to 2.
+            conflict_columns (list[str], optional): Conflict key of the upsert strategies.
+            update_columns (list[str], optional): Columns overwritten on conflict by the upsert strategies. Defaults to every column outside the conflict key.
+            truncate (bool, optional): Truncate the target before loading, except with the upsert strategies. Defaults to True.
+            max_lag_chunks (int, optional): Chunks the group may have waiting in its buffer before it holds up the other groups. Defaults to 10.
+            max_lag_bytes (int, optional): Estimated bytes the group may have waiting in its buffer. Defaults to 256 MiB.
+            spill_bytes (int, optional): Disk space the group's buffer can spill to once full, extending its lag without memory. Defaults to None (no spill).
+            spill_dir (str, optional): Directory of the spill files. Defaults to None (the system temporary directory).
+
+        Raises:
+            ValueError: If the load strategy is not supported or an upsert strategy lacks conflict_columns.
+        """
+        if load_strategy not in FAN_OUT_STRATEGIES:
+            raise ValueError(f"Invalid fan-out load strategy {load_strategy}. Use one of {', '.join(FAN_OUT_STRATEGIES)}.")
+        if load_strategy in UPSERT_STRATEGIES and not conflict_columns:
+            raise ValueError(f"Load strategy {load_strategy} requires conflict_columns")
+        self.table_name_target = table_name_target
+        self.conn_output = conn_output
+        self.load_strategy = load_strategy
+        self.consumers = consumers
+        self.conflict_columns = conflict_columns
+        self.update_columns = update_columns
+        self.truncate = truncate
+        self.max_lag_chunks = max_lag_chunks
+        self.max_lag_bytes = max_lag_bytes
+        self.spill_bytes = spill_bytes
+        self.spill_dir = spill_dir
+
+    def __repr__(self) -> str:
+        return f"FanOutTarget({self.table_name_target!r}, {self.conn_output.url!r}, load_strategy={self.load_strategy!r})"
+
+
+class StageFanOutMultiThread:
+    def __init__(
+        self,
+        query: str,
+        conn_input: _Engine,
+        targets: list[FanOutTarget],
+        table_manager: TableManager,
+        log_utils: LogUtils,
+        monitor_timeout: int = 5,
+        monitor_buffer_size: int = 10,
+        monitor_buffer_bytes: int = 256 * 1024 * 1024,
+        max_rows_buffer: int = 100000,
+        chunksize: int = 20000,
+        chunk_format: str = 'rows',
+        job_id: str = None,
+        metrics_sinks: list[MetricsSink] = None,
+        profile_dir: str = None
+    ) -> None:
+        """
+        Initialize a StageFanOutMultiThread instance running a query once and loading its rows into several targets.
+
+        One producer reads the query into a monitor. A FanOutWorker broadcasts every chunk to one monitor per target, read by that target's own consumers. Each target buffers up to its max_lag_chunks/max_lag_bytes (and spill_bytes): a slow target only holds up the others once it lags by that much. A target that fails is dropped while the others finish their load; the run then raises with the failed targets.
+
+        Parameters:
+            query (str): SQL query to extract data from the source database.
+            targets (list[FanOutTarget]): Consumer groups, each with its target engine, table and load strategy.
+            monitor_timeout (int, optional): Timeout in seconds for the monitors' polling interval. Defaults to 5.
+            monitor_buffer_size (int, optional): Number of chunks buffered between the producer and the fan-out. Defaults to 10.
+            monitor_buffer_bytes (int, optional): Maximum estimated size in bytes of the chunks buffered between the producer and the fan-out. Defaults to 256 MiB.
+            max_rows_buffer (int, optional): Maximum number of rows to buffer in memory. Defaults to 100000.
+            chunksize (int, optional): Number of rows per data chunk processed by the producer. Defaults to 20000.
+            chunk_format (str, optional): Format of the chunks: 'rows' or 'columnar'. Defaults to 'rows'.
+            job_id (str, optional): Label of the job's metrics and profile. Defaults to the target tables joined with '+'.
+            metrics_sinks (list[MetricsSink], optional): Sinks receiving the pipeline metrics at the end of the run. Defaults to None (no metrics).
+            profile_dir (str, optional): Directory of the worker profile, as in StageAdHocMultiThread. Defaults to None (no profiling).
+
+        Raises:
+            ValueError: If there are no targets or two targets load the same table of the same database.
+        """
+        if not targets:
+            raise ValueError("A fan-out stage needs at least one target")
+        keys = [(str(target.conn_output.url), target.table_name_target) for target in targets]
+        if len(set(keys)) != len(keys):
+            raise ValueError("Fan-out targets must load distinct tables")
+        self._query = query
+        self._conn_input = conn_input
+        self._targets = list(targets)
+        self._monitor_timeout = monitor_timeout
+        self._monitor_buffer_size = monitor_buffer_size
+        self._monitor_buffer_bytes = monitor_buffer_bytes
+        self._max_rows_buffer = max_rows_buffer
+        self._chunksize = chunksize
+        self._chunk_format = chunk_format
+        self._job_id = job_id or '+'.join(target.table_name_target for target in self._targets)
+        self._load_tables = [target.table_name_target for target in self._targets]
+        self._monitor = None
+        self._group_monitors: list[Monitor] = []
+        self._metrics_sinks = metrics_sinks or []
+        self._metrics = PipelineMetrics(job=self._job_id) if self._metrics_sinks else None
+        self._table_manager = table_manager
+        self._log_utils = log_utils
+        self._logger = self._log_utils.get_logger(__name__)
+        self._profiler = WorkerProfiler(profile_dir, job=self._job_id, logger=self._logger) if profile_dir else None
+
+    def init_services(self):
+        """
+        Set up the producer's monitor with its producer and fan-out worker, and one monitor per target with its consumers.
+        """
+        self._monitor = Monitor(self._monitor_buffer_size, self._monitor_timeout, self._monitor_buffer_bytes, self._metrics)
+        self._monitor.subscribe(
+            SQLAlchemyProducer(
+                monitor=self._monitor,
+                engine=self._conn_input,
+                query=self._query,
+                max_rows_buffer=self._max_rows_buffer,
+                chunksize=self._chunksize,
+                table_manager=self._table_manager,
+                table_target=self._load_tables[0],
+                chunk_format=self._chunk_format
+            )
+        )
+
+        self._group_monitors = []
+        for target, load_table in zip(self._targets, self._load_tables):
+            group_monitor = Monitor(
+                target.max_lag_chunks, self._monitor_timeout, target.max_lag_bytes, self._metrics,
+                target.spill_bytes, target.spill_dir
+            )
+            self._monitor.link(group_monitor, both_ways=False)
+            group_monitor.register_producer()
+            for _ in range(target.consumers):
+                group_monitor.subscribe(
+                    SQLAlchemyConsumer(
+                        monitor=group_monitor,
+                        engine=target.conn_output,
+                        table_manager=self._table_manager,
+                        load_strategy='copy_binary' if target.load_strategy == 'upsert_copy' else target.load_strategy,
+                        table_target=load_table,
+                        conflict_columns=target.conflict_columns,
+                        update_columns=target.update_columns
+                    )
+                )
+            self._group_monitors.append(group_monitor)
+
+        self._monitor.subscribe(
+            FanOutWorker(
+                monitor=self._monitor,
+                output_monitors=self._group_monitors,
+                table_manager=self._table_manager,
+                table_targets=self._load_tables
+            )
+        )
+
+    def _create_staging_tables(self):
+        for i, target in enumerate(self._targets):
+            if target.load_strategy == 'upsert_copy':
+                self._load_tables[i] = self._table_manager.get_staging_table_name(target.table_name_target)
+                self._logger.info(f'creating staging table: {self._load_tables[i]}...\n')
+                self._table_manager.create_staging_table(target.conn_output, target.table_name_target, self._load_tables[i])
+
+    def _truncate_targets(self):
+        for target in self._targets:
+            if target.truncate and target.load_strategy not in UPSERT_STRATEGIES:
+                self._logger.info(f'truncating table: {target.table_name_target}...\n')
+                self._table_manager.truncate_table(target.conn_output, target.table_name_target)
+
+    def _wait_for_completion(self) -> dict[str, BaseException]:
+        """
+        Wait for the producer and every group.
+
+        Returns:
+            dict[str, BaseException]: The error of every failed target, keyed by table.
+
+        Raises:
+            RuntimeError: If the producer or the fan-out failed, which stops every group.
+        """
+        failures = {}
+        try:
+            self._monitor.wait_for_completion()
+        finally:
+            for target, group_monitor in zip(self._targets, self._group_monitors):
+                try:
+                    group_monitor.wait_for_completion()
+                except RuntimeError as e:
+                    failures[target.table_name_target] = e
+
+        return failures
+
+    def _merge_staging_table(self, i: int, columns: list[str]):
+        target = self._targets[i]
+        self._logger.info(f'merging {self._load_tables[i]} into {target.table_name_target}...\n')
+        merged = self._table_manager.merge_staging_table(
+            conn=target.conn_output,
+            staging_name=self._load_tables[i],
+            table_name=target.table_name_target,
+            columns=columns,
+            conflict_columns=target.conflict_columns,
+            update_columns=target.update_columns
+        )
+        self._logger.info(f'{merged} rows merged into {target.table_name_target}')
+        self._load_tables[i] = target.table_name_target
+
+    def _drop_load_tables(self):
+        for i, target in enumerate(self._targets):
+            if self._load_tables[i] == target.table_name_target:
+                continue
+            try:
+                self._table_manager.drop_table(target.conn_output, self._load_tables[i])
+            except Exception as e:
+                self._logger.warning(f'failed to drop work table {self._load_tables[i]}: {e}')
+            self._load_tables[i] = target.table_name_target
+
+    def _export_metrics(self):
+        """
+        Send the metrics of the run to the configured sinks. A failing sink is logged and does not fail the run.
+        """
+        if self._metrics is None or self._metrics.started_at is None:
+            return
+        self._metrics.finish()
+        try:
+            self._metrics.export(self._metrics_sinks)
+        except Exception as e:
+            self._logger.warning(f'failed to export metrics: {e}')
+
+    def _export_profile(self):
+        """
+        Stop the profiler and write its reports. A failing report is logged and does not fail the run.
+        """
+        if self._profiler is None:
+            return
+        try:
+            self._profiler.stop()
+        except Exception as e:
+            self._logger.warning(f'failed to write profile: {e}')
+
+    def run(self):
+        """
+        Run the query once and load its rows into every target.
+
+        The targets that loaded successfully are completed (staging tables merged) even when others failed.
+
+        Raises:
+            RuntimeError: If the extraction failed, or with the failed targets once the others are loaded.
+        """
+        start = time.time()
+        try:
+            self._logger.info(f'query input: \n{self._query}')
+            self._logger.info(f'connection input: {self._conn_input.__repr__()}')
+            for target in self._targets:
+                self._logger.info(f'target: {target.__repr__()}')
+            if self._profiler is not None:
+                self._profiler.start()
+
+            self._create_staging_tables()
+            self._logger.info('starting services...\n')
+            self.init_services()
+            self._truncate_targets()
+            self._logger.info('processing etl...\n')
+            if self._metrics is not None:
+                self._metrics.start()
+            for group_monitor in self._group_monitors:
+                group_monitor.start()
+            self._monitor.start()
+            failures = self._wait_for_completion()
+
+            for i, target in enumerate(self._targets):
+                if target.load_strategy == 'upsert_copy' and target.table_name_target not in failures:
+                    self._merge_staging_table(i, self._monitor.get_columns())
+            if failures:
+                raise RuntimeError(
+                    'Fan-out targets failed: ' + '; '.join(f'{table}: {error}' for table, error in failures.items())
+                )
+            self._logger.info(f'execution time: {time.time() - start}')
+        except Exception as e:
+            self._logger.error(f'ETL process failed: {e}')
+            raise
+        finally:
+            self._drop_load_tables()
+            self._export_metrics()
+            self._export_profile()
@@ -0,0 +1,109 @@
+import os
+import bz2
+import gzip
+import lzma
+import glob as _glob
+from urllib.parse import unquote as _unquote
+
+
+FILE_FORMATS = ('csv', 'parquet')
+
+CSV_COMPRESSIONS = {
+    None: ('', open),
+    'gzip': ('.gz', gzip.open),
+    'bz2': ('.bz2', bz2.open),
+    'xz': ('.xz', lzma.open),
+}
+
+HIVE_NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+
+def infer_file_format(file_path: str) -> tuple[str, str]:
+    """
+    Infer the format and compression of a file from its extension, e.g. 'orders.csv.gz' -> ('csv', 'gzip').
+
+    Raises:
+        ValueError: If the extension is not a supported format.
+    """
+    name = file_path.lower()
+    for compression, (suffix, _) in CSV_COMPRESSIONS.items():
+        if compression and name.endswith('.csv' + suffix):
+            return 'csv', compression
+    if name.endswith('.csv'):
+        return 'csv', None
+    if name.endswith(('.parquet', '.pq')):
+        return 'parquet', None
+
+    raise ValueError(f"Cannot infer the format of {file_path}. Use a .csv, .csv.gz, .csv.bz2, .csv.xz or .parquet file.")
+
+
+def open_csv(file_path: str, mode: str, compression: str = None):
+    """
+    Open a CSV file in binary mode, compressed according to compression.
+
+    Raises:
+        ValueError: If the compression is not supported.
+    """
+    if compression not in CSV_COMPRESSIONS:
+        raise ValueError(f"Invalid compression {compression}. Use one of {', '.join(str(c) for c in CSV_COMPRESSIONS)}.")
+
+    return CSV_COMPRESSIONS[compression][1](file_path, mode)
+
+
+def expand_file_paths(file_path: object) -> list[str]:
+    """
+    Expand a file path, a glob pattern, a directory (searched recursively) or a list of them into a sorted list of files of a supported format.
+
+    Raises:
+        FileNotFoundError: If nothing matches.
+    """
+    patterns = [file_path] if isinstance(file_path, str) else list(file_path)
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = _glob.glob(os.path.join(pattern, '**', '*'), recursive=True)
+            files.extend(sorted(m for m in matches if os.path.isfile(m) and _is_supported(m)))
+        else:
+            files.extend(sorted(_glob.glob(pattern, recursive=True)) or ([pattern] if os.path.isfile(pattern) else []))
+
+    if not files:
+        raise FileNotFoundError(f"No file matches {file_path}")
+
+    return files
+
+
+def _is_supported(file_path: str) -> bool:
+    try:
+        infer_file_format(file_path)
+    except ValueError:
+        return False
+    return True
+
+
+def hive_partitions(file_path: str) -> dict[str, str]:
+    """
+    Read the partition values encoded in the directories of a path, e.g. 'exports/country=BR/part-0.parquet' -> {'country': 'BR'}.
+    """
+    partitions = {}
+    for segment in os.path.normpath(os.path.dirname(file_path)).split(os.sep):
+        name, sep, value = segment.partition('=')
+        if sep and name:
+            partitions[name] = None if value == HIVE_NULL_PARTITION else _unquote(value)
+
+    return partitions
+
+
+def require_pyarrow():
+    """
+    Return the pyarrow and pyarrow.parquet modules, imported on first use so CSV-only pipelines never load pyarrow.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    try:
+        import pyarrow as _pa
+        import pyarrow.parquet as _pq
+    except ImportError as e:
+        raise ImportError("Parquet files require pyarrow. Install it with 'pip install pyarrow'.") from e
+
+    return _pa, _pq
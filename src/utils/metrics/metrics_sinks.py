@@ -0,0 +1,129 @@
+import os
+import json
+from abc import (
+    ABC as _ABC,
+    abstractmethod as _abstractmethod
+)
+from logging import Logger as _Logger
+
+
+class MetricsSink(_ABC):
+    """
+    Destination of the summary built by PipelineMetrics at the end of a run.
+    """
+
+    @_abstractmethod
+    def export(self, summary: dict) -> None:
+        """
+        Publish the summary of a run.
+
+        Parameters:
+            summary (dict): Summary returned by PipelineMetrics.summary().
+        """
+        ...
+
+
+class JsonSummarySink(MetricsSink):
+    def __init__(self, file_path: str = None, logger: _Logger = None, include_samples: bool = True) -> None:
+        """
+        Initialize a sink writing the run summary as JSON to a file, a logger, or both.
+
+        Parameters:
+            file_path (str, optional): File the summary is written to. It is replaced on every run.
+            logger (_Logger, optional): Logger the summary is written to at INFO level, without the queue depth samples.
+            include_samples (bool, optional): Whether the file keeps the queue depth samples. Defaults to True.
+
+        Raises:
+            ValueError: If neither a file path nor a logger is given.
+        """
+        if not file_path and logger is None:
+            raise ValueError("JsonSummarySink requires a file_path or a logger")
+        self._file_path = file_path
+        self._logger = logger
+        self._include_samples = include_samples
+
+    @staticmethod
+    def _without_samples(summary: dict) -> dict:
+        queue_depth = {k: v for k, v in summary['queue_depth'].items() if k != 'samples'}
+        return {**summary, 'queue_depth': queue_depth}
+
+    def export(self, summary: dict) -> None:
+        if self._file_path:
+            content = summary if self._include_samples else self._without_samples(summary)
+            with open(self._file_path, 'w') as f:
+                json.dump(content, f, indent=2, default=str)
+        if self._logger is not None:
+            self._logger.info(f'pipeline metrics: {json.dumps(self._without_samples(summary), default=str)}')
+
+
+class PrometheusTextfileSink(MetricsSink):
+    def __init__(self, file_path: str, prefix: str = 'data_tools') -> None:
+        """
+        Initialize a sink writing the run summary in the Prometheus text exposition format, for the node_exporter textfile collector.
+
+        The file is written to a temporary path and renamed, so the collector never reads a partial file.
+
+        Parameters:
+            file_path (str): Path of the .prom file, inside the collector directory.
+            prefix (str, optional): Prefix of every metric name. Defaults to 'data_tools'.
+        """
+        self._file_path = file_path
+        self._prefix = prefix
+
+    @staticmethod
+    def _labels(**labels) -> str:
+        pairs = []
+        for key, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+        return '{' + ','.join(pairs) + '}'
+
+    def render(self, summary: dict) -> str:
+        """
+        Render the summary as Prometheus text exposition lines.
+        """
+        p = self._prefix
+        job = summary['job'] or ''
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f'# HELP {p}_{name} {help_text}')
+            lines.append(f'# TYPE {p}_{name} {kind}')
+            for suffix, labels, value in samples:
+                lines.append(f'{p}_{name}{suffix}{self._labels(job=job, **labels)} {value}')
+
+        metric('job_duration_seconds', 'gauge', 'Duration of the last run.', [('', {}, summary['elapsed_seconds'])])
+        metric('job_last_run_timestamp_seconds', 'gauge', 'Start time of the last run.', [('', {}, summary['started_at'] or 0)])
+
+        workers = summary['workers'].items()
+        for name, key, kind, help_text in (
+            ('worker_rows_total', 'rows', 'counter', 'Rows moved by a worker.'),
+            ('worker_bytes_total', 'bytes', 'counter', 'Estimated bytes moved by a worker.'),
+            ('worker_rows_per_second', 'rows_per_second', 'gauge', 'Rows per second moved by a worker.'),
+            ('worker_bytes_per_second', 'bytes_per_second', 'gauge', 'Estimated bytes per second moved by a worker.'),
+            ('worker_blocked_seconds_total', 'blocked_seconds', 'counter', 'Time a worker spent waiting on a full or empty buffer.'),
+        ):
+            metric(name, kind, help_text, [
+                ('', {'worker': worker, 'role': stats['role']}, stats[key]) for worker, stats in workers
+            ])
+
+        metric('queue_depth_max', 'gauge', 'Largest number of chunks held in the buffer.', [('', {}, summary['queue_depth']['max'])])
+        metric('queue_depth_mean', 'gauge', 'Mean number of chunks held in the buffer.', [('', {}, summary['queue_depth']['mean'])])
+
+        samples = []
+        for stage, histogram in summary['latency_seconds'].items():
+            cumulative = 0
+            for bound, count in histogram['buckets'].items():
+                cumulative += count
+                samples.append(('_bucket', {'stage': stage, 'le': bound}, cumulative))
+            samples.append(('_sum', {'stage': stage}, histogram['sum']))
+            samples.append(('_count', {'stage': stage}, histogram['count']))
+        metric('stage_latency_seconds', 'histogram', 'Latency of the fetch, encode and commit stages.', samples)
+
+        return '\n'.join(lines) + '\n'
+
+    def export(self, summary: dict) -> None:
+        tmp_path = f'{self._file_path}.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(self.render(summary))
+        os.replace(tmp_path, self._file_path)
@@ -0,0 +1,265 @@
+import time
+import bisect
+import multiprocessing as _mp
+from contextlib import contextmanager as _contextmanager
+from threading import (
+    Lock as _Lock,
+    current_thread as _current_thread
+)
+
+
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def current_worker_name() -> str:
+    """
+    Return the name of the worker running the caller: the process name inside a consumer process, the thread name otherwise.
+    """
+    process = _mp.current_process()
+    if process.name != 'MainProcess':
+        return process.name
+    return _current_thread().name
+
+
+class Histogram:
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        """
+        Initialize a cumulative latency histogram with fixed upper bounds, in seconds.
+
+        Parameters:
+            buckets (tuple, optional): Sorted upper bounds of the buckets. Values above the last bound fall in an implicit +Inf bucket. Defaults to LATENCY_BUCKETS.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def merge(self, other: 'Histogram') -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimate a quantile as the upper bound of the bucket holding it, capped by the largest observed value.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'mean': self.sum / self.count if self.count else 0.0,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'max': self.max,
+            'buckets': dict(zip([*map(str, self.buckets), '+Inf'], self.counts)),
+        }
+
+
+class PipelineMetrics:
+    def __init__(self, job: str = None, queue_sample_interval: float = 1.0) -> None:
+        """
+        Initialize a thread-safe collector of the performance metrics of one pipeline run.
+
+        It records rows and bytes moved by each worker, the time each worker spends blocked on the monitor, the queue depth over time and latency histograms per stage ('fetch', 'encode', 'commit'). The collector is handed to the monitor, which shares it with its workers.
+
+        Parameters:
+            job (str, optional): Name of the job, used as a label by the sinks.
+            queue_sample_interval (float, optional): Minimum interval in seconds between two queue depth samples. Defaults to 1.0.
+        """
+        self.job = job
+        self._queue_sample_interval = queue_sample_interval
+        self._lock = _Lock()
+        self._started_at: float = None
+        self._finished_at: float = None
+        self._workers: dict = {}
+        self._histograms: dict = {}
+        self._queue_depth: list = []
+        self._last_sample: float = 0.0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = _Lock()
+
+    def start(self) -> None:
+        self._started_at = time.time()
+
+    def finish(self) -> None:
+        self._finished_at = time.time()
+
+    @property
+    def started_at(self) -> float:
+        return self._started_at
+
+    def _worker(self, worker: str, role: str = None) -> dict:
+        stats = self._workers.get(worker)
+        if stats is None:
+            stats = self._workers[worker] = {
+                'role': role, 'rows': 0, 'bytes': 0, 'chunks': 0,
+                'blocked_seconds': 0.0, 'first_seen': None, 'last_seen': None
+            }
+        if role and not stats['role']:
+            stats['role'] = role
+        return stats
+
+    def record_chunk(self, worker: str, role: str, rows: int, nbytes: int) -> None:
+        """
+        Record a chunk fetched by a producer or loaded by a consumer.
+        """
+        now = time.time()
+        with self._lock:
+            stats = self._worker(worker, role)
+            stats['rows'] += rows
+            stats['bytes'] += nbytes
+            stats['chunks'] += 1
+            stats['first_seen'] = stats['first_seen'] or now
+            stats['last_seen'] = now
+
+    def record_blocked(self, worker: str, seconds: float) -> None:
+        """
+        Record time a worker spent waiting on a full buffer (producers) or an empty one (consumers).
+        """
+        if seconds <= 0:
+            return
+        with self._lock:
+            self._worker(worker)['blocked_seconds'] += seconds
+
+    def observe(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    @_contextmanager
+    def timer(self, stage: str):
+        """
+        Measure the duration of the enclosed block in the latency histogram of a stage.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def sample_queue(self, chunks: int, nbytes: int = None) -> None:
+        """
+        Record the current depth of the buffer, at most once per sampling interval.
+        """
+        now = time.time()
+        if now - self._last_sample < self._queue_sample_interval:
+            return
+        with self._lock:
+            self._last_sample = now
+            self._queue_depth.append((now, chunks, nbytes))
+
+    def merge(self, other: 'PipelineMetrics') -> None:
+        """
+        Add the metrics collected by another collector, e.g. the copy held by a consumer process.
+        """
+        with self._lock:
+            for worker, stats in other._workers.items():
+                target = self._worker(worker, stats['role'])
+                for key in ('rows', 'bytes', 'chunks', 'blocked_seconds'):
+                    target[key] += stats[key]
+                for key, pick in (('first_seen', min), ('last_seen', max)):
+                    values = [v for v in (target[key], stats[key]) if v is not None]
+                    target[key] = pick(values) if values else None
+            for stage, histogram in other._histograms.items():
+                if stage not in self._histograms:
+                    self._histograms[stage] = Histogram(histogram.buckets)
+                self._histograms[stage].merge(histogram)
+            self._queue_depth = sorted(self._queue_depth + other._queue_depth)
+
+    def summary(self) -> dict:
+        """
+        Build a summary of the run: throughput and blocked time per worker and role, queue depth, stage latencies and the likely bottleneck.
+
+        Returns:
+            dict: JSON-serializable summary consumed by the metrics sinks.
+        """
+        with self._lock:
+            end = self._finished_at or time.time()
+            elapsed = end - self._started_at if self._started_at else 0.0
+
+            workers = {}
+            roles = {}
+            for name, stats in sorted(self._workers.items()):
+                active = (stats['last_seen'] - self._started_at) if stats['last_seen'] and self._started_at else 0.0
+                workers[name] = {
+                    **{k: v for k, v in stats.items() if k not in ('first_seen', 'last_seen')},
+                    'rows_per_second': stats['rows'] / active if active > 0 else 0.0,
+                    'bytes_per_second': stats['bytes'] / active if active > 0 else 0.0,
+                    'blocked_ratio': stats['blocked_seconds'] / elapsed if elapsed > 0 else 0.0,
+                }
+                role = roles.setdefault(stats['role'] or 'unknown', {'workers': 0, 'rows': 0, 'bytes': 0, 'blocked_seconds': 0.0})
+                role['workers'] += 1
+                for key in ('rows', 'bytes', 'blocked_seconds'):
+                    role[key] += stats[key]
+
+            for role in roles.values():
+                role['rows_per_second'] = role['rows'] / elapsed if elapsed > 0 else 0.0
+                role['bytes_per_second'] = role['bytes'] / elapsed if elapsed > 0 else 0.0
+                role['blocked_ratio'] = role['blocked_seconds'] / (elapsed * role['workers']) if elapsed > 0 else 0.0
+
+            depths = [chunks for _, chunks, _ in self._queue_depth]
+
+            return {
+                'job': self.job,
+                'started_at': self._started_at,
+                'elapsed_seconds': elapsed,
+                'roles': roles,
+                'workers': workers,
+                'queue_depth': {
+                    'max': max(depths, default=0),
+                    'mean': sum(depths) / len(depths) if depths else 0.0,
+                    'samples': [
+                        {'at': at, 'chunks': chunks, 'bytes': nbytes}
+                        for at, chunks, nbytes in self._queue_depth
+                    ],
+                },
+                'latency_seconds': {stage: h.to_dict() for stage, h in sorted(self._histograms.items())},
+                'bottleneck': self._bottleneck(roles),
+            }
+
+    @staticmethod
+    def _bottleneck(roles: dict) -> str:
+        """
+        Producers blocked on a full buffer point at the target; consumers blocked on an empty buffer point at the source. When neither side waits, the handoff through the queue (serialization, locking) is what limits the run.
+        """
+        producer = roles.get('producer', {}).get('blocked_ratio', 0.0)
+        consumer = roles.get('consumer', {}).get('blocked_ratio', 0.0)
+        if max(producer, consumer) < 0.1:
+            return 'queue'
+        return 'target' if producer > consumer else 'source'
+
+    def export(self, sinks: list) -> None:
+        """
+        Send the summary of the run to every sink.
+        """
+        summary = self.summary()
+        for sink in sinks:
+            sink.export(summary)
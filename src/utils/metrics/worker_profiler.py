@@ -0,0 +1,184 @@
+import os
+import sys
+import json
+import time
+import tracemalloc
+import threading
+from collections import Counter as _Counter
+from logging import Logger as _Logger
+
+
+class WorkerProfiler:
+    def __init__(
+        self,
+        output_dir: str,
+        job: str = None,
+        interval: float = 0.01,
+        trace_allocations: bool = True,
+        allocation_frames: int = 1,
+        top_allocations: int = 30,
+        logger: _Logger = None
+    ) -> None:
+        """
+        Initialize a sampling profiler of the worker threads of a pipeline.
+
+        While running, a single daemon thread samples the Python stack of every other thread of the process, except the main thread, every interval. Workers are not instrumented: the cost is one stack walk per thread and sample, and workers added at runtime (e.g. by the adaptive controller) are sampled too. Stacks show where time goes, e.g. psycopg2 fetches, SQLAlchemy row construction, the monitor's condition waits, encoding or commits. Only threads of this process are seen; consumer processes of the 'process' backend are not profiled.
+
+        When trace_allocations is set, tracemalloc runs during the profile and the allocations still held at the end are compared with the start.
+
+        On stop, the following files are written to output_dir/{job}:
+        - {thread}.folded: collapsed stacks of each thread, one 'frame;frame;frame count' line per stack, ready for flamegraph.pl or speedscope;
+        - allocations.txt: the top allocation sites by size, with the current and peak traced memory;
+        - profile.json: samples, CPU seconds and hottest functions of each thread.
+
+        Parameters:
+            output_dir (str): Directory of the reports, created if needed.
+            job (str, optional): Name of the job, used as the report subdirectory. Defaults to 'profile'.
+            interval (float, optional): Seconds between two samples. Defaults to 0.01.
+            trace_allocations (bool, optional): Trace allocations with tracemalloc, which slows allocations down noticeably. Defaults to True.
+            allocation_frames (int, optional): Frames kept per allocation traceback. Defaults to 1.
+            top_allocations (int, optional): Allocation sites listed in the report. Defaults to 30.
+            logger (_Logger, optional): Logger of the report paths.
+        """
+        self._output_dir = output_dir
+        self._job = (job or 'profile').replace(os.sep, '_')
+        self._interval = interval
+        self._trace_allocations = trace_allocations
+        self._allocation_frames = allocation_frames
+        self._top_allocations = top_allocations
+        self._logger = logger
+        self._stacks: dict[str, _Counter] = {}
+        self._cpu_seconds: dict[str, float] = {}
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread = None
+        self._started_tracemalloc = False
+        self._baseline: tracemalloc.Snapshot = None
+        self._started_at: float = None
+
+    def start(self):
+        """
+        Start sampling and, if enabled, tracing allocations.
+        """
+        if self._trace_allocations:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self._allocation_frames)
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._baseline = tracemalloc.take_snapshot()
+        self._started_at = time.perf_counter()
+        self._thread = threading.Thread(target=self._sample_loop, name='WorkerProfiler', daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _frame_label(frame) -> str:
+        code = frame.f_code
+        path = code.co_filename.replace(os.sep, '/').rsplit('/', 2)
+        name = getattr(code, 'co_qualname', code.co_name)
+        return f"{name} ({'/'.join(path[-2:])})"
+
+    def _sample_loop(self):
+        own = threading.get_ident()
+        main = threading.main_thread().ident
+        while not self._stop_event.wait(self._interval):
+            threads = {t.ident: t for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident in (own, main) or ident not in threads:
+                    continue
+                labels = []
+                while frame is not None:
+                    labels.append(self._frame_label(frame))
+                    frame = frame.f_back
+                name = threads[ident].name
+                self._stacks.setdefault(name, _Counter())[';'.join(reversed(labels))] += 1
+                self._cpu_seconds[name] = self._thread_cpu_seconds(ident, self._cpu_seconds.get(name))
+
+    @staticmethod
+    def _thread_cpu_seconds(ident: int, last: float) -> float:
+        """
+        Read the CPU time consumed so far by a thread, where the platform exposes per-thread clocks.
+        """
+        try:
+            return time.clock_gettime(time.pthread_getcpuclockid(ident))
+        except (AttributeError, OSError):
+            return last
+
+    def stop(self) -> dict[str, str]:
+        """
+        Stop sampling and allocation tracing and write the reports.
+
+        Returns:
+            dict[str, str]: Paths of the reports written, keyed by report ('profile', 'allocations' and one '{thread}.folded' per thread).
+        """
+        if self._thread is None:
+            return {}
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+        elapsed = time.perf_counter() - self._started_at
+
+        directory = os.path.join(self._output_dir, self._job)
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        # Before the other reports, so their own allocations are not listed.
+        if self._trace_allocations:
+            paths['allocations'] = os.path.join(directory, 'allocations.txt')
+            self._write_allocations(paths['allocations'])
+
+        for name, stacks in sorted(self._stacks.items()):
+            file_name = f"{name.replace(os.sep, '_')}.folded"
+            paths[file_name] = os.path.join(directory, file_name)
+            with open(paths[file_name], 'w') as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+
+        paths['profile'] = os.path.join(directory, 'profile.json')
+        with open(paths['profile'], 'w') as f:
+            json.dump(self.summary(elapsed), f, indent=2)
+
+        if self._logger is not None:
+            self._logger.info(f'profile written to {directory}')
+
+        return paths
+
+    def _write_allocations(self, path: str):
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        snapshot = snapshot.filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+        ])
+        key = 'traceback' if self._allocation_frames > 1 else 'lineno'
+        stats = snapshot.compare_to(self._baseline, key)[:self._top_allocations]
+
+        with open(path, 'w') as f:
+            f.write(f"traced memory: current {current / 2**20:.1f} MiB, peak {peak / 2**20:.1f} MiB\n")
+            f.write(f"top {len(stats)} allocation sites still held at the end, compared with the start:\n\n")
+            for stat in stats:
+                f.write(f"{stat.size / 2**10:.1f} KiB ({stat.size_diff / 2**10:+.1f} KiB), {stat.count} blocks ({stat.count_diff:+d})\n")
+                for line in stat.traceback.format():
+                    f.write(f"    {line}\n")
+
+    def summary(self, elapsed: float = None) -> dict:
+        """
+        Summarize the samples of each thread: sample count, CPU seconds and the functions most often on top of the stack.
+        """
+        threads = {}
+        for name, stacks in sorted(self._stacks.items()):
+            leaves = _Counter()
+            for stack, count in stacks.items():
+                leaves[stack.rsplit(';', 1)[-1]] += count
+            samples = sum(stacks.values())
+            threads[name] = {
+                'samples': samples,
+                'cpu_seconds': self._cpu_seconds.get(name),
+                'top_functions': [
+                    {'function': function, 'samples': count, 'ratio': count / samples}
+                    for function, count in leaves.most_common(10)
+                ],
+            }
+
+        return {'job': self._job, 'elapsed_seconds': elapsed, 'interval': self._interval, 'threads': threads}
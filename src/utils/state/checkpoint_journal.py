@@ -0,0 +1,225 @@
+import json
+import sqlite3
+import time
+from threading import local as _local
+from src.monitors.monitor import estimate_size as _estimate_size
+from .watermark_store import (
+    serialize_value as _serialize_value,
+    deserialize_value as _deserialize_value
+)
+
+
+class CheckpointJournal:
+    def __init__(self, file_path: str, timeout: int = 30) -> None:
+        """
+        Initialize a durable SQLite journal of the chunks committed by copy jobs.
+
+        The journal stores the source ranges of a job and, for each range, the key interval of every committed chunk, so an interrupted job can re-extract only what was not committed. Each thread or process opens its own SQLite connection.
+
+        Parameters:
+            file_path (str): Path of the SQLite database file. It is created if it does not exist.
+            timeout (int, optional): Seconds a writer waits for the database lock. Defaults to 30.
+        """
+        self._file_path = file_path
+        self._timeout = timeout
+        self._local = _local()
+        self._connection().execute("PRAGMA journal_mode=WAL")
+        with self._transaction() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS job_ranges (
+                    job_id TEXT NOT NULL,
+                    range_id INTEGER NOT NULL,
+                    predicate TEXT,
+                    PRIMARY KEY (job_id, range_id)
+                )
+            """)
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS committed_chunks (
+                    job_id TEXT NOT NULL,
+                    range_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    lo TEXT NOT NULL,
+                    hi TEXT NOT NULL,
+                    rows INTEGER NOT NULL,
+                    committed_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, range_id, seq)
+                )
+            """)
+
+    def __getstate__(self):
+        return {'_file_path': self._file_path, '_timeout': self._timeout}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = _local()
+
+    def _connection(self) -> sqlite3.Connection:
+        con = getattr(self._local, 'con', None)
+        if con is None:
+            con = sqlite3.connect(self._file_path, timeout=self._timeout, isolation_level=None)
+            con.execute("PRAGMA synchronous=FULL")
+            self._local.con = con
+        return con
+
+    def _transaction(self) -> '_Transaction':
+        return _Transaction(self._connection())
+
+    def save_ranges(self, job_id: str, ranges: list[str]) -> None:
+        """
+        Replace the journal of a job with a new list of source ranges and no committed chunks.
+        """
+        with self._transaction() as con:
+            con.execute("DELETE FROM committed_chunks WHERE job_id = ?", (job_id,))
+            con.execute("DELETE FROM job_ranges WHERE job_id = ?", (job_id,))
+            con.executemany(
+                "INSERT INTO job_ranges (job_id, range_id, predicate) VALUES (?, ?, ?)",
+                [(job_id, range_id, predicate) for range_id, predicate in enumerate(ranges)]
+            )
+
+    def get_ranges(self, job_id: str) -> list[str]:
+        """
+        Return the source ranges saved for a job, or an empty list if the job has no journal.
+        """
+        with self._transaction() as con:
+            rows = con.execute(
+                "SELECT predicate FROM job_ranges WHERE job_id = ? ORDER BY range_id", (job_id,)
+            ).fetchall()
+
+        return [predicate for predicate, in rows]
+
+    def record_chunk(self, job_id: str, range_id: int, seq: int, lo: object, hi: object, rows: int) -> None:
+        """
+        Durably record that a chunk covering the key interval [lo, hi] of a range was committed to the target.
+        """
+        with self._transaction() as con:
+            con.execute(
+                "INSERT OR REPLACE INTO committed_chunks VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id, range_id, seq,
+                    json.dumps(_serialize_value(lo)), json.dumps(_serialize_value(hi)),
+                    rows, time.time()
+                )
+            )
+
+    def get_committed_intervals(self, job_id: str, range_id: int) -> list[tuple]:
+        """
+        Return the committed key intervals of a range, merging chunks with consecutive sequence numbers.
+
+        Chunks of a range are produced in key order, so consecutive chunks cover one contiguous interval of keys.
+
+        Returns:
+            list[tuple]: (lo, hi) intervals in key order.
+        """
+        with self._transaction() as con:
+            rows = con.execute(
+                "SELECT seq, lo, hi FROM committed_chunks WHERE job_id = ? AND range_id = ? ORDER BY seq",
+                (job_id, range_id)
+            ).fetchall()
+
+        intervals = []
+        last_seq = None
+        for seq, lo, hi in rows:
+            lo = _deserialize_value(json.loads(lo))
+            hi = _deserialize_value(json.loads(hi))
+            if intervals and seq == last_seq + 1:
+                intervals[-1] = (intervals[-1][0], hi)
+            else:
+                intervals.append((lo, hi))
+            last_seq = seq
+
+        return intervals
+
+    def get_next_seq(self, job_id: str, range_id: int) -> int:
+        """
+        Return the first sequence number a new run of a range must use.
+
+        A gap of one is left after the chunks of previous runs, so chunks of different runs are never merged into one interval.
+        """
+        with self._transaction() as con:
+            max_seq = con.execute(
+                "SELECT max(seq) FROM committed_chunks WHERE job_id = ? AND range_id = ?", (job_id, range_id)
+            ).fetchone()[0]
+
+        return 0 if max_seq is None else max_seq + 2
+
+    def get_committed_rows(self, job_id: str) -> int:
+        """
+        Return the number of rows committed by a job according to the journal.
+        """
+        with self._transaction() as con:
+            return con.execute(
+                "SELECT COALESCE(sum(rows), 0) FROM committed_chunks WHERE job_id = ?", (job_id,)
+            ).fetchone()[0]
+
+    def clear(self, job_id: str) -> None:
+        """
+        Remove every entry of a job, e.g. once it completed successfully.
+        """
+        with self._transaction() as con:
+            con.execute("DELETE FROM committed_chunks WHERE job_id = ?", (job_id,))
+            con.execute("DELETE FROM job_ranges WHERE job_id = ?", (job_id,))
+
+
+class _Transaction:
+    def __init__(self, con: sqlite3.Connection) -> None:
+        self._con = con
+
+    def __enter__(self) -> sqlite3.Connection:
+        self._con.execute("BEGIN IMMEDIATE")
+        return self._con
+
+    def __exit__(self, exc_type, exc, tb):
+        self._con.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class JournaledChunk:
+    def __init__(
+        self,
+        data: object,
+        journal: CheckpointJournal,
+        job_id: str,
+        range_id: int,
+        seq: int,
+        lo: object,
+        hi: object
+    ) -> None:
+        """
+        Wrap a chunk with the position it covers in its source range, so the consumer can journal it once committed.
+
+        Parameters:
+            data (object): The chunk itself, rows or a ColumnarChunk.
+            journal (CheckpointJournal): Journal the chunk is recorded in.
+            job_id (str): Identifier of the copy job.
+            range_id (int): Index of the source range the chunk was read from.
+            seq (int): Position of the chunk within its range.
+            lo (object): Smallest checkpoint key of the chunk.
+            hi (object): Largest checkpoint key of the chunk.
+        """
+        self.data = data
+        self._journal = journal
+        self._job_id = job_id
+        self._range_id = range_id
+        self._seq = seq
+        self._lo = lo
+        self._hi = hi
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        if isinstance(self.data, list):
+            state['data'] = [tuple(row) for row in self.data]
+        return state
+
+    @property
+    def nbytes(self) -> int:
+        return _estimate_size(self.data)
+
+    def mark_committed(self) -> None:
+        """
+        Record the chunk as committed in the journal. Must be called only after the target transaction committed.
+        """
+        self._journal.record_chunk(
+            self._job_id, self._range_id, self._seq, self._lo, self._hi, len(self.data)
+        )
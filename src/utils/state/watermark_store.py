@@ -0,0 +1,105 @@
+import os
+import json
+from threading import Lock as _Lock
+from decimal import Decimal as _Decimal
+from datetime import (
+    date as _date,
+    datetime as _datetime
+)
+
+
+def serialize_value(value: object) -> dict:
+    """
+    Serialize a watermark or key value into a JSON-compatible dict that keeps its Python type.
+
+    Raises:
+        ValueError: If the value type cannot be serialized.
+    """
+    if isinstance(value, bool) or value is None:
+        raise ValueError(f"Invalid watermark value {value!r}")
+    if isinstance(value, _datetime):
+        return {"type": "datetime", "value": value.isoformat()}
+    if isinstance(value, _date):
+        return {"type": "date", "value": value.isoformat()}
+    if isinstance(value, _Decimal):
+        return {"type": "decimal", "value": str(value)}
+    if isinstance(value, (int, float, str)):
+        return {"type": type(value).__name__, "value": value}
+    raise ValueError(f"Unsupported watermark type {type(value).__name__}")
+
+
+def deserialize_value(entry: dict) -> object:
+    """
+    Rebuild a value serialized by serialize_value.
+    """
+    value_type = entry["type"]
+    value = entry["value"]
+    if value_type == "datetime":
+        return _datetime.fromisoformat(value)
+    if value_type == "date":
+        return _date.fromisoformat(value)
+    if value_type == "decimal":
+        return _Decimal(value)
+    return value
+
+
+class WatermarkStore:
+    def __init__(self, file_path: str) -> None:
+        """
+        Initialize a store that persists the high-water mark of incremental jobs in a local JSON file.
+
+        Values keep their type (int, float, Decimal, str, date or datetime) across runs. The file is rewritten atomically, so an interrupted write never corrupts the previous state.
+
+        Parameters:
+            file_path (str): Path of the JSON state file. It is created on the first write.
+        """
+        self._file_path = file_path
+        self._lock = _Lock()
+
+    def _read_state(self) -> dict:
+        try:
+            with open(self._file_path) as file:
+                return json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (IOError, ValueError) as e:
+            raise IOError(f"Watermark file {self._file_path} could not be read:\n{e}") from e
+
+    def _write_state(self, state: dict) -> None:
+        tmp_path = f"{self._file_path}.tmp"
+        with open(tmp_path, 'w') as file:
+            json.dump(state, file, indent=4)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, self._file_path)
+
+    def get(self, job_id: str) -> object:
+        """
+        Return the last persisted watermark of a job, or None if the job never completed.
+        """
+        with self._lock:
+            entry = self._read_state().get(job_id)
+
+        return None if entry is None else deserialize_value(entry)
+
+    def set(self, job_id: str, value: object) -> None:
+        """
+        Persist the watermark of a job, replacing the previous one.
+
+        Raises:
+            ValueError: If the value type cannot be persisted.
+        """
+        entry = serialize_value(value)
+        with self._lock:
+            state = self._read_state()
+            state[job_id] = entry
+            self._write_state(state)
+
+    def delete(self, job_id: str) -> None:
+        """
+        Forget the watermark of a job, so its next run extracts everything again.
+        """
+        with self._lock:
+            state = self._read_state()
+            if state.pop(job_id, None) is not None:
+                self._write_state(state)
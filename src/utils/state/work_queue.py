@@ -0,0 +1,241 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Engine as _Engine
+from sqlalchemy.exc import SQLAlchemyError as _SQLAlchemyError
+
+
+RANGE_STATUSES = ('pending', 'running', 'done', 'failed')
+
+
+class WorkQueue:
+    def __init__(self, conn: _Engine, table_name: str = 'data_tools_work_queue') -> None:
+        """
+        Initialize a work queue of source ranges stored in a PostgreSQL control table, shared by workers on any number of hosts.
+
+        Each row is one range of a job, identified by its WHERE predicate. Workers claim ranges with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent claims never block each other nor return the same range. A claimed range holds a lease the worker renews with heartbeats: when a worker dies, its range is claimed again once the lease expires. Failed ranges are retried up to a number of attempts.
+
+        Parameters:
+            conn (_Engine): Engine of the database holding the control table. Any database reachable by every worker works.
+            table_name (str, optional): Name of the control table. Defaults to 'data_tools_work_queue'.
+        """
+        self._conn = conn
+        self._table_name = table_name
+
+    @property
+    def table_name(self) -> str:
+        return self._table_name
+
+    def create_table(self) -> None:
+        """
+        Create the control table if it does not exist.
+
+        Raises:
+            SQLAlchemyError: If the table cannot be created.
+        """
+        with self._conn.connect() as con:
+            with con.begin():
+                try:
+                    con.execute(text(f"""
+                        CREATE TABLE IF NOT EXISTS {self._table_name} (
+                            job_id text NOT NULL,
+                            range_id integer NOT NULL,
+                            predicate text NOT NULL,
+                            snapshot_id text,
+                            status text NOT NULL DEFAULT 'pending',
+                            worker text,
+                            attempts integer NOT NULL DEFAULT 0,
+                            error text,
+                            created_at timestamptz NOT NULL DEFAULT now(),
+                            claimed_at timestamptz,
+                            heartbeat_at timestamptz,
+                            finished_at timestamptz,
+                            PRIMARY KEY (job_id, range_id)
+                        )
+                    """))
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"Fail to create work queue table {self._table_name}: {e}")
+
+    def submit(self, job_id: str, predicates: list[str], snapshot_id: str = None) -> None:
+        """
+        Replace the ranges of a job with new pending ranges, in one transaction.
+
+        Parameters:
+            job_id (str): Job the ranges belong to.
+            predicates (list[str]): One WHERE predicate per range, e.g. from TableManager.get_key_ranges.
+            snapshot_id (str, optional): Snapshot the workers read the source from, exported by the coordinator. Defaults to None.
+
+        Raises:
+            SQLAlchemyError: If the ranges cannot be written.
+        """
+        with self._conn.connect() as con:
+            with con.begin():
+                try:
+                    con.execute(text(f"DELETE FROM {self._table_name} WHERE job_id = :job_id"), {'job_id': job_id})
+                    con.execute(
+                        text(f"""
+                            INSERT INTO {self._table_name} (job_id, range_id, predicate, snapshot_id)
+                            VALUES (:job_id, :range_id, :predicate, :snapshot_id)
+                        """),
+                        [
+                            {'job_id': job_id, 'range_id': range_id, 'predicate': predicate, 'snapshot_id': snapshot_id}
+                            for range_id, predicate in enumerate(predicates)
+                        ]
+                    )
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"Fail to submit ranges of job {job_id}: {e}")
+
+    def reopen(self, job_id: str, snapshot_id: str = None) -> None:
+        """
+        Reopen the ranges of a job not done yet, e.g. when a coordinator resumes it: failed ranges become pending again, with new attempts, and every range not done gets the new snapshot.
+
+        Raises:
+            SQLAlchemyError: If the ranges cannot be updated.
+        """
+        with self._conn.connect() as con:
+            with con.begin():
+                try:
+                    con.execute(
+                        text(f"""
+                            UPDATE {self._table_name}
+                            SET snapshot_id = :snapshot_id,
+                                status = CASE WHEN status = 'failed' THEN 'pending' ELSE status END
+                            WHERE job_id = :job_id AND status <> 'done'
+                        """),
+                        {'job_id': job_id, 'snapshot_id': snapshot_id}
+                    )
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"Fail to reopen job {job_id}: {e}")
+
+    def claim(self, job_id: str, worker: str, lease_seconds: int, max_attempts: int) -> dict:
+        """
+        Claim the next range of a job: a pending range, a running range whose lease expired, or a failed range with attempts left.
+
+        Returns:
+            dict: The claimed range (range_id, predicate, snapshot_id, attempts, counting this one), or None when no range can be claimed now.
+
+        Raises:
+            SQLAlchemyError: If the claim fails.
+        """
+        with self._conn.connect() as con:
+            with con.begin():
+                try:
+                    row = con.execute(
+                        text(f"""
+                            UPDATE {self._table_name} q
+                            SET status = 'running', worker = :worker, attempts = q.attempts + 1, error = NULL,
+                                claimed_at = now(), heartbeat_at = now(), finished_at = NULL
+                            FROM (
+                                SELECT job_id, range_id
+                                FROM {self._table_name}
+                                WHERE job_id = :job_id
+                                  AND (status = 'pending'
+                                       OR (status = 'running' AND heartbeat_at < now() - make_interval(secs => :lease))
+                                       OR (status = 'failed' AND attempts < :max_attempts))
+                                ORDER BY attempts, range_id
+                                LIMIT 1
+                                FOR UPDATE SKIP LOCKED
+                            ) next_range
+                            WHERE q.job_id = next_range.job_id AND q.range_id = next_range.range_id
+                            RETURNING q.range_id, q.predicate, q.snapshot_id, q.attempts
+                        """),
+                        {'job_id': job_id, 'worker': worker, 'lease': lease_seconds, 'max_attempts': max_attempts}
+                    ).mappings().first()
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"Fail to claim a range of job {job_id}: {e}")
+
+        return dict(row) if row is not None else None
+
+    def _update_claimed(self, job_id: str, range_id: int, worker: str, assignments: str, params: dict, error: str) -> bool:
+        with self._conn.connect() as con:
+            with con.begin():
+                try:
+                    result = con.execute(
+                        text(f"""
+                            UPDATE {self._table_name} SET {assignments}
+                            WHERE job_id = :job_id AND range_id = :range_id AND worker = :worker AND status = 'running'
+                        """),
+                        {'job_id': job_id, 'range_id': range_id, 'worker': worker, **params}
+                    )
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"{error}: {e}")
+
+        return result.rowcount == 1
+
+    def heartbeat(self, job_id: str, range_id: int, worker: str) -> bool:
+        """
+        Renew the lease of a claimed range.
+
+        Returns:
+            bool: False when the range is no longer held by the worker, i.e. its lease expired and another worker claimed it.
+        """
+        return self._update_claimed(
+            job_id, range_id, worker, "heartbeat_at = now()", {},
+            f"Fail to renew the lease of range {range_id} of job {job_id}"
+        )
+
+    def complete(self, job_id: str, range_id: int, worker: str) -> bool:
+        """
+        Mark a claimed range as done.
+
+        Returns:
+            bool: False when the range is no longer held by the worker.
+        """
+        return self._update_claimed(
+            job_id, range_id, worker, "status = 'done', finished_at = now()", {},
+            f"Fail to complete range {range_id} of job {job_id}"
+        )
+
+    def fail(self, job_id: str, range_id: int, worker: str, error: str) -> bool:
+        """
+        Mark a claimed range as failed, with the error. It is claimed again while it has attempts left.
+
+        Returns:
+            bool: False when the range is no longer held by the worker.
+        """
+        return self._update_claimed(
+            job_id, range_id, worker, "status = 'failed', error = :error, finished_at = now()", {'error': error},
+            f"Fail to record the failure of range {range_id} of job {job_id}"
+        )
+
+    def get_progress(self, job_id: str, max_attempts: int) -> dict[str, int]:
+        """
+        Count the ranges of a job by status. Failed ranges without attempts left are counted as 'exhausted' instead of 'failed'.
+
+        Returns:
+            dict[str, int]: Ranges per status ('pending', 'running', 'done', 'failed', 'exhausted').
+
+        Raises:
+            SQLAlchemyError: If the control table cannot be read.
+        """
+        with self._conn.connect() as con:
+            try:
+                rows = con.execute(
+                    text(f"""
+                        SELECT CASE WHEN status = 'failed' AND attempts >= :max_attempts THEN 'exhausted' ELSE status END, count(*)
+                        FROM {self._table_name}
+                        WHERE job_id = :job_id
+                        GROUP BY 1
+                    """),
+                    {'job_id': job_id, 'max_attempts': max_attempts}
+                ).all()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to read progress of job {job_id}: {e}")
+
+        progress = {status: 0 for status in RANGE_STATUSES + ('exhausted',)}
+        progress.update({status: count for status, count in rows})
+
+        return progress
+
+    def get_errors(self, job_id: str) -> dict[int, str]:
+        """
+        Read the last error of every failed range of a job, keyed by range id.
+        """
+        with self._conn.connect() as con:
+            try:
+                rows = con.execute(
+                    text(f"SELECT range_id, error FROM {self._table_name} WHERE job_id = :job_id AND status = 'failed' ORDER BY range_id"),
+                    {'job_id': job_id}
+                ).all()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to read errors of job {job_id}: {e}")
+
+        return {range_id: error for range_id, error in rows}
@@ -0,0 +1,171 @@
+import sys
+import numpy as _np
+from datetime import (
+    date as _date,
+    datetime as _datetime
+)
+
+
+_NUMPY_DTYPES = {
+    int: _np.int64,
+    float: _np.float64,
+    bool: _np.bool_,
+}
+
+
+class ColumnarChunk:
+    def __init__(self, columns: list[str], arrays: list[_np.ndarray], masks: list[_np.ndarray]) -> None:
+        """
+        Initialize a chunk stored column by column as NumPy arrays.
+
+        Integer, float, boolean, date and naive timestamp columns are kept in typed arrays; other columns stay in object arrays. NULLs in typed columns are tracked by a boolean mask.
+
+        Parameters:
+            columns (list[str]): Column names.
+            arrays (list[_np.ndarray]): One array of values per column, all with the same length.
+            masks (list[_np.ndarray]): One boolean NULL mask per column, or None when the column has no NULLs.
+        """
+        self.columns = list(columns)
+        self.arrays = arrays
+        self.masks = masks
+        self._rows = len(arrays[0]) if arrays else 0
+
+    @classmethod
+    def from_rows(cls, rows: list, columns: list[str]) -> 'ColumnarChunk':
+        """
+        Build a columnar chunk from a sequence of rows, such as the result of cursor.fetchmany().
+
+        Parameters:
+            rows (list): Sequence of rows, each row a sequence of column values.
+            columns (list[str]): Column names in row order.
+
+        Returns:
+            ColumnarChunk: The chunk with one array per column.
+        """
+        arrays = []
+        masks = []
+        values_by_column = list(zip(*rows)) if rows else [() for _ in columns]
+        for values in values_by_column:
+            array, mask = cls._to_array(values)
+            arrays.append(array)
+            masks.append(mask)
+
+        return cls(columns, arrays, masks)
+
+    @classmethod
+    def from_frame(cls, frame) -> 'ColumnarChunk':
+        """
+        Build a columnar chunk from a pandas DataFrame. Missing values (None, NaN, NaT, pd.NA) become NULLs.
+        """
+        arrays = []
+        masks = []
+        for column in frame.columns:
+            series = frame[column]
+            mask = series.isna().to_numpy()
+            kind = series.dtype.kind
+            numpy_dtype = getattr(series.dtype, 'numpy_dtype', series.dtype)
+            if kind in 'iub':
+                array = series.to_numpy(dtype=numpy_dtype, na_value=numpy_dtype.type(0))
+            elif kind == 'f':
+                array = series.to_numpy(dtype=numpy_dtype, na_value=_np.nan)
+            elif kind == 'M' and getattr(series.dtype, 'tz', None) is None:
+                array = series.to_numpy(dtype='datetime64[us]')
+            else:
+                array = series.astype(object).where(~mask, None).to_numpy()
+                mask = None
+            arrays.append(array)
+            masks.append(mask if mask is not None and mask.any() else None)
+
+        return cls([str(c) for c in frame.columns], arrays, masks)
+
+    @staticmethod
+    def _to_array(values: tuple) -> tuple:
+        types = set(map(type, values))
+        has_null = type(None) in types
+        types.discard(type(None))
+
+        mask = None
+        if has_null:
+            mask = _np.fromiter((v is None for v in values), dtype=_np.bool_, count=len(values))
+
+        if len(types) == 1:
+            value_type = types.pop()
+            dtype = _NUMPY_DTYPES.get(value_type)
+            fill = None
+            if dtype is not None:
+                fill = value_type()
+            elif value_type is _datetime and not any(v.tzinfo for v in values if v is not None):
+                dtype, fill = 'datetime64[us]', _datetime(1970, 1, 1)
+            elif value_type is _date:
+                dtype, fill = 'datetime64[D]', _date(1970, 1, 1)
+
+            if dtype is not None:
+                try:
+                    filled = values if mask is None else [fill if v is None else v for v in values]
+                    return _np.array(filled, dtype=dtype), mask
+                except OverflowError:
+                    pass
+
+        array = _np.empty(len(values), dtype=object)
+        array[:] = values
+        return array, None
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Estimated memory held by the chunk, including the Python objects referenced by object columns.
+        """
+        total = 0
+        for array, mask in zip(self.arrays, self.masks):
+            total += array.nbytes
+            if mask is not None:
+                total += mask.nbytes
+            if array.dtype == object and len(array):
+                step = max(len(array) // 10, 1)
+                sample = array[::step][:10]
+                total += sum(sys.getsizeof(v) for v in sample) * len(array) // len(sample)
+        return total
+
+    def column_values(self, index: int) -> list:
+        """
+        Return the values of one column as Python objects, with None for NULLs.
+        """
+        values = self.arrays[index].tolist()
+        mask = self.masks[index]
+        if mask is not None:
+            values = [None if is_null else v for v, is_null in zip(values, mask.tolist())]
+        return values
+
+    def to_rows(self) -> list[tuple]:
+        """
+        Convert the chunk back to a list of row tuples of Python objects, e.g. for cursor.executemany.
+        """
+        return list(zip(*(self.column_values(i) for i in range(len(self.columns)))))
+
+    def to_frame(self):
+        """
+        Convert the chunk to a pandas DataFrame. Typed columns with NULLs become pandas nullable or float arrays; dates stay Python date objects.
+        """
+        import pandas as _pd
+
+        data = {}
+        for index, (column, array, mask) in enumerate(zip(self.columns, self.arrays, self.masks)):
+            if array.dtype == _np.dtype('datetime64[D]'):
+                data[column] = _np.array(self.column_values(index), dtype=object)
+            elif mask is None:
+                data[column] = array
+            elif array.dtype.kind in 'iu':
+                data[column] = _pd.arrays.IntegerArray(array, mask)
+            elif array.dtype.kind == 'b':
+                data[column] = _pd.arrays.BooleanArray(array, mask)
+            elif array.dtype.kind == 'f':
+                data[column] = _np.where(mask, _np.nan, array)
+            elif array.dtype.kind == 'M':
+                data[column] = _np.where(mask, _np.datetime64('NaT'), array)
+            else:
+                data[column] = array
+
+        return _pd.DataFrame(data, columns=self.columns)
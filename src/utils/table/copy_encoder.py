@@ -0,0 +1,444 @@
+import io
+import json
+import struct
+import numpy as _np
+from uuid import UUID as _UUID
+from decimal import Decimal as _Decimal
+from datetime import (
+    date as _date,
+    datetime as _datetime,
+    time as _time,
+    timedelta as _timedelta,
+    timezone as _timezone
+)
+from .columnar_chunk import ColumnarChunk as _ColumnarChunk
+
+
+_PG_EPOCH_DATE = _date(2000, 1, 1)
+_PG_EPOCH_DATETIME = _datetime(2000, 1, 1)
+_PG_EPOCH_DATETIME_UTC = _datetime(2000, 1, 1, tzinfo=_timezone.utc)
+
+_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_BINARY_TRAILER = struct.pack('!h', -1)
+_NULL_FIELD = struct.pack('!i', -1)
+
+_TEXT_TYPES = {'text', 'varchar', 'bpchar', 'name', 'citext', 'char', 'xml'}
+
+_PG_EPOCH_DAYS = 10957
+_PG_EPOCH_MICROS = 946684800000000
+
+_FIXED_WIDTH_TYPES = {
+    'int2': ('iu', '>i2', _np.iinfo(_np.int16)),
+    'int4': ('iu', '>i4', _np.iinfo(_np.int32)),
+    'int8': ('iu', '>i8', _np.iinfo(_np.int64)),
+    'float4': ('iuf', '>f4', None),
+    'float8': ('iuf', '>f8', None),
+    'bool': ('b', '?', None),
+}
+
+
+class CsvCopyEncoder:
+    def __init__(self, column_types: dict[str, str] = None, columns: list[str] = None) -> None:
+        """
+        Initialize an encoder that turns a chunk of rows into a COPY ... (FORMAT csv) payload.
+
+        NULL is written as an unquoted empty field and every string is quoted, so empty strings and NULLs stay distinct.
+
+        Parameters:
+            column_types (dict[str, str], optional): Target column type names keyed by column name, used to tell arrays from JSON values.
+            columns (list[str], optional): Column names in the order they appear in each row. Required when column_types is given.
+        """
+        self._array_columns = set()
+        if column_types and columns:
+            self._array_columns = {
+                i for i, c in enumerate(columns) if column_types.get(c, '').startswith('_')
+            }
+        self._formatters = {
+            str: self._format_str,
+            bool: self._format_bool,
+            int: str,
+            float: self._format_float,
+            _Decimal: str,
+            _datetime: self._format_datetime,
+            _date: _date.isoformat,
+            _time: _time.isoformat,
+            _timedelta: self._format_interval,
+            bytes: self._format_bytes,
+            bytearray: self._format_bytes,
+            memoryview: self._format_bytes,
+            _UUID: str,
+            dict: self._format_json,
+            list: self._format_json,
+        }
+
+    def _format_str(self, value: str) -> str:
+        return '"' + value.replace('"', '""') + '"'
+
+    def _format_bool(self, value: bool) -> str:
+        return 't' if value else 'f'
+
+    def _format_float(self, value: float) -> str:
+        if value != value:
+            return 'NaN'
+        return repr(value)
+
+    def _format_datetime(self, value: _datetime) -> str:
+        return value.isoformat(sep=' ')
+
+    def _format_interval(self, value: _timedelta) -> str:
+        return f'{value.days} days {value.seconds} seconds {value.microseconds} microseconds'
+
+    def _format_bytes(self, value: bytes) -> str:
+        return '\\x' + bytes(value).hex()
+
+    def _format_json(self, value: object) -> str:
+        return self._format_str(json.dumps(value, default=str))
+
+    def _array_literal(self, value: list) -> str:
+        items = []
+        for item in value:
+            if item is None:
+                items.append('NULL')
+            elif isinstance(item, list):
+                items.append(self._array_literal(item))
+            else:
+                text = item if isinstance(item, str) else self.format_value(item)
+                if isinstance(item, dict):
+                    text = json.dumps(item, default=str)
+                items.append('"' + text.replace('\\', '\\\\').replace('"', '\\"') + '"')
+        return '{' + ','.join(items) + '}'
+
+    def _format_array(self, value: list) -> str:
+        return self._format_str(self._array_literal(value))
+
+    def format_value(self, value: object) -> str:
+        """
+        Format a single Python value as a CSV field understood by the PostgreSQL input functions.
+        """
+        if value is None:
+            return ''
+        formatter = self._formatters.get(type(value))
+        if formatter is None:
+            for value_type, candidate in self._formatters.items():
+                if isinstance(value, value_type):
+                    formatter = candidate
+                    break
+            else:
+                formatter = lambda v: self._format_str(str(v))
+            self._formatters[type(value)] = formatter
+        return formatter(value)
+
+    def encode(self, data: list) -> io.BytesIO:
+        """
+        Encode a chunk of rows into an in-memory CSV buffer ready for cursor.copy_expert.
+
+        Parameters:
+            data (list): Sequence of rows, each row a sequence of column values, or a ColumnarChunk.
+
+        Returns:
+            io.BytesIO: UTF-8 encoded CSV payload positioned at the start.
+        """
+        if isinstance(data, _ColumnarChunk):
+            return self._encode_columnar(data)
+
+        format_value = self.format_value
+        array_columns = self._array_columns
+        lines = []
+        for row in data:
+            if array_columns:
+                fields = [
+                    self._format_array(v) if i in array_columns and v is not None else format_value(v)
+                    for i, v in enumerate(row)
+                ]
+            else:
+                fields = [format_value(v) for v in row]
+            lines.append(','.join(fields))
+        lines.append('')
+
+        return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+    def _encode_columnar(self, chunk: _ColumnarChunk) -> io.BytesIO:
+        """
+        Encode a columnar chunk one column at a time, formatting typed arrays with vectorized NumPy conversions.
+        """
+        fields = []
+        for index, (array, mask) in enumerate(zip(chunk.arrays, chunk.masks)):
+            kind = array.dtype.kind
+            if index in self._array_columns or kind not in 'iufbM':
+                fields.append([
+                    self._format_array(v) if index in self._array_columns and v is not None else self.format_value(v)
+                    for v in chunk.column_values(index)
+                ])
+                continue
+
+            if kind == 'b':
+                text = _np.where(array, 't', 'f')
+            elif kind == 'M':
+                text = _np.datetime_as_string(array)
+            else:
+                text = array.astype(str)
+            if mask is not None:
+                text = _np.where(mask, '', text)
+            fields.append(text.tolist())
+
+        lines = [','.join(row) for row in zip(*fields)]
+        lines.append('')
+
+        return io.BytesIO('\n'.join(lines).encode('utf-8'))
+
+
+class BinaryCopyEncoder:
+    def __init__(self, columns: list[str], column_types: dict[str, str]) -> None:
+        """
+        Initialize an encoder that turns a chunk of rows into a COPY ... (FORMAT binary) payload.
+
+        Binary COPY has no type coercion on the server, so every value is packed according to the type of its target column.
+
+        Parameters:
+            columns (list[str]): Column names in the order they appear in each row.
+            column_types (dict[str, str]): Target column type names keyed by column name.
+
+        Raises:
+            ValueError: If a column is missing from column_types or its type has no binary encoder.
+        """
+        self._field_count = struct.pack('!h', len(columns))
+        self._type_names = [column_types.get(column) for column in columns]
+        self._packers = []
+        for column in columns:
+            if column not in column_types:
+                raise ValueError(f'Column {column} not found in target table')
+            type_name = column_types[column]
+            packer = self._get_packer(type_name)
+            if packer is None:
+                raise ValueError(
+                    f'Type {type_name} of column {column} is not supported by binary COPY. Use the copy_csv load strategy.'
+                )
+            self._packers.append(packer)
+
+    def _get_packer(self, type_name: str):
+        if type_name in _TEXT_TYPES:
+            return self._pack_text
+        return {
+            'bool': self._pack_bool,
+            'int2': self._fixed('!h'),
+            'int4': self._fixed('!i'),
+            'int8': self._fixed('!q'),
+            'oid': self._fixed('!I'),
+            'float4': self._fixed('!f'),
+            'float8': self._fixed('!d'),
+            'numeric': self._pack_numeric,
+            'bytea': self._pack_bytea,
+            'json': self._pack_json,
+            'jsonb': self._pack_jsonb,
+            'uuid': self._pack_uuid,
+            'date': self._pack_date,
+            'timestamp': self._pack_timestamp,
+            'timestamptz': self._pack_timestamptz,
+            'time': self._pack_time,
+            'interval': self._pack_interval,
+        }.get(type_name)
+
+    def _fixed(self, fmt: str):
+        packer = struct.Struct('!i' + fmt[1:])
+        size = packer.size - 4
+        return lambda value: packer.pack(size, value)
+
+    def _pack_raw(self, payload: bytes) -> bytes:
+        return struct.pack('!i', len(payload)) + payload
+
+    def _pack_text(self, value: object) -> bytes:
+        return self._pack_raw(str(value).encode('utf-8'))
+
+    def _pack_bool(self, value: bool) -> bytes:
+        return b'\x00\x00\x00\x01\x01' if value else b'\x00\x00\x00\x01\x00'
+
+    def _pack_bytea(self, value: bytes) -> bytes:
+        return self._pack_raw(bytes(value))
+
+    def _pack_json(self, value: object) -> bytes:
+        if not isinstance(value, str):
+            value = json.dumps(value, default=str)
+        return self._pack_raw(value.encode('utf-8'))
+
+    def _pack_jsonb(self, value: object) -> bytes:
+        if not isinstance(value, str):
+            value = json.dumps(value, default=str)
+        return self._pack_raw(b'\x01' + value.encode('utf-8'))
+
+    def _pack_uuid(self, value: object) -> bytes:
+        if not isinstance(value, _UUID):
+            value = _UUID(str(value))
+        return self._pack_raw(value.bytes)
+
+    def _pack_date(self, value: _date) -> bytes:
+        if isinstance(value, _datetime):
+            value = value.date()
+        return struct.pack('!ii', 4, (value - _PG_EPOCH_DATE).days)
+
+    def _pack_timestamp(self, value: _datetime) -> bytes:
+        if value.tzinfo is not None:
+            value = value.replace(tzinfo=None)
+        return struct.pack('!iq', 8, self._micros(value - _PG_EPOCH_DATETIME))
+
+    def _pack_timestamptz(self, value: _datetime) -> bytes:
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=_timezone.utc)
+        return struct.pack('!iq', 8, self._micros(value - _PG_EPOCH_DATETIME_UTC))
+
+    def _pack_time(self, value: _time) -> bytes:
+        micros = ((value.hour * 60 + value.minute) * 60 + value.second) * 1000000 + value.microsecond
+        return struct.pack('!iq', 8, micros)
+
+    def _pack_interval(self, value: _timedelta) -> bytes:
+        micros = value.seconds * 1000000 + value.microseconds
+        return struct.pack('!iqii', 16, micros, value.days, 0)
+
+    def _micros(self, delta: _timedelta) -> int:
+        return (delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds
+
+    def _pack_numeric(self, value: object) -> bytes:
+        if not isinstance(value, _Decimal):
+            value = _Decimal(str(value))
+        if value.is_nan():
+            return struct.pack('!ihhHh', 8, 0, 0, 0xC000, 0)
+        if value.is_infinite():
+            sign = 0xF000 if value.is_signed() else 0xD000
+            return struct.pack('!ihhHh', 8, 0, 0, sign, 0)
+
+        integer_part, _, fraction_part = format(abs(value), 'f').partition('.')
+        dscale = len(fraction_part)
+        integer_part = integer_part.lstrip('0')
+        integer_part = '0' * ((-len(integer_part)) % 4) + integer_part
+        fraction_part = fraction_part + '0' * ((-len(fraction_part)) % 4)
+
+        groups = [int(integer_part[i:i + 4]) for i in range(0, len(integer_part), 4)]
+        weight = len(groups) - 1
+        groups += [int(fraction_part[i:i + 4]) for i in range(0, len(fraction_part), 4)]
+
+        while groups and groups[0] == 0:
+            groups.pop(0)
+            weight -= 1
+        while groups and groups[-1] == 0:
+            groups.pop()
+        if not groups:
+            weight = 0
+
+        payload = struct.pack(
+            f'!hhHh{len(groups)}h', len(groups), weight, 0x4000 if groups and value.is_signed() else 0x0000, dscale, *groups
+        )
+        return self._pack_raw(payload)
+
+    def encode(self, data: list) -> io.BytesIO:
+        """
+        Encode a chunk of rows into an in-memory binary COPY buffer ready for cursor.copy_expert.
+
+        Parameters:
+            data (list): Sequence of rows, each row a sequence of column values, or a ColumnarChunk.
+
+        Returns:
+            io.BytesIO: Binary COPY payload, including header and trailer, positioned at the start.
+        """
+        if isinstance(data, _ColumnarChunk):
+            payload = self._encode_fixed_width(data)
+            if payload is not None:
+                return payload
+            data = data.to_rows()
+
+        packers = self._packers
+        field_count = self._field_count
+        parts = [_BINARY_HEADER]
+        for row in data:
+            parts.append(field_count)
+            for packer, value in zip(packers, row):
+                parts.append(_NULL_FIELD if value is None else packer(value))
+        parts.append(_BINARY_TRAILER)
+
+        return io.BytesIO(b''.join(parts))
+
+    def _fixed_width_column(self, type_name: str, array: _np.ndarray):
+        """
+        Return the big-endian dtype and converted values of a column that can be packed without a per-value loop, or None.
+        """
+        kind = array.dtype.kind
+        if type_name in _FIXED_WIDTH_TYPES:
+            kinds, dtype, limits = _FIXED_WIDTH_TYPES[type_name]
+            if kind not in kinds:
+                return None
+            if limits is not None and len(array) and (array.min() < limits.min or array.max() > limits.max):
+                return None
+            return dtype, array
+        if type_name == 'date' and array.dtype == _np.dtype('datetime64[D]'):
+            return '>i4', array.astype(_np.int64) - _PG_EPOCH_DAYS
+        if type_name in ('timestamp', 'timestamptz') and kind == 'M':
+            return '>i8', array.astype('datetime64[us]').astype(_np.int64) - _PG_EPOCH_MICROS
+        return None
+
+    def _encode_fixed_width(self, chunk: _ColumnarChunk):
+        """
+        Pack a columnar chunk whose columns are all fixed-width and NULL-free into one NumPy record array, so the whole chunk is encoded without a Python loop.
+
+        Returns:
+            io.BytesIO: The binary COPY payload, or None if some column needs the row-by-row path.
+        """
+        fields = [('field_count', '>i2')]
+        values = []
+        for index, (type_name, array, mask) in enumerate(zip(self._type_names, chunk.arrays, chunk.masks)):
+            if mask is not None:
+                return None
+            column = self._fixed_width_column(type_name, array)
+            if column is None:
+                return None
+            dtype, converted = column
+            fields += [(f'length_{index}', '>i4'), (f'value_{index}', dtype)]
+            values.append(converted)
+
+        records = _np.empty(len(chunk), dtype=fields)
+        records['field_count'] = len(values)
+        for index, converted in enumerate(values):
+            records[f'length_{index}'] = records.dtype[f'value_{index}'].itemsize
+            records[f'value_{index}'] = converted
+
+        return io.BytesIO(_BINARY_HEADER + records.tobytes() + _BINARY_TRAILER)
+
+
+
+class CopyBlock:
+    def __init__(self, payload: bytes, rows: int, copy_format: str = 'binary') -> None:
+        """
+        Initialize a block of rows already in a COPY format, passed untouched from a COPY TO STDOUT of the source to a COPY FROM STDIN of the target.
+
+        A block holds whole rows only, so blocks of one stream can be loaded by different consumers in any order. Binary blocks carry their own header and trailer.
+
+        Parameters:
+            payload (bytes): The rows in the COPY format, with the header and trailer of the binary format.
+            rows (int): Number of rows of the block.
+            copy_format (str, optional): 'binary' or 'text'. Defaults to 'binary'.
+        """
+        self.payload = payload
+        self.rows = rows
+        self.copy_format = copy_format
+
+    @classmethod
+    def from_rows(cls, rows: list[bytes], copy_format: str = 'binary') -> 'CopyBlock':
+        """
+        Build a block from rows as sent by the server, one COPY data message per row.
+        """
+        if copy_format == 'binary':
+            payload = b''.join([_BINARY_HEADER, *rows, _BINARY_TRAILER])
+        else:
+            payload = b''.join(rows)
+
+        return cls(payload, len(rows), copy_format)
+
+    def buffer(self) -> io.BytesIO:
+        """
+        Return the payload as a file object for cursor.copy_expert.
+        """
+        return io.BytesIO(self.payload)
+
+    def __len__(self) -> int:
+        return self.rows
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.payload)
@@ -1,15 +1,129 @@
+import re as _re
+from threading import Lock as _Lock
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
 from sqlalchemy.engine import Engine as _Engine
 from sqlalchemy.exc import SQLAlchemyError as _SQLAlchemyError
 from sqlalchemy.engine import Connection as _Connection
 from sqlalchemy import text
+from psycopg2 import Error as _DBAPIError
+from psycopg2.extensions import adapt as _adapt
+from psycopg2.extras import execute_values as _execute_values
+from src.utils.table.table_schema import TableSchema as _TableSchema
 
 
 class TableManager:
     def __init__(self) -> None:
         """
         Initialize a new instance of the TableManager class.
+
+        Table schemas read from the catalog are cached per database and table for the life of the instance, so share one instance between jobs. The cache entries of the tables the manager itself creates, drops or swaps are invalidated; call invalidate_schema after altering a table by other means.
+        """
+        self._schemas: dict[tuple[str, str], _TableSchema] = {}
+        self._schemas_lock = _Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_schemas_lock'] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._schemas_lock = _Lock()
+
+    def _schema_key(self, conn: _Engine, table_name: str) -> tuple[str, str]:
+        return str(conn.url), table_name
+
+    def get_table_schemas(self, conn: _Engine, table_names: list[str], refresh: bool = False) -> dict[str, _TableSchema]:
+        """
+        Read the columns, types, nullability and primary key of many tables or views from pg_attribute and pg_index in one query, skipping the tables already cached.
+
+        Nothing is planned or executed on the tables themselves, so views over costly queries cost no more than tables.
+
+        Parameters:
+            table_names (list[str]): Table names, optionally schema-qualified.
+            refresh (bool, optional): Read every table again instead of using the cache. Defaults to False.
+
+        Returns:
+            dict[str, TableSchema]: Schemas keyed by table name.
+
+        Raises:
+            SQLAlchemyError: If the catalog query fails or a table does not exist.
+        """
+        with self._schemas_lock:
+            schemas = {
+                name: self._schemas[self._schema_key(conn, name)]
+                for name in table_names
+                if not refresh and self._schema_key(conn, name) in self._schemas
+            }
+        missing = [name for name in dict.fromkeys(table_names) if name not in schemas]
+        if not missing:
+            return schemas
+
+        query = text("""
+            SELECT t.name, a.attname, COALESCE(bt.typname, ty.typname), NOT a.attnotnull,
+                   array_position(i.indkey::int2[], a.attnum)
+            FROM unnest(CAST(:table_names AS text[])) AS t(name)
+            JOIN pg_attribute a ON a.attrelid = to_regclass(t.name)
+            JOIN pg_type ty ON ty.oid = a.atttypid
+            LEFT JOIN pg_type bt ON ty.typtype = 'd' AND bt.oid = ty.typbasetype
+            LEFT JOIN pg_index i ON i.indrelid = a.attrelid AND i.indisprimary
+            WHERE a.attnum > 0
+              AND NOT a.attisdropped
+            ORDER BY t.name, a.attnum
+        """)
+
+        with conn.connect() as con:
+            try:
+                rows = con.execute(query, {"table_names": missing}).fetchall()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get schema of tables {missing}: {e}")
+
+        found: dict[str, list] = {}
+        for name, column, type_name, nullable, key_position in rows:
+            found.setdefault(name, []).append((column, type_name, nullable, key_position))
+
+        not_found = [name for name in missing if name not in found]
+        if not_found:
+            raise _SQLAlchemyError(f"Fail to get schema of tables {not_found}: relation does not exist")
+
+        with self._schemas_lock:
+            for name, attributes in found.items():
+                keys = sorted((position, column) for column, _, _, position in attributes if position is not None)
+                schema = _TableSchema(
+                    table_name=name,
+                    columns=[column for column, _, _, _ in attributes],
+                    types={column: type_name for column, type_name, _, _ in attributes},
+                    nullable={column: nullable for column, _, nullable, _ in attributes},
+                    primary_key=[column for _, column in keys]
+                )
+                self._schemas[self._schema_key(conn, name)] = schema
+                schemas[name] = schema
+
+        return schemas
+
+    def get_table_schema(self, conn: _Engine, table_name: str, schema: str = None, refresh: bool = False) -> _TableSchema:
+        """
+        Read the columns, types, nullability and primary key of a table or view from the catalog, or from the cache.
+
+        Raises:
+            SQLAlchemyError: If the catalog query fails or the table does not exist.
+        """
+        if schema:
+            table_name = f"{schema}.{table_name}"
+
+        return self.get_table_schemas(conn, [table_name], refresh)[table_name]
+
+    def invalidate_schema(self, conn: _Engine = None, table_name: str = None) -> None:
+        """
+        Drop cached schemas: of one table of a database, of every table of a database, or all of them.
         """
-        pass
+        with self._schemas_lock:
+            if conn is None and table_name is None:
+                self._schemas.clear()
+                return
+            for key in list(self._schemas):
+                if (conn is None or key[0] == str(conn.url)) and (table_name is None or key[1] == table_name):
+                    del self._schemas[key]
 
     def truncate_table(self, conn:_Engine, table_name:str, schema: str = None) -> None:
         """
@@ -26,6 +140,23 @@ class TableManager:
                 except _SQLAlchemyError as e:
                     raise _SQLAlchemyError(f"Fail to truncate table: {e}")
     
+    def delete_rows(self, conn: _Engine, table_name: str, where: str) -> int:
+        """
+        Delete the rows of a table matching a predicate, e.g. the rows of a range loaded by an interrupted attempt before it is loaded again.
+
+        Returns:
+            int: Number of rows deleted.
+
+        Raises:
+            SQLAlchemyError: If the delete fails.
+        """
+        with conn.connect() as con:
+            with con.begin():
+                try:
+                    return con.execute(text(f"DELETE FROM {table_name} WHERE {where}")).rowcount
+                except _SQLAlchemyError as e:
+                    raise _SQLAlchemyError(f"Fail to delete rows from table {table_name}: {e}")
+
     def get_table_columns(self, conn:_Engine, table_name: str, schema:str = None) -> list[str]:
         """
         Retrieve the column names of a specified table.
@@ -40,28 +171,16 @@ class TableManager:
         Raises:
         	SQLAlchemyError: If the query to retrieve columns fails.
         """
-        if schema:
-            table_name = f"{schema}.{table_name}"
-
-        with conn.connect() as con:
-            try:
-                cursor = con.execute(text(f"SELECT * FROM {table_name} limit 1"))
-                
-                result = cursor.keys()
-
-                columns = list(result)
-                
-                return columns
-                
-            except _SQLAlchemyError as e:
-                raise _SQLAlchemyError(f"Fail to get columns from table {table_name}: {e}")
+        return list(self.get_table_schema(conn, table_name, schema).columns)
     
     def create_select_query(
         self, 
         table_name: str, 
         columns: list[str], 
         schema: str = None, 
-        ignore_columns: list[str] = None
+        ignore_columns: list[str] = None,
+        where: str = None,
+        order_by: str = None
     ) -> str:
         """
         Construct a SQL SELECT query string for the specified table and columns, optionally excluding specified columns.
@@ -71,6 +190,8 @@ class TableManager:
             columns (list[str]): List of column names to include in the SELECT statement.
             schema (str, optional): Schema name to prefix the table with.
             ignore_columns (list[str], optional): List of column names to exclude from the SELECT statement.
+            where (str, optional): Predicate appended as a WHERE clause, e.g. a key range built by get_key_ranges.
+            order_by (str, optional): Expression appended as an ORDER BY clause.
         
         Returns:
             str: The constructed SQL SELECT query string.
@@ -89,7 +210,15 @@ class TableManager:
         except ValueError as e:
             raise ValueError(f'Invalid type of columns. Use a list of strings. \n{e}')
 
-        return f"SELECT {columns_str} FROM {table_name}"
+        query = f"SELECT {columns_str} FROM {table_name}"
+
+        if where:
+            query = f"{query} WHERE {where}"
+
+        if order_by:
+            query = f"{query} ORDER BY {order_by}"
+
+        return query
 
                     
     def insert(
@@ -102,17 +231,46 @@ class TableManager:
         """
         Performs a batch insert of data into a database table using the provided insert query template.
         
-        If the insert operation fails, the transaction is rolled back and a SQLAlchemyError is raised with an error message.
+        Columnar chunks are converted back to row tuples first. If the insert operation fails, the transaction is rolled back and a SQLAlchemyError is raised with an error message.
         """
+        to_rows = getattr(data, 'to_rows', None)
+        if to_rows is not None:
+            data = to_rows()
         try:
             cursor.executemany(insert_query_template, data)
             conn.commit()
-        except _SQLAlchemyError as e:
+        except (_SQLAlchemyError, _DBAPIError) as e:
             conn.rollback()
             raise _SQLAlchemyError(
                 f"Fail to insert data \n {e}"
             )
     
+    def build_multirow_insert(self, insert_query_template: str, rows: list, mogrify) -> bytes:
+        """
+        Expand an INSERT query template with one VALUES placeholder group into a single statement inserting every row.
+
+        One statement per chunk is atomic on its own, which is what asynchronous (autocommit) connections need, and costs a single round trip.
+
+        Parameters:
+            insert_query_template (str): Template built by build_insert_query or build_upsert_query.
+            rows (list): Rows of the chunk.
+            mogrify (Callable): Function binding one row to the placeholder group, e.g. cursor.mogrify.
+
+        Returns:
+            bytes: The statement with the rows bound as literals.
+
+        Raises:
+            ValueError: If the template has no VALUES placeholder group.
+        """
+        head, sep, tail = insert_query_template.partition("VALUES (")
+        if not sep:
+            raise ValueError("Insert query template has no VALUES placeholder group")
+        placeholders, _, tail = tail.partition(")")
+        row_template = f"({placeholders})"
+        values = b",".join(mogrify(row_template, tuple(row)) for row in rows)
+
+        return head.encode() + b"VALUES " + values + tail.encode()
+
     def build_insert_query(self, table_name: str,columns: list[str]) -> str:
         """
         Generate an SQL INSERT INTO query template for the specified table and columns.
@@ -131,4 +289,796 @@ class TableManager:
             INSERT INTO {table_name}({columns_names_str}) VALUES ({columns_name_parametes})
         """
 
-        return insert_query_template
\ No newline at end of file
+        return insert_query_template
+
+    def get_column_types(self, conn: _Engine, table_name: str, schema: str = None) -> dict[str, str]:
+        """
+        Retrieve the PostgreSQL type name of each column of a table from the catalog.
+
+        Domains are resolved to their base type and array types keep the leading underscore of their catalog name (e.g. '_int4').
+
+        Parameters:
+            table_name (str): Name of the table to inspect.
+            schema (str, optional): Schema name to qualify the table, if applicable.
+
+        Returns:
+            dict[str, str]: Type names keyed by column name.
+
+        Raises:
+            SQLAlchemyError: If the catalog query fails or the table does not exist.
+        """
+        return dict(self.get_table_schema(conn, table_name, schema).types)
+
+    def build_copy_query(self, table_name: str, columns: list[str], copy_format: str = 'csv') -> str:
+        """
+        Generate a COPY ... FROM STDIN statement for the specified table and columns.
+
+        Parameters:
+            table_name (str): Name of the table to load.
+            columns (list[str]): List of column names, in the order they appear in the payload.
+            copy_format (str, optional): 'csv', 'binary' or 'text'. Defaults to 'csv'.
+
+        Returns:
+            str: The COPY statement to be used with cursor.copy_expert.
+
+        Raises:
+            ValueError: If copy_format is not supported.
+        """
+        columns_names_str = ",".join(columns)
+
+        return f"COPY {table_name}({columns_names_str}) FROM STDIN WITH ({self._copy_options(copy_format)})"
+
+    def build_copy_to_query(self, query: str, copy_format: str = 'binary') -> str:
+        """
+        Generate a COPY (query) TO STDOUT statement streaming the result of a query in a COPY format.
+
+        Parameters:
+            query (str): SELECT query whose result is exported.
+            copy_format (str, optional): 'csv', 'binary' or 'text'. Defaults to 'binary'.
+
+        Raises:
+            ValueError: If copy_format is not supported.
+        """
+        return f"COPY ({query}) TO STDOUT WITH ({self._copy_options(copy_format)})"
+
+    def _copy_options(self, copy_format: str) -> str:
+        if copy_format == 'csv':
+            return "FORMAT csv, ENCODING 'UTF8'"
+        if copy_format == 'binary':
+            return "FORMAT binary"
+        if copy_format == 'text':
+            return "FORMAT text, ENCODING 'UTF8'"
+
+        raise ValueError(f"Invalid copy format {copy_format}. Use 'csv', 'binary' or 'text'.")
+
+    def copy_insert(
+        self,
+        data: object,
+        conn: _Connection,
+        cursor: object,
+        copy_query: str,
+        encoder: object = None
+    ) -> None:
+        """
+        Loads a chunk of rows with COPY FROM STDIN, streaming the encoded chunk from an in-memory buffer.
+
+        If the load fails, the transaction is rolled back and a SQLAlchemyError is raised with an error message.
+
+        Parameters:
+            data (object): Chunk of rows read from the monitor, or a buffer already encoded in the COPY format when no encoder is given.
+            copy_query (str): COPY statement built by build_copy_query.
+            encoder (object, optional): CsvCopyEncoder or BinaryCopyEncoder matching the COPY format.
+        """
+        try:
+            buffer = encoder.encode(data) if encoder is not None else data
+            cursor.copy_expert(copy_query, buffer)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise _SQLAlchemyError(
+                f"Fail to copy data \n {e}"
+            )
+
+    def export_snapshot(self, conn: _Engine) -> tuple[_Connection, str]:
+        """
+        Open a REPEATABLE READ transaction and export its snapshot with pg_export_snapshot().
+
+        The snapshot can only be imported while the exporting transaction is open, so the returned connection must be kept open until every reader has started and closed afterwards.
+
+        Returns:
+            tuple[_Connection, str]: The open connection holding the snapshot and the snapshot id.
+
+        Raises:
+            SQLAlchemyError: If the snapshot cannot be exported.
+        """
+        con = conn.connect().execution_options(isolation_level="REPEATABLE READ")
+        try:
+            con.begin()
+            snapshot_id = con.execute(text("SELECT pg_export_snapshot()")).scalar()
+        except _SQLAlchemyError as e:
+            con.close()
+            raise _SQLAlchemyError(f"Fail to export snapshot: {e}")
+
+        return con, snapshot_id
+
+    def get_key_ranges(
+        self,
+        conn: _Engine,
+        table_name: str,
+        key_column: str,
+        ranges: int,
+        schema: str = None
+    ) -> list[str]:
+        """
+        Split a table into contiguous ranges of an integer key column.
+
+        The first and last ranges are open-ended, so rows outside the observed min/max are never lost, and the first range also takes NULL keys unless the catalog says the column is NOT NULL. The key type is checked against the cached schema before the table is scanned.
+
+        Parameters:
+            table_name (str): Name of the table to split.
+            key_column (str): Integer column used to split the table.
+            ranges (int): Number of ranges to build.
+            schema (str, optional): Schema name to qualify the table, if applicable.
+
+        Returns:
+            list[str]: One WHERE predicate per range.
+
+        Raises:
+            SQLAlchemyError: If the min/max query fails.
+            ValueError: If the key column is not an integer column.
+        """
+        if schema:
+            table_name = f"{schema}.{table_name}"
+
+        table_schema = self.get_table_schema(conn, table_name)
+        if key_column in table_schema.types and not table_schema.is_integer(key_column):
+            raise ValueError(
+                f"Key column {key_column} must be an integer column to split table {table_name}, not {table_schema.types[key_column]}"
+            )
+
+        with conn.connect() as con:
+            try:
+                min_key, max_key = con.execute(
+                    text(f"SELECT min({key_column}), max({key_column}) FROM {table_name}")
+                ).one()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get key range from table {table_name}: {e}")
+
+        if min_key is None:
+            return ["TRUE"]
+        if not isinstance(min_key, int):
+            raise ValueError(f"Key column {key_column} must be an integer column to split table {table_name}")
+
+        step = max((max_key - min_key + 1) // ranges, 1)
+        bounds = [min_key + step * i for i in range(1, ranges) if min_key + step * i <= max_key]
+
+        return self._build_range_predicates(
+            key_column, [str(b) for b in bounds], table_schema.nullable.get(key_column, True)
+        )
+
+    def get_ctid_ranges(self, conn: _Engine, table_name: str, ranges: int, schema: str = None) -> list[str]:
+        """
+        Split a table into contiguous ranges of physical blocks using ctid.
+
+        Works on tables without a usable key. PostgreSQL 14 or newer executes each range as a TID range scan, so every reader only visits its own blocks.
+
+        Parameters:
+            table_name (str): Name of the table to split.
+            ranges (int): Number of ranges to build.
+            schema (str, optional): Schema name to qualify the table, if applicable.
+
+        Returns:
+            list[str]: One WHERE predicate per range.
+
+        Raises:
+            SQLAlchemyError: If the relation size query fails.
+        """
+        if schema:
+            table_name = f"{schema}.{table_name}"
+
+        with conn.connect() as con:
+            try:
+                blocks = con.execute(
+                    text("SELECT pg_relation_size(to_regclass(:table_name)) / current_setting('block_size')::int"),
+                    {"table_name": table_name}
+                ).scalar()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get size of table {table_name}: {e}")
+
+        step = max(int(blocks or 0) // ranges, 1)
+        bounds = [step * i for i in range(1, ranges) if step * i < (blocks or 0)]
+
+        return self._build_range_predicates("ctid", [f"'({b},0)'::tid" for b in bounds], nullable=False)
+
+    def get_table_size_estimates(self, conn: _Engine, table_names: list[str]) -> dict[str, tuple[int, int]]:
+        """
+        Read the planner estimates of row count and size of many tables from pg_class in one query.
+
+        reltuples and relpages are maintained by VACUUM and ANALYZE, so reading them costs nothing. Tables never vacuumed fall back to their current size on disk and an unknown row count of 0.
+
+        Parameters:
+            table_names (list[str]): Table names, optionally schema-qualified.
+
+        Returns:
+            dict[str, tuple[int, int]]: (estimated rows, estimated bytes) keyed by table name; (0, 0) for tables that do not exist.
+
+        Raises:
+            SQLAlchemyError: If the catalog query fails.
+        """
+        query = text("""
+            SELECT t.name,
+                   GREATEST(COALESCE(c.reltuples, 0), 0)::bigint,
+                   CASE WHEN c.relpages > 0
+                        THEN c.relpages::bigint * current_setting('block_size')::int
+                        ELSE COALESCE(pg_relation_size(c.oid), 0)
+                   END
+            FROM unnest(CAST(:table_names AS text[])) AS t(name)
+            LEFT JOIN pg_class c ON c.oid = to_regclass(t.name)
+        """)
+
+        with conn.connect() as con:
+            try:
+                rows = con.execute(query, {"table_names": list(table_names)}).fetchall()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get size estimates of tables {table_names}: {e}")
+
+        return {name: (int(reltuples), int(size)) for name, reltuples, size in rows}
+
+    def _build_range_predicates(self, column: str, bounds: list[str], nullable: bool = True) -> list[str]:
+        """
+        Turn ordered split points into WHERE predicates covering the whole domain of a column.
+        """
+        if not bounds:
+            return ["TRUE"]
+
+        predicates = [f"({column} < {bounds[0]} OR {column} IS NULL)" if nullable else f"{column} < {bounds[0]}"]
+        for lower, upper in zip(bounds, bounds[1:]):
+            predicates.append(f"{column} >= {lower} AND {column} < {upper}")
+        predicates.append(f"{column} >= {bounds[-1]}")
+
+        return predicates
+
+    def build_upsert_query(
+        self,
+        table_name: str,
+        columns: list[str],
+        conflict_columns: list[str],
+        update_columns: list[str] = None
+    ) -> str:
+        """
+        Generate an INSERT ... ON CONFLICT query template that merges rows on a conflict key.
+
+        Parameters:
+            table_name (str): Name of the table to insert into.
+            columns (list[str]): List of column names for the insert operation.
+            conflict_columns (list[str]): Columns of the unique constraint or primary key used to detect existing rows.
+            update_columns (list[str], optional): Columns overwritten on conflict. Defaults to every column outside the conflict key; when empty, conflicting rows are left untouched.
+
+        Returns:
+            str: An SQL statement template with parameter placeholders for each column.
+        """
+        insert_query_template = self.build_insert_query(table_name, columns).rstrip()
+
+        return f"{insert_query_template} {self._on_conflict_clause(columns, conflict_columns, update_columns)}"
+
+    def _on_conflict_clause(self, columns: list[str], conflict_columns: list[str], update_columns: list[str] = None) -> str:
+        if update_columns is None:
+            update_columns = [c for c in columns if c not in conflict_columns]
+        conflict_str = ",".join(conflict_columns)
+
+        if update_columns:
+            set_str = ",".join([f"{c} = EXCLUDED.{c}" for c in update_columns])
+            return f"ON CONFLICT ({conflict_str}) DO UPDATE SET {set_str}"
+
+        return f"ON CONFLICT ({conflict_str}) DO NOTHING"
+
+    def build_upsert_values_query(
+        self,
+        table_name: str,
+        columns: list[str],
+        conflict_columns: list[str],
+        update_columns: list[str] = None,
+        rows: int = None
+    ) -> str:
+        """
+        Generate a multi-row INSERT ... ON CONFLICT statement whose VALUES list is a single %s placeholder, filled with pages of rows by psycopg2.extras.execute_values.
+
+        With rows, the VALUES list holds that many groups of numbered parameters ($1, $2, ...) instead, so the statement can be PREPAREd and run with EXECUTE for every page of exactly that many rows.
+
+        Parameters:
+            conflict_columns (list[str]): Columns of the unique constraint or primary key used to detect existing rows.
+            update_columns (list[str], optional): Columns overwritten on conflict, as in build_upsert_query.
+            rows (int, optional): Number of rows of the prepared statement. Defaults to None (execute_values placeholder).
+
+        Returns:
+            str: The statement.
+        """
+        if rows is None:
+            values = "%s"
+        else:
+            width = len(columns)
+            values = ",".join(
+                "(" + ",".join(f"${row * width + i + 1}" for i in range(width)) + ")"
+                for row in range(rows)
+            )
+
+        return (
+            f"INSERT INTO {table_name}({','.join(columns)}) VALUES {values} "
+            f"{self._on_conflict_clause(columns, conflict_columns, update_columns)}"
+        )
+
+    def prepare_statement(self, conn: _Connection, cursor: object, name: str, query: str) -> None:
+        """
+        PREPARE a statement on a DBAPI connection, so the server parses and plans it once for the whole session.
+
+        Raises:
+            SQLAlchemyError: If the statement cannot be prepared.
+        """
+        try:
+            cursor.execute(f"PREPARE {name} AS {query}")
+            conn.commit()
+        except _DBAPIError as e:
+            conn.rollback()
+            raise _SQLAlchemyError(f"Fail to prepare statement {name} \n {e}")
+
+    def deallocate_statement(self, conn: _Connection, cursor: object, name: str) -> None:
+        """
+        Release a prepared statement before its connection goes back to the pool. Errors are ignored: a broken connection is discarded by the pool anyway.
+        """
+        try:
+            conn.rollback()
+            cursor.execute(f"DEALLOCATE {name}")
+            conn.commit()
+        except _DBAPIError:
+            pass
+
+    def drop_duplicate_keys(self, rows: list, key_indexes: list[int]) -> list:
+        """
+        Keep only the last row of each conflict key, since one INSERT ... ON CONFLICT DO UPDATE cannot update the same row twice.
+
+        Parameters:
+            rows (list): Rows of a chunk.
+            key_indexes (list[int]): Positions of the conflict key in the rows.
+
+        Returns:
+            list: The rows, without the earlier rows of repeated keys.
+        """
+        latest = {}
+        for row in rows:
+            latest[tuple(row[i] for i in key_indexes)] = row
+
+        return list(latest.values())
+
+    def upsert_values(
+        self,
+        data: list,
+        conn: _Connection,
+        cursor: object,
+        upsert_query: str,
+        page_size: int = 1000,
+        key_indexes: list[int] = None,
+        prepared: tuple[str, int] = None
+    ) -> None:
+        """
+        Merge a chunk of rows into a table with multi-row INSERT ... ON CONFLICT statements, in one transaction.
+
+        A statement cannot update the same row twice, so with key_indexes only the last row of each conflict key is kept. Pages of exactly the prepared size run the prepared statement with EXECUTE; the remaining rows go through execute_values.
+
+        If the merge fails, the transaction is rolled back and a SQLAlchemyError is raised with an error message.
+
+        Parameters:
+            upsert_query (str): Statement built by build_upsert_values_query without rows.
+            page_size (int, optional): Rows per statement of the execute_values pages. Defaults to 1000.
+            key_indexes (list[int], optional): Positions of the conflict key in the rows, to drop duplicate keys. Defaults to None (rows kept as they are).
+            prepared (tuple[str, int], optional): Name and number of rows of a statement prepared with prepare_statement. Defaults to None.
+        """
+        rows = self.drop_duplicate_keys(data, key_indexes) if key_indexes else data
+
+        try:
+            start = 0
+            if prepared is not None:
+                name, page_rows = prepared
+                start = len(rows) - len(rows) % page_rows
+                if start:
+                    row_template = ",".join(["%s"] * len(rows[0]))
+                    _execute_values(cursor, f"EXECUTE {name} (%s)", rows[:start], template=row_template, page_size=page_rows)
+            if start < len(rows):
+                _execute_values(cursor, upsert_query, rows[start:], page_size=page_size)
+            conn.commit()
+        except _DBAPIError as e:
+            conn.rollback()
+            raise _SQLAlchemyError(
+                f"Fail to upsert data \n {e}"
+            )
+
+    def get_column_max(self, conn: _Engine, source: str, column: str) -> object:
+        """
+        Return the maximum value of a column in a table or in the result of a query.
+
+        Parameters:
+            source (str): Table name, or a SELECT query wrapped as a subquery.
+            column (str): Column to aggregate.
+
+        Raises:
+            SQLAlchemyError: If the query fails.
+        """
+        if source.lstrip().lower().startswith(("select", "with")):
+            source = f"({source}) AS src"
+
+        with conn.connect() as con:
+            try:
+                return con.execute(text(f"SELECT max({column}) FROM {source}")).scalar()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get max of {column} from {source}: {e}")
+
+    def format_literal(self, value: object) -> str:
+        """
+        Render a Python value as a SQL literal, e.g. to embed a watermark in a WHERE clause.
+        """
+        if isinstance(value, str):
+            return "'" + value.replace("'", "''") + "'"
+        return _adapt(value).getquoted().decode()
+
+    def build_watermark_predicate(self, column: str, low: object = None, high: object = None) -> str:
+        """
+        Build the predicate selecting rows whose watermark column is in the half-open interval (low, high].
+
+        Parameters:
+            column (str): Watermark column, e.g. updated_at or a serial id.
+            low (object, optional): Last persisted watermark. When None, rows are read from the beginning.
+            high (object, optional): Watermark captured at the start of the run. When None, no upper bound is applied.
+
+        Returns:
+            str: The predicate, or "TRUE" when neither bound is given.
+        """
+        predicates = []
+        if low is not None:
+            predicates.append(f"{column} > {self.format_literal(low)}")
+        if high is not None:
+            predicates.append(f"{column} <= {self.format_literal(high)}")
+
+        return " AND ".join(predicates) or "TRUE"
+
+
+    def _split_table_name(self, table_name: str) -> tuple[str, str]:
+        schema, _, name = table_name.rpartition('.')
+        return schema, name
+
+    def _execute_ddl(self, conn: _Engine, statements: list[str], error: str) -> None:
+        """
+        Run DDL statements in one transaction on a raw DBAPI connection, so statements read from the catalog are sent verbatim.
+        """
+        raw = conn.raw_connection()
+        try:
+            cursor = raw.cursor()
+            for statement in statements:
+                cursor.execute(statement)
+            raw.commit()
+        except _DBAPIError as e:
+            raw.rollback()
+            raise _SQLAlchemyError(f"{error}: {e}")
+        finally:
+            raw.close()
+
+    def _derived_table_name(self, table_name: str, suffix: str) -> str:
+        """
+        Name of a work table of a target, in the same schema and within the 63 characters of a PostgreSQL identifier.
+        """
+        schema, name = self._split_table_name(table_name)
+        derived = f"{name[:63 - len(suffix)]}{suffix}"
+        return f"{schema}.{derived}" if schema else derived
+
+    def get_shadow_table_name(self, table_name: str) -> str:
+        return self._derived_table_name(table_name, '_shadow')
+
+    def get_staging_table_name(self, table_name: str) -> str:
+        return self._derived_table_name(table_name, '_staging')
+
+    def create_staging_table(self, conn: _Engine, table_name: str, staging_name: str) -> None:
+        """
+        Create an UNLOGGED table with the columns and defaults of a target and no index or constraint, to be bulk-loaded with COPY and merged into the target with merge_staging_table. A staging table left over by a failed run is dropped first.
+
+        Raises:
+            SQLAlchemyError: If the table cannot be created.
+        """
+        self._execute_ddl(
+            conn,
+            [
+                f"DROP TABLE IF EXISTS {staging_name}",
+                f"CREATE UNLOGGED TABLE {staging_name} (LIKE {table_name} INCLUDING DEFAULTS)",
+            ],
+            f"Fail to create staging table {staging_name}"
+        )
+        self.invalidate_schema(conn, staging_name)
+
+    def merge_staging_table(
+        self,
+        conn: _Engine,
+        staging_name: str,
+        table_name: str,
+        columns: list[str],
+        conflict_columns: list[str],
+        update_columns: list[str] = None
+    ) -> int:
+        """
+        Merge a loaded staging table into its target with a single INSERT ... SELECT ... ON CONFLICT, then drop it, in one transaction.
+
+        When a conflict key appears several times in the staging table, only one of its rows is merged, since one statement cannot update the same row twice. The row kept is the one at the highest ctid: the last one written when a single session loaded the table, but an arbitrary one when several consumers COPY into it at once. Deduplicate the source when the choice matters.
+
+        Parameters:
+            columns (list[str]): Columns loaded in the staging table.
+            conflict_columns (list[str]): Columns of the unique constraint or primary key used to detect existing rows.
+            update_columns (list[str], optional): Columns overwritten on conflict, as in build_upsert_query.
+
+        Returns:
+            int: Number of rows inserted or updated.
+
+        Raises:
+            SQLAlchemyError: If the merge fails. The target is left untouched.
+        """
+        columns_str = ",".join(columns)
+        key_str = ",".join(conflict_columns)
+        merge = (
+            f"INSERT INTO {table_name}({columns_str}) "
+            f"SELECT DISTINCT ON ({key_str}) {columns_str} FROM {staging_name} "
+            f"ORDER BY {key_str}, ctid DESC "
+            f"{self._on_conflict_clause(columns, conflict_columns, update_columns)}"
+        )
+
+        raw = conn.raw_connection()
+        try:
+            cursor = raw.cursor()
+            cursor.execute(merge)
+            merged = cursor.rowcount
+            cursor.execute(f"DROP TABLE {staging_name}")
+            raw.commit()
+        except _DBAPIError as e:
+            raw.rollback()
+            raise _SQLAlchemyError(f"Fail to merge staging table {staging_name} into {table_name}: {e}")
+        finally:
+            raw.close()
+        self.invalidate_schema(conn, staging_name)
+
+        return merged
+
+    def create_shadow_table(self, conn: _Engine, table_name: str, shadow_name: str) -> None:
+        """
+        Create an UNLOGGED copy of a table's columns, defaults and CHECK constraints, without indexes, to be bulk-loaded and swapped in place of the table with swap_shadow_table.
+
+        Writes to an unlogged table skip the WAL, and without indexes no index is maintained row by row. A shadow table left over by a failed run is dropped first.
+
+        Raises:
+            ValueError: If the table is partitioned or referenced by foreign keys, which the swap cannot carry over.
+            SQLAlchemyError: If the table cannot be created.
+        """
+        query = text("""
+            SELECT c.relkind,
+                   EXISTS (SELECT 1 FROM pg_constraint f WHERE f.confrelid = c.oid AND f.contype = 'f')
+            FROM pg_class c
+            WHERE c.oid = to_regclass(:table_name)
+        """)
+        with conn.connect() as con:
+            try:
+                row = con.execute(query, {"table_name": table_name}).fetchone()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to inspect table {table_name}: {e}")
+
+        if row is None:
+            raise ValueError(f"Table {table_name} does not exist")
+        relkind, referenced = row
+        if relkind == 'p':
+            raise ValueError(f"Table {table_name} is partitioned and cannot be swapped")
+        if referenced:
+            raise ValueError(f"Table {table_name} is referenced by foreign keys and cannot be swapped")
+
+        self._execute_ddl(conn, [
+            f"DROP TABLE IF EXISTS {shadow_name}",
+            f"CREATE UNLOGGED TABLE {shadow_name} (LIKE {table_name} "
+            "INCLUDING DEFAULTS INCLUDING GENERATED INCLUDING IDENTITY INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+        ], f"Fail to create shadow table {shadow_name}")
+        self.invalidate_schema(conn, shadow_name)
+
+    def rebuild_indexes(
+        self,
+        conn: _Engine,
+        table_name: str,
+        shadow_name: str,
+        workers: int = 2
+    ) -> list[tuple[str, str, str]]:
+        """
+        Build on the shadow table the indexes, primary key, unique, exclusion and foreign key constraints of the original table, several at a time on separate connections.
+
+        Index names are unique per schema, so the copies get temporary names, restored by swap_shadow_table once the original table is dropped. Primary keys and unique constraints are attached to their prebuilt index with USING INDEX, so their build runs in parallel too.
+
+        Parameters:
+            table_name (str): The original table.
+            shadow_name (str): The loaded shadow table.
+            workers (int, optional): Indexes built at the same time, each on its own connection. Defaults to 2.
+
+        Returns:
+            list[tuple[str, str, str]]: (kind, temporary name, original name) of every index ('index') or constraint ('constraint') to rename.
+
+        Raises:
+            SQLAlchemyError: If the catalog cannot be read or an index cannot be built.
+        """
+        indexes_query = text("""
+            SELECT quote_ident(i.relname), pg_get_indexdef(x.indexrelid), quote_ident(c.conname), c.contype,
+                   pg_get_constraintdef(c.oid), c.condeferrable, c.condeferred
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            LEFT JOIN pg_constraint c ON c.conindid = x.indexrelid AND c.conrelid = x.indrelid AND c.contype IN ('p', 'u', 'x')
+            WHERE x.indrelid = to_regclass(:table_name)
+            ORDER BY i.relname
+        """)
+        foreign_keys_query = text("""
+            SELECT quote_ident(conname), pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(:table_name) AND contype = 'f'
+        """)
+        with conn.connect() as con:
+            try:
+                indexes = con.execute(indexes_query, {"table_name": table_name}).fetchall()
+                foreign_keys = con.execute(foreign_keys_query, {"table_name": table_name}).fetchall()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to read indexes of table {table_name}: {e}")
+
+        _, shadow_base = self._split_table_name(shadow_name)
+        tasks = []
+        renames = []
+        for i, (index_name, index_def, constraint_name, constraint_type, constraint_def, deferrable, deferred) in enumerate(indexes):
+            temp_name = f"{shadow_base[:50]}_idx{i}"
+            if constraint_type == 'x':
+                tasks.append([f"ALTER TABLE {shadow_name} ADD CONSTRAINT {temp_name} {constraint_def}"])
+                renames.append(('constraint', temp_name, constraint_name))
+                continue
+
+            statements = [_re.sub(
+                r'^CREATE (UNIQUE )?INDEX (?:"(?:[^"]|"")*"|\S+) ON (ONLY )?(?:(?:"(?:[^"]|"")*"|[^\s".]+)\.?)+ ',
+                lambda m: f"CREATE {m.group(1) or ''}INDEX {temp_name} ON {shadow_name} ",
+                index_def
+            )]
+            if constraint_type in ('p', 'u'):
+                kind = 'PRIMARY KEY' if constraint_type == 'p' else 'UNIQUE'
+                flags = (' DEFERRABLE' if deferrable else '') + (' INITIALLY DEFERRED' if deferred else '')
+                statements.append(f"ALTER TABLE {shadow_name} ADD CONSTRAINT {temp_name} {kind} USING INDEX {temp_name}{flags}")
+                renames.append(('constraint', temp_name, constraint_name))
+            else:
+                renames.append(('index', temp_name, index_name))
+            tasks.append(statements)
+
+        for constraint_name, constraint_def in foreign_keys:
+            tasks.append([f"ALTER TABLE {shadow_name} ADD CONSTRAINT {constraint_name} {constraint_def}"])
+
+        with _ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix='IndexBuild') as executor:
+            futures = [
+                executor.submit(self._execute_ddl, conn, statements, f"Fail to build index on {shadow_name}")
+                for statements in tasks
+            ]
+            for future in futures:
+                future.result()
+
+        return renames
+
+    def swap_shadow_table(
+        self,
+        conn: _Engine,
+        table_name: str,
+        shadow_name: str,
+        renames: list[tuple[str, str, str]] = None
+    ) -> None:
+        """
+        Replace a table by its loaded shadow table in one transaction.
+
+        The shadow table is made LOGGED and analyzed first, outside of the lock. The swap then locks the original table, moves the ownership of its serial sequences and the position of its identity sequences to the shadow table, drops it and renames the shadow table and its indexes to the original names. Readers see either the old or the new table, never a partial load.
+
+        Privileges, triggers, policies and comments of the original table are not carried over; views depending on it make the swap fail and leave it untouched.
+
+        Parameters:
+            renames (list[tuple[str, str, str]], optional): Renames returned by rebuild_indexes.
+
+        Raises:
+            SQLAlchemyError: If the swap fails. The original table is then left untouched.
+        """
+        self._execute_ddl(conn, [f"ALTER TABLE {shadow_name} SET LOGGED"], f"Fail to set {shadow_name} logged")
+        self._execute_ddl(conn, [f"ANALYZE {shadow_name}"], f"Fail to analyze {shadow_name}")
+
+        sequences_query = text("""
+            SELECT s.oid::regclass::text, a.attname, d.deptype
+            FROM pg_depend d
+            JOIN pg_class s ON s.oid = d.objid AND s.relkind = 'S'
+            JOIN pg_attribute a ON a.attrelid = d.refobjid AND a.attnum = d.refobjsubid
+            WHERE d.classid = 'pg_class'::regclass
+              AND d.refobjid = to_regclass(:table_name)
+              AND d.deptype IN ('a', 'i')
+        """)
+        with conn.connect() as con:
+            try:
+                sequences = con.execute(sequences_query, {"table_name": table_name}).fetchall()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to read sequences of table {table_name}: {e}")
+
+        schema, name = self._split_table_name(table_name)
+        statements = [f"LOCK TABLE {table_name} IN ACCESS EXCLUSIVE MODE"]
+        for sequence, column, dependency in sequences:
+            quoted_column = '"' + column.replace('"', '""') + '"'
+            if dependency == 'a':
+                statements.append(f"ALTER SEQUENCE {sequence} OWNED BY {shadow_name}.{quoted_column}")
+            else:
+                shadow_sequence = (
+                    f"pg_get_serial_sequence({self.format_literal(shadow_name)}, {self.format_literal(column)})"
+                )
+                statements.append(
+                    f"SELECT setval({shadow_sequence}, GREATEST(last_value, "
+                    f"COALESCE((SELECT max({quoted_column}) FROM {shadow_name}), last_value))) FROM {sequence}"
+                )
+        statements.append(f"DROP TABLE {table_name}")
+        statements.append(f"ALTER TABLE {shadow_name} RENAME TO {name}")
+        for kind, temp_name, original_name in renames or []:
+            if kind == 'constraint':
+                statements.append(f"ALTER TABLE {table_name} RENAME CONSTRAINT {temp_name} TO {original_name}")
+            else:
+                index = f"{schema}.{temp_name}" if schema else temp_name
+                statements.append(f"ALTER INDEX {index} RENAME TO {original_name}")
+
+        self._execute_ddl(conn, statements, f"Fail to swap {shadow_name} into {table_name}")
+        self.invalidate_schema(conn, table_name)
+        self.invalidate_schema(conn, shadow_name)
+
+    def drop_table(self, conn: _Engine, table_name: str) -> None:
+        """
+        Drop a table if it exists, e.g. the shadow table of a failed load.
+
+        Raises:
+            SQLAlchemyError: If the table cannot be dropped.
+        """
+        self._execute_ddl(conn, [f"DROP TABLE IF EXISTS {table_name}"], f"Fail to drop table {table_name}")
+        self.invalidate_schema(conn, table_name)
+
+    def get_leaf_partitions(self, conn: _Engine, table_name: str) -> list[tuple[str, tuple[str, ...]]]:
+        """
+        List the leaf partitions of a declaratively partitioned table from pg_inherits, at any depth of sub-partitioning.
+
+        Each leaf comes with the chain of partition bounds from the top level down to it (e.g. ("FOR VALUES FROM ('2024-01-01') TO ('2025-01-01')",)), which identifies the same partition in another table with the same partitioning.
+
+        Returns:
+            list[tuple[str, tuple[str, ...]]]: (qualified leaf name, bound chain) of every leaf; empty when the table is not partitioned.
+
+        Raises:
+            SQLAlchemyError: If the catalog query fails.
+        """
+        query = text("""
+            WITH RECURSIVE tree AS (
+                SELECT i.inhrelid AS relid, i.inhparent AS parent
+                FROM pg_inherits i
+                WHERE i.inhparent = to_regclass(:table_name)
+                UNION ALL
+                SELECT i.inhrelid, i.inhparent
+                FROM pg_inherits i
+                JOIN tree t ON i.inhparent = t.relid
+            )
+            SELECT t.relid, t.parent, t.relid::regclass::text, c.relkind, pg_get_expr(c.relpartbound, c.oid)
+            FROM tree t
+            JOIN pg_class c ON c.oid = t.relid
+            WHERE c.relispartition
+        """)
+
+        with conn.connect() as con:
+            try:
+                rows = con.execute(query, {"table_name": table_name}).fetchall()
+            except _SQLAlchemyError as e:
+                raise _SQLAlchemyError(f"Fail to get partitions of table {table_name}: {e}")
+
+        nodes = {relid: (parent, bound) for relid, parent, _, _, bound in rows}
+
+        def bound_chain(relid) -> tuple[str, ...]:
+            chain = []
+            while relid in nodes:
+                relid, bound = nodes[relid]
+                chain.append(bound)
+            return tuple(reversed(chain))
+
+        return [
+            (name, bound_chain(relid))
+            for relid, _, name, relkind, _ in rows
+            if relkind != 'p'
+        ]
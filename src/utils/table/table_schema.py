@@ -0,0 +1,42 @@
+INTEGER_TYPES = ('int2', 'int4', 'int8')
+
+
+class TableSchema:
+    def __init__(
+        self,
+        table_name: str,
+        columns: list[str],
+        types: dict[str, str],
+        nullable: dict[str, bool],
+        primary_key: list[str]
+    ) -> None:
+        """
+        Initialize the description of a table or view read from the PostgreSQL catalog.
+
+        Parameters:
+            table_name (str): Name of the table as it was looked up.
+            columns (list[str]): Column names in table order.
+            types (dict[str, str]): PostgreSQL type name of each column, domains resolved to their base type (e.g. 'int8', '_text').
+            nullable (dict[str, bool]): Whether each column accepts NULLs.
+            primary_key (list[str]): Primary key columns in key order, empty when the table has none.
+        """
+        self.table_name = table_name
+        self.columns = list(columns)
+        self.types = dict(types)
+        self.nullable = dict(nullable)
+        self.primary_key = list(primary_key)
+
+    def is_integer(self, column: str) -> bool:
+        return self.types.get(column) in INTEGER_TYPES
+
+    @property
+    def integer_key(self) -> str:
+        """
+        The primary key column when the key is a single integer column, else None.
+        """
+        if len(self.primary_key) == 1 and self.is_integer(self.primary_key[0]):
+            return self.primary_key[0]
+        return None
+
+    def __repr__(self) -> str:
+        return f"TableSchema({self.table_name!r}, columns={self.columns!r}, primary_key={self.primary_key!r})"
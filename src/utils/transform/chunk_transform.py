@@ -0,0 +1,171 @@
+from typing import Callable, TYPE_CHECKING
+import numpy as _np
+
+if TYPE_CHECKING:
+    import pandas as _pd
+
+
+def _pandas():
+    # Imported on first use: jobs without a transform never load pandas.
+    import pandas as _pd
+    return _pd
+
+
+_PARSERS = {
+    'numeric': lambda series: _pandas().to_numeric(series),
+    'datetime': lambda series: _pandas().to_datetime(series),
+    'date': lambda series: _pandas().to_datetime(series).dt.date.astype(object),
+}
+
+
+class ChunkTransform:
+    def __init__(self) -> None:
+        """
+        Initialize an empty chain of transformations applied to whole chunks as pandas DataFrames.
+
+        Steps are added with the chainable methods below and run in the order they were added. Every step works on whole columns (pandas and NumPy operations), never row by row.
+
+        Example:
+            ChunkTransform().rename({'nm': 'name'}).cast({'amount': 'numeric'}).derive('total', 'amount * quantity').filter('total > 0').mask(['card_number'], keep=4)
+        """
+        self._steps: list[Callable[['_pd.DataFrame'], '_pd.DataFrame']] = []
+
+    def rename(self, columns: dict[str, str]) -> 'ChunkTransform':
+        """
+        Rename columns, mapping old names to new ones.
+        """
+        columns = dict(columns)
+        self._steps.append(lambda frame: frame.rename(columns=columns))
+        return self
+
+    def select(self, columns: list[str]) -> 'ChunkTransform':
+        """
+        Keep only the given columns, in this order.
+        """
+        columns = list(columns)
+        self._steps.append(lambda frame: frame[columns])
+        return self
+
+    def drop(self, columns: list[str]) -> 'ChunkTransform':
+        columns = list(columns)
+        self._steps.append(lambda frame: frame.drop(columns=columns))
+        return self
+
+    def cast(self, dtypes: dict[str, str]) -> 'ChunkTransform':
+        """
+        Cast columns to pandas dtypes (e.g. 'int64', 'Int64', 'float64', 'string') or parse them with 'numeric', 'datetime' or 'date'.
+
+        Raises:
+            ValueError: When a value cannot be cast, while the chunk is transformed.
+        """
+        dtypes = dict(dtypes)
+
+        def step(frame: '_pd.DataFrame') -> '_pd.DataFrame':
+            frame = frame.copy(deep=False)
+            for column, dtype in dtypes.items():
+                parser = _PARSERS.get(dtype)
+                frame[column] = parser(frame[column]) if parser else frame[column].astype(dtype)
+            return frame
+
+        self._steps.append(step)
+        return self
+
+    def derive(self, column: str, expression: object) -> 'ChunkTransform':
+        """
+        Add or replace a column computed from the chunk.
+
+        Parameters:
+            column (str): Name of the derived column.
+            expression (object): A DataFrame.eval expression (e.g. 'price * quantity') or a function of the DataFrame returning a Series, an array or a scalar.
+        """
+        def step(frame: '_pd.DataFrame') -> '_pd.DataFrame':
+            values = frame.eval(expression) if isinstance(expression, str) else expression(frame)
+            return frame.assign(**{column: values})
+
+        self._steps.append(step)
+        return self
+
+    def filter(self, predicate: object) -> 'ChunkTransform':
+        """
+        Keep the rows matching a predicate. Rows where the predicate is NULL are dropped.
+
+        Parameters:
+            predicate (object): A DataFrame.eval expression (e.g. 'status == "active"') or a function of the DataFrame returning a boolean Series or array.
+        """
+        def step(frame: '_pd.DataFrame') -> '_pd.DataFrame':
+            _pd = _pandas()
+            keep = frame.eval(predicate) if isinstance(predicate, str) else predicate(frame)
+            keep = _pd.Series(keep, index=frame.index).fillna(False).astype(bool)
+            return frame[keep.to_numpy()]
+
+        self._steps.append(step)
+        return self
+
+    def hash(self, columns: list[str], key: str = None) -> 'ChunkTransform':
+        """
+        Replace columns by a 64-bit hash of their values, e.g. to pseudonymize keys while keeping them joinable. NULLs stay NULL.
+
+        Values are hashed by their text form, so a value gets the same hash in every chunk whatever dtype the chunk was inferred with. The hash is pandas' vectorized SipHash, returned as a signed bigint. It is keyed, not a cryptographic digest: keep the key secret to prevent dictionary attacks.
+
+        Parameters:
+            columns (list[str]): Columns to hash.
+            key (str, optional): 16-character hash key. Defaults to None (pandas' default key).
+
+        Raises:
+            ValueError: If the key is not 16 characters long.
+        """
+        if key is not None and len(key.encode('utf-8')) != 16:
+            raise ValueError("The hash key must be 16 bytes long")
+        columns = list(columns)
+        options = {'hash_key': key} if key is not None else {}
+
+        def step(frame: '_pd.DataFrame') -> '_pd.DataFrame':
+            _pd = _pandas()
+            frame = frame.copy(deep=False)
+            for column in columns:
+                series = frame[column]
+                hashes = _pd.util.hash_pandas_object(series.astype(str), index=False, **options).to_numpy().view(_np.int64)
+                frame[column] = _pd.array(hashes, dtype='Int64')
+                frame.loc[series.isna().to_numpy(), column] = _pd.NA
+            return frame
+
+        self._steps.append(step)
+        return self
+
+    def mask(self, columns: list[str], keep: int = 0, char: str = '*') -> 'ChunkTransform':
+        """
+        Replace every character of string columns by char, except the last keep ones, e.g. '4111111111111111' -> '************1111' with keep=4. NULLs stay NULL.
+        """
+        columns = list(columns)
+
+        def step(frame: '_pd.DataFrame') -> '_pd.DataFrame':
+            frame = frame.copy(deep=False)
+            for column in columns:
+                values = frame[column].astype('string')
+                if keep > 0:
+                    frame[column] = values.str.slice(0, -keep).str.replace(r'(?s).', char, regex=True) + values.str.slice(-keep)
+                else:
+                    frame[column] = values.str.replace(r'(?s).', char, regex=True)
+            return frame
+
+        self._steps.append(step)
+        return self
+
+    def apply(self, frame: '_pd.DataFrame') -> '_pd.DataFrame':
+        """
+        Run every step on a chunk.
+        """
+        for step in self._steps:
+            frame = step(frame)
+        return frame
+
+    def output_columns(self, columns: list[str]) -> list[str]:
+        """
+        Compute the columns of the transformed chunks by running the chain on an empty chunk of untyped columns with the input columns.
+
+        Raises:
+            Exception: Whatever a step raises on untyped columns, e.g. arithmetic on columns not cast first.
+        """
+        _pd = _pandas()
+        empty = _pd.DataFrame({column: _pd.Series(dtype=object) for column in columns})
+        return [str(column) for column in self.apply(empty).columns]
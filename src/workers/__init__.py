@@ -1,3 +1,12 @@
 from .base_worker import BaseWorker
 from .sqlalchemy_consumer import SQLAlchemyConsumer
-from .sqlalchemy_producer import SQLAlchemyProducer
\ No newline at end of file
+from .sqlalchemy_producer import SQLAlchemyProducer
+from .sqlalchemy_process_consumer import SQLAlchemyProcessConsumer
+from .async_base_worker import AsyncBaseWorker
+from .async_producer import AsyncProducer
+from .async_consumer import AsyncConsumer
+from .file_producer import FileProducer
+from .file_consumer import FileConsumer
+from .copy_passthrough_producer import CopyPassthroughProducer
+from .transform_worker import TransformWorker
+from .fan_out_worker import FanOutWorker
\ No newline at end of file
@@ -0,0 +1,65 @@
+from itertools import count as _count
+from abc import (
+    ABC as _ABC,
+    abstractmethod as _abstractmethod
+)
+from src.monitors.async_monitor import AsyncMonitor as _AsyncMonitor
+
+
+ASYNC_DRIVERS = ('psycopg2_async', 'executor')
+
+_worker_ids = _count(1)
+
+
+class AsyncBaseWorker(_ABC):
+    def __init__(
+        self,
+        monitor: _AsyncMonitor,
+        is_producer: bool = False,
+        driver: str = 'psycopg2_async'
+    ) -> None:
+        """
+        Initialize an asyncio worker with a monitor, an optional producer flag and the database driver it uses.
+
+        Parameters:
+            monitor (_AsyncMonitor): The monitor instance used to coordinate the workers.
+            is_producer (bool, optional): Indicates if this worker acts as a producer. Defaults to False.
+            driver (str, optional): 'psycopg2_async' for non-blocking I/O on the event loop, or 'executor' to run blocking psycopg2 calls in the loop's thread pool. Defaults to 'psycopg2_async'.
+
+        Raises:
+            ValueError: If the driver is unknown.
+        """
+        if driver not in ASYNC_DRIVERS:
+            raise ValueError(f"Invalid driver {driver}. Use one of {', '.join(ASYNC_DRIVERS)}.")
+        self.name = f"{type(self).__name__}-{next(_worker_ids)}"
+        self._monitor = monitor
+        self._is_producer: bool = is_producer
+        self._driver = driver
+        self._stopping: bool = False
+
+    @_abstractmethod
+    async def run(self):
+        """
+        Defines the main coroutine of the worker, scheduled as a task by the monitor.
+        """
+        ...
+
+    def stop(self):
+        """
+        Signal the worker to stop after its current chunk.
+        """
+        self._stopping = True
+
+    async def stop_all_workers(self, error: BaseException = None):
+        """
+        Stop every worker subscribed to the monitor, recording the error that caused the stop.
+        """
+        await self._monitor.stop_all_workers(error)
+
+    @property
+    def stopping(self) -> bool:
+        return self._stopping
+
+    @property
+    def is_producer(self):
+        return self._is_producer
@@ -0,0 +1,160 @@
+import asyncio
+from sqlalchemy.engine import Engine as _Engine
+from .async_base_worker import AsyncBaseWorker as _AsyncBaseWorker
+from .sqlalchemy_consumer import LOAD_STRATEGIES
+from src.monitors.async_monitor import AsyncMonitor as _AsyncMonitor
+from src.connection.async_pg_connection import AsyncPgConnection as _AsyncPgConnection
+from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.table.copy_encoder import (
+    CsvCopyEncoder as _CsvCopyEncoder,
+    BinaryCopyEncoder as _BinaryCopyEncoder
+)
+
+
+class AsyncConsumer(_AsyncBaseWorker):
+    def __init__(
+        self,
+        monitor: _AsyncMonitor,
+        engine: _Engine,
+        table_manager: _TableManager,
+        load_strategy: str = 'insert',
+        table_target: str = None,
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        driver: str = 'psycopg2_async'
+    ) -> None:
+        """
+        Initialize an AsyncConsumer loading the chunks of an AsyncMonitor into the target table.
+
+        With the 'psycopg2_async' driver, 'insert' and 'upsert' chunks are sent as one multi-row INSERT statement on a non-blocking connection. An 'upsert' chunk keeps only the last row of each conflict key, which one statement cannot update twice. COPY cannot run on an asynchronous psycopg2 connection, so the 'copy_csv' and 'copy_binary' strategies, like the 'executor' driver, run the blocking load in the event loop's thread pool.
+
+        Parameters:
+            engine (_Engine): SQLAlchemy engine of the target database.
+            table_manager (_TableManager): The manager responsible for database table operations.
+            load_strategy (str, optional): 'insert', 'copy_csv', 'copy_binary' or 'upsert', as in SQLAlchemyConsumer. Defaults to 'insert'.
+            table_target (str, optional): Name of the target table. Required by every strategy except 'insert'.
+            conflict_columns (list[str], optional): Conflict key of the 'upsert' strategy.
+            update_columns (list[str], optional): Columns overwritten on conflict by the 'upsert' strategy.
+            driver (str, optional): 'psycopg2_async' or 'executor'. Defaults to 'psycopg2_async'.
+
+        Raises:
+            ValueError: If the load strategy is unknown, lacks a target table, or 'upsert' is used without conflict columns.
+        """
+        super().__init__(monitor=monitor, is_producer=False, driver=driver)
+
+        if load_strategy not in LOAD_STRATEGIES:
+            raise ValueError(f"Invalid load strategy {load_strategy}. Use one of {', '.join(LOAD_STRATEGIES)}.")
+        if load_strategy != 'insert' and not table_target:
+            raise ValueError(f"Load strategy {load_strategy} requires table_target")
+        if load_strategy == 'upsert' and not conflict_columns:
+            raise ValueError("Load strategy upsert requires conflict_columns")
+
+        self._engine = engine
+        self._table_manager = table_manager
+        self._load_strategy = load_strategy
+        self._table_target = table_target
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+
+    async def _get_query_template(self) -> str:
+        if self._load_strategy == 'insert':
+            return await self._monitor.get_insert_query()
+
+        return self._table_manager.build_upsert_query(
+            table_name=self._table_target,
+            columns=await self._monitor.get_columns(),
+            conflict_columns=self._conflict_columns,
+            update_columns=self._update_columns
+        )
+
+    async def _consume(self, load):
+        while not self._stopping:
+            data = await self._monitor.read()
+            if data is None:
+                break
+            if data:
+                await load(data)
+
+    async def _get_key_indexes(self) -> list[int]:
+        if self._load_strategy != 'upsert' or self._update_columns == []:
+            return None
+        columns = list(await self._monitor.get_columns())
+
+        return [columns.index(c) for c in self._conflict_columns]
+
+    async def _run_async_driver(self):
+        query_template = await self._get_query_template()
+        key_indexes = await self._get_key_indexes()
+        async with _AsyncPgConnection.from_engine(self._engine) as conn:
+            async def load(data):
+                to_rows = getattr(data, 'to_rows', None)
+                rows = to_rows() if to_rows is not None else data
+                if key_indexes:
+                    rows = self._table_manager.drop_duplicate_keys(rows, key_indexes)
+                await conn.execute(
+                    self._table_manager.build_multirow_insert(query_template, rows, conn.mogrify)
+                )
+
+            await self._consume(load)
+
+    async def _build_executor_loader(self, conn, cursor):
+        loop = asyncio.get_running_loop()
+
+        if self._load_strategy in ('insert', 'upsert'):
+            query_template = await self._get_query_template()
+            return lambda data: self._table_manager.insert(
+                data=data,
+                insert_query_template=query_template,
+                conn=conn,
+                cursor=cursor
+            )
+
+        columns = await self._monitor.get_columns()
+        column_types = await loop.run_in_executor(
+            None, self._table_manager.get_column_types, self._engine, self._table_target
+        )
+        if self._load_strategy == 'copy_binary':
+            encoder = _BinaryCopyEncoder(columns=columns, column_types=column_types)
+            copy_format = 'binary'
+        else:
+            encoder = _CsvCopyEncoder(column_types=column_types, columns=columns)
+            copy_format = 'csv'
+
+        copy_query = self._table_manager.build_copy_query(
+            table_name=self._table_target,
+            columns=columns,
+            copy_format=copy_format
+        )
+        return lambda data: self._table_manager.copy_insert(
+            data=data,
+            conn=conn,
+            cursor=cursor,
+            copy_query=copy_query,
+            encoder=encoder
+        )
+
+    async def _run_executor_driver(self):
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(None, self._engine.raw_connection)
+        cursor = conn.cursor()
+        try:
+            blocking_load = await self._build_executor_loader(conn, cursor)
+            await self._consume(lambda data: loop.run_in_executor(None, blocking_load, data))
+        finally:
+            cursor.close()
+            await loop.run_in_executor(None, conn.close)
+
+    async def run(self):
+        """
+        Load chunks from the monitor until the stream ends or the pipeline is stopped, stopping every worker if a load fails.
+        """
+        try:
+            if self._driver == 'executor' or self._load_strategy.startswith('copy'):
+                await self._run_executor_driver()
+            else:
+                await self._run_async_driver()
+        except Exception as e:
+            await self.stop_all_workers(e)
+            raise
+        finally:
+            await self._monitor.signal_end_process()
@@ -0,0 +1,97 @@
+import asyncio
+from sqlalchemy.engine import Engine as _Engine
+from .async_base_worker import AsyncBaseWorker as _AsyncBaseWorker
+from src.monitors.async_monitor import AsyncMonitor as _AsyncMonitor
+from src.connection.async_pg_connection import AsyncPgConnection as _AsyncPgConnection
+from src.utils.table.table_manager import TableManager as _TableManager
+
+
+class AsyncProducer(_AsyncBaseWorker):
+    def __init__(
+        self,
+        monitor: _AsyncMonitor,
+        engine: _Engine,
+        query: str,
+        chunksize: int,
+        table_manager: _TableManager,
+        table_target: str,
+        driver: str = 'psycopg2_async'
+    ) -> None:
+        """
+        Initialize an AsyncProducer streaming the result of a query to an AsyncMonitor in chunks.
+
+        With the 'psycopg2_async' driver the query is read through a DECLARE ... CURSOR / FETCH FORWARD loop on a non-blocking connection. With the 'executor' driver a server-side psycopg2 cursor is read in the event loop's thread pool.
+
+        Parameters:
+            engine (_Engine): SQLAlchemy engine of the source database.
+            query (str): The SQL query to execute for data extraction.
+            chunksize (int): Number of rows to fetch per chunk.
+            table_manager (_TableManager): Utility for building insert queries for the target table.
+            table_target (str): Name of the target table for data insertion.
+            driver (str, optional): 'psycopg2_async' or 'executor'. Defaults to 'psycopg2_async'.
+        """
+        super().__init__(monitor=monitor, is_producer=True, driver=driver)
+        self._engine = engine
+        self._query = query
+        self._chunksize = chunksize
+        self._table_manager = table_manager
+        self._table_target = table_target
+
+    async def _publish_metadata(self, columns: list[str]):
+        insert_query = self._table_manager.build_insert_query(
+            table_name=self._table_target,
+            columns=columns
+        )
+        await self._monitor.set_insert_query(insert_query)
+        await self._monitor.set_columns(columns)
+
+    async def _run_async_driver(self):
+        async with _AsyncPgConnection.from_engine(self._engine) as conn:
+            await conn.execute("BEGIN ISOLATION LEVEL REPEATABLE READ READ ONLY")
+            await conn.execute(f"DECLARE data_tools_cursor NO SCROLL CURSOR FOR {self._query}")
+            published = False
+            while not self._stopping:
+                cursor = await conn.execute(f"FETCH FORWARD {int(self._chunksize)} FROM data_tools_cursor")
+                if not published:
+                    await self._publish_metadata([c.name for c in cursor.description])
+                    published = True
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+                await self._monitor.write(rows)
+            await conn.execute("COMMIT")
+
+    async def _run_executor_driver(self):
+        loop = asyncio.get_running_loop()
+        conn = await loop.run_in_executor(None, self._engine.raw_connection)
+        try:
+            cursor = conn.cursor(name='data_tools_cursor')
+            cursor.itersize = self._chunksize
+            await loop.run_in_executor(None, cursor.execute, self._query)
+            published = False
+            while not self._stopping:
+                rows = await loop.run_in_executor(None, cursor.fetchmany, self._chunksize)
+                if not published:
+                    await self._publish_metadata([c.name for c in cursor.description])
+                    published = True
+                if not rows:
+                    break
+                await self._monitor.write(rows)
+            cursor.close()
+        finally:
+            await loop.run_in_executor(None, conn.close)
+
+    async def run(self):
+        """
+        Stream the query result to the monitor, stopping every worker if the extraction fails, and signal the end of the producer.
+        """
+        try:
+            if self._driver == 'executor':
+                await self._run_executor_driver()
+            else:
+                await self._run_async_driver()
+        except Exception as e:
+            await self.stop_all_workers(e)
+            raise Exception("Failed during data fetching") from e
+        finally:
+            await self._monitor.producer_end_process()
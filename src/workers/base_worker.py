@@ -1,10 +1,19 @@
 from typing import Any
+from itertools import count as _count
+from contextlib import nullcontext as _nullcontext
 from threading import (
     Thread as _Thread, 
     Event as _Event 
 )
 from abc import abstractmethod as _abstractmethod
-from src.monitors.monitor import Monitor as _Monitor
+from src.monitors.monitor import (
+    Monitor as _Monitor,
+    estimate_size as _estimate_size
+)
+
+
+_worker_ids = _count(1)
+
 
 class BaseWorker(_Thread):
     def __init__(
@@ -22,12 +31,12 @@ class BaseWorker(_Thread):
         super().__init__(
             group=None, 
             target=None, 
-            name=None, 
+            name=f"{type(self).__name__}-{next(_worker_ids)}",
             args=None,
             kwargs=None, 
             daemon=False
         )
-        self._stop = _Event()
+        self._stop_event = _Event()
         self._monitor = monitor
         self._is_producer: bool = is_producer
     
@@ -40,16 +49,45 @@ class BaseWorker(_Thread):
         """
         ...
 
+    def _timer(self, stage: str):
+        """
+        Return a context manager measuring a stage latency in the monitor's metrics, or a no-op one when metrics are disabled.
+        """
+        metrics = self._monitor.metrics
+        return metrics.timer(stage) if metrics is not None else _nullcontext()
+
+    def _record_chunk(self, data: object):
+        """
+        Record the rows and estimated bytes of a chunk moved by this worker in the monitor's metrics.
+        """
+        metrics = self._monitor.metrics
+        if metrics is not None:
+            metrics.record_chunk(self.name, self.role, len(data), _estimate_size(data))
+
     def stop(self):
         """
         Signal the worker thread to stop by setting the internal stop event.
         """
-        self._stop.set()
+        self._stop_event.set()
 
-    def stop_all_workers(self):
-        self._monitor.stop_all_workers()
+    def stop_all_workers(self, error: BaseException = None):
+        """
+        Stop every worker subscribed to the monitor, recording the error that caused the stop.
+        """
+        self._monitor.stop_all_workers(error)
     
+    @property
+    def stopping(self) -> bool:
+        return self._stop_event.is_set()
+
     @property 
     def is_producer(self): 
         return self._is_producer
+
+    @property
+    def role(self) -> str:
+        """
+        Role of the worker in the pipeline metrics.
+        """
+        return 'producer' if self._is_producer else 'consumer'
         
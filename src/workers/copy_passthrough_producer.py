@@ -0,0 +1,139 @@
+import struct
+from sqlalchemy.engine import Engine as _Engine
+from .base_worker import BaseWorker as _BaseWorker
+from src.monitors.monitor import Monitor as _Monitor
+from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.table.copy_encoder import CopyBlock as _CopyBlock
+
+
+PASSTHROUGH_FORMATS = ('binary', 'text')
+
+_BINARY_TRAILER = struct.pack('!h', -1)
+
+
+class _CopyStopped(Exception):
+    pass
+
+
+class _RowSink:
+    def __init__(self, on_row) -> None:
+        """
+        File-like target of cursor.copy_expert: psycopg2 calls write once per COPY data message, and the server sends one message per row.
+        """
+        self.write = on_row
+
+
+class CopyPassthroughProducer(_BaseWorker):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        engine: _Engine,
+        query: str,
+        columns: list[str],
+        chunksize: int,
+        table_manager: _TableManager,
+        copy_format: str = 'binary',
+        max_block_bytes: int = 16 * 1024 * 1024,
+        snapshot_id: str = None
+    ) -> None:
+        """
+        Initialize a CopyPassthroughProducer streaming the result of a query with COPY ... TO STDOUT and writing it to the monitor as raw CopyBlock chunks.
+
+        Values are never decoded: rows go from the source's COPY output to the target's COPY input as bytes, so the source and target columns must match (same types for 'binary'; types accepting the same text representation for 'text'). Blocks hold whole rows, so several consumers can load them concurrently.
+
+        Parameters:
+            query (str): SELECT query of the rows to copy.
+            columns (list[str]): Columns of the query, published for the consumers' COPY statement.
+            chunksize (int): Maximum number of rows per block.
+            table_manager (_TableManager): Utility building the COPY statement.
+            copy_format (str, optional): 'binary' or 'text'. Defaults to 'binary'.
+            max_block_bytes (int, optional): Maximum size of a block, so wide rows do not build huge blocks. Defaults to 16 MiB.
+            snapshot_id (str, optional): Snapshot exported with pg_export_snapshot() to read from, so parallel producers see the same data. Defaults to None.
+
+        Raises:
+            ValueError: If the copy format is not supported.
+        """
+        super().__init__(
+            monitor=monitor,
+            is_producer=True,
+        )
+        if copy_format not in PASSTHROUGH_FORMATS:
+            raise ValueError(f"Invalid passthrough format {copy_format}. Use one of {', '.join(PASSTHROUGH_FORMATS)}.")
+        self._engine = engine
+        self._query = query
+        self._columns = list(columns)
+        self._chunksize = chunksize
+        self._table_manager = table_manager
+        self._copy_format = copy_format
+        self._max_block_bytes = max_block_bytes
+        self._snapshot_id = snapshot_id
+        self._rows: list[bytes] = []
+        self._block_bytes = 0
+        self._header_pending = copy_format == 'binary'
+
+    def set_chunksize(self, chunksize: int):
+        """
+        Change the maximum number of rows of the next blocks while the producer is running.
+        """
+        self._chunksize = max(int(chunksize), 1)
+
+    @property
+    def chunksize(self) -> int:
+        return self._chunksize
+
+    def _on_row(self, data: bytes):
+        """
+        Collect one row sent by the server, dropping the binary header and trailer, and write a block once it is full.
+        """
+        if self._stop_event.is_set():
+            raise _CopyStopped()
+        if self._header_pending:
+            extension_length = struct.unpack_from('!i', data, 15)[0]
+            data = data[19 + extension_length:]
+            self._header_pending = False
+        # An empty COPY sends the header and the trailer in one message.
+        if self._copy_format == 'binary' and data == _BINARY_TRAILER:
+            return
+        if not data:
+            return
+
+        self._rows.append(data)
+        self._block_bytes += len(data)
+        if len(self._rows) >= self._chunksize or self._block_bytes >= self._max_block_bytes:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        block = _CopyBlock.from_rows(self._rows, self._copy_format)
+        self._rows = []
+        self._block_bytes = 0
+        self._record_chunk(block)
+        self._monitor.write(block)
+
+    def run(self):
+        """
+        Run the COPY TO STDOUT of the query and write its rows to the monitor in blocks.
+
+        Any error stops the whole pipeline. The source connection is released as soon as the COPY ends.
+        """
+        conn = None
+        try:
+            self._monitor.set_columns(self._columns)
+            copy_query = self._table_manager.build_copy_to_query(self._query, self._copy_format)
+            conn = self._engine.raw_connection()
+            cursor = conn.cursor()
+            if self._snapshot_id:
+                cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+                cursor.execute("SET TRANSACTION SNAPSHOT %s", (self._snapshot_id,))
+            cursor.copy_expert(copy_query, _RowSink(self._on_row))
+            self._flush()
+        except _CopyStopped:
+            pass
+        except Exception as e:
+            self.stop_all_workers(e)
+            raise Exception("Failed during data copy") from e
+        finally:
+            if conn is not None:
+                conn.close()
+            self._monitor.producer_end_process()
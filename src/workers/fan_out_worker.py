@@ -0,0 +1,78 @@
+from .base_worker import BaseWorker as _BaseWorker
+from src.monitors.monitor import Monitor as _Monitor
+from src.utils.table.table_manager import TableManager as _TableManager
+
+
+class FanOutWorker(_BaseWorker):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        output_monitors: list[_Monitor],
+        table_manager: _TableManager = None,
+        table_targets: list[str] = None
+    ) -> None:
+        """
+        Initialize a FanOutWorker reading chunks from one monitor and writing every chunk to several output monitors, one per consumer group.
+
+        Chunks are shared, not copied, so consumers must not modify them. Each output monitor bounds the lag of its group: a slow group holds up the others only once its buffer (and spill budget) is full. A group whose monitor was stopped by a failure is dropped and the others go on; the input monitor is stopped only when every group failed.
+
+        The worker is a consumer of monitor and a producer of every output monitor: subscribe it to monitor, call register_producer() on every output monitor for it, and link monitor to every output monitor one way, so a failure upstream stops every group but a failure in one group does not stop the others.
+
+        Parameters:
+            output_monitors (list[_Monitor]): Monitors of the consumer groups.
+            table_manager (_TableManager, optional): Utility building the insert query of every group for 'insert' consumers. Defaults to None.
+            table_targets (list[str], optional): Target table of every group, in the order of output_monitors. Defaults to None (no insert query is published).
+
+        Raises:
+            ValueError: If table_targets does not match output_monitors.
+        """
+        super().__init__(
+            monitor=monitor,
+            is_producer=False,
+        )
+        if table_targets is not None and len(table_targets) != len(output_monitors):
+            raise ValueError("table_targets must have one table per output monitor")
+        self._output_monitors = list(output_monitors)
+        self._table_manager = table_manager
+        self._table_targets = table_targets
+
+    @property
+    def role(self) -> str:
+        return 'fan_out'
+
+    def _publish(self, columns: list[str]):
+        for i, output in enumerate(self._output_monitors):
+            if self._table_manager is not None and self._table_targets:
+                output.set_insert_query(
+                    self._table_manager.build_insert_query(table_name=self._table_targets[i], columns=columns)
+                )
+            output.set_columns(columns)
+
+    def run(self):
+        """
+        Broadcast chunks until the input stream ends, after publishing the columns and insert query of every group.
+
+        Any error of the worker itself stops the input monitor, and with it every group, and is re-raised.
+        """
+        try:
+            try:
+                columns = self._monitor.get_columns()
+                if columns is not None:
+                    self._publish(list(columns))
+                while not self._stop_event.is_set():
+                    data = self._monitor.read()
+                    if data is None:
+                        break
+                    live = [output for output in self._output_monitors if not output.stopped]
+                    if not live:
+                        raise RuntimeError("Every fan-out target failed")
+                    for output in live:
+                        output.write(data)
+                    self._record_chunk(data)
+            except Exception as e:
+                self.stop_all_workers(e)
+                raise Exception(f"Failed broadcasting chunks: {e}") from e
+        finally:
+            for output in self._output_monitors:
+                output.producer_end_process()
+            self._monitor.signal_end_process()
@@ -0,0 +1,227 @@
+import os
+from urllib.parse import quote as _quote
+from .base_worker import BaseWorker as _BaseWorker
+from src.monitors.monitor import Monitor as _Monitor
+from src.utils.table.copy_encoder import CsvCopyEncoder as _CsvCopyEncoder
+from src.utils.table.columnar_chunk import ColumnarChunk as _ColumnarChunk
+from src.utils.files.file_formats import (
+    FILE_FORMATS,
+    CSV_COMPRESSIONS as _CSV_COMPRESSIONS,
+    HIVE_NULL_PARTITION as _HIVE_NULL_PARTITION,
+    open_csv as _open_csv,
+    require_pyarrow as _require_pyarrow
+)
+
+
+class _OpenFile:
+    def __init__(self, path: str, handle: object) -> None:
+        self.path = path
+        self.temp_path = path + '.tmp'
+        self.handle = handle
+
+
+class FileConsumer(_BaseWorker):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        directory: str,
+        file_format: str = 'csv',
+        compression: str = None,
+        file_prefix: str = 'part',
+        max_file_bytes: int = None,
+        partition_column: str = None,
+        parquet_schema: object = None
+    ) -> None:
+        """
+        Initialize a FileConsumer writing the chunks read from a monitor to CSV or Parquet files.
+
+        Every consumer writes its own files, named {file_prefix}-{worker name}-{part}, so many consumers can write to the same directory at once. A file is written under a .tmp name and renamed when complete, so readers never see a partial file.
+
+        CSV files have a header line and use the PostgreSQL CSV conventions (NULL is an unquoted empty field, strings are quoted), so they can be loaded back with COPY ... (FORMAT csv, HEADER). Parquet files need pyarrow; their schema is inferred from the first chunk unless given. A column NULL in every row so far gets the type of its first values: the open files, which hold one schema each, are completed and the next ones use the wider schema.
+
+        Parameters:
+            directory (str): Directory of the files, created if needed.
+            file_format (str, optional): 'csv' or 'parquet'. Defaults to 'csv'.
+            compression (str, optional): For CSV, None, 'gzip', 'bz2' or 'xz'. For Parquet, any pyarrow codec, e.g. 'snappy' or 'zstd'. Defaults to None (uncompressed CSV, snappy Parquet).
+            file_prefix (str, optional): Prefix of the file names. Defaults to 'part'.
+            max_file_bytes (int, optional): Size after which the current file is closed and the next chunk starts a new one. Defaults to None (one file per consumer and partition).
+            partition_column (str, optional): Column whose values split the rows into {column}={value} subdirectories. The column is not written in the files. Defaults to None.
+            parquet_schema (object, optional): pyarrow.Schema of the Parquet files, used as is. Defaults to None (inferred from the chunks).
+
+        Raises:
+            ValueError: If the format or compression is not supported.
+            ImportError: If file_format is 'parquet' and pyarrow is not installed.
+        """
+        super().__init__(
+            monitor=monitor,
+            is_producer=False,
+        )
+        if file_format not in FILE_FORMATS:
+            raise ValueError(f"Invalid file format {file_format}. Use one of {', '.join(FILE_FORMATS)}.")
+        if file_format == 'csv' and compression not in _CSV_COMPRESSIONS:
+            raise ValueError(f"Invalid CSV compression {compression}. Use one of {', '.join(str(c) for c in _CSV_COMPRESSIONS)}.")
+        if file_format == 'parquet':
+            _require_pyarrow()
+
+        self._directory = directory
+        self._file_format = file_format
+        self._compression = compression
+        self._file_prefix = file_prefix
+        self._max_file_bytes = max_file_bytes
+        self._partition_column = partition_column
+        self._parquet_schema = parquet_schema
+        self._infer_schema = parquet_schema is None
+        self._open_files: dict[object, _OpenFile] = {}
+        self._parts = 0
+        self._files_written: list[str] = []
+
+    @property
+    def files_written(self) -> list[str]:
+        """
+        Paths of the files completed by this consumer.
+        """
+        return list(self._files_written)
+
+    def _extension(self) -> str:
+        if self._file_format == 'parquet':
+            return '.parquet'
+        return '.csv' + _CSV_COMPRESSIONS[self._compression][0]
+
+    def _open(self, partition: object, columns: list[str], first_chunk: list) -> _OpenFile:
+        directory = self._directory
+        if self._partition_column is not None:
+            value = _HIVE_NULL_PARTITION if partition is None else _quote(str(partition), safe='')
+            directory = os.path.join(directory, f"{self._partition_column}={value}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{self._file_prefix}-{self.name}-{self._parts:05d}{self._extension()}")
+        self._parts += 1
+
+        if self._file_format == 'parquet':
+            _, pq = _require_pyarrow()
+            if self._parquet_schema is None:
+                self._parquet_schema = self._to_arrow(first_chunk, columns).schema
+            handle = pq.ParquetWriter(path + '.tmp', self._parquet_schema, compression=self._compression or 'snappy')
+        else:
+            handle = _open_csv(path + '.tmp', 'wb', self._compression)
+            handle.write((','.join(self._encoder.format_value(c) for c in columns) + '\n').encode('utf-8'))
+
+        return _OpenFile(path, handle)
+
+    def _close(self, key: object):
+        open_file = self._open_files.pop(key)
+        open_file.handle.close()
+        os.replace(open_file.temp_path, open_file.path)
+        self._files_written.append(open_file.path)
+
+    def _to_arrow(self, rows: list, columns: list[str]):
+        pa, _ = _require_pyarrow()
+        arrays = [list(values) for values in zip(*rows)] if rows else [[] for _ in columns]
+        if self._parquet_schema is None:
+            return pa.table(dict(zip(columns, arrays)))
+
+        return pa.Table.from_arrays(
+            [pa.array(values, type=field.type) for values, field in zip(arrays, self._parquet_schema)],
+            schema=self._parquet_schema
+        )
+
+    def _widen_schema(self, rows: list) -> bool:
+        """
+        Give the inferred columns still of the null type, i.e. NULL in every row so far, the type of their first values in rows.
+
+        Returns:
+            bool: True if the schema changed.
+        """
+        if not self._infer_schema or self._parquet_schema is None:
+            return False
+        pa, _ = _require_pyarrow()
+        fields = list(self._parquet_schema)
+        changed = False
+        for i, field in enumerate(fields):
+            if not pa.types.is_null(field.type):
+                continue
+            values = [row[i] for row in rows]
+            if any(value is not None for value in values):
+                fields[i] = field.with_type(pa.array(values).type)
+                changed = True
+        if changed:
+            self._parquet_schema = pa.schema(fields)
+
+        return changed
+
+    def _split_partitions(self, rows: list, columns: list[str]) -> tuple[dict, list[str]]:
+        """
+        Group the rows by partition value and drop the partition column.
+        """
+        if self._partition_column is None:
+            return {None: rows}, columns
+
+        index = columns.index(self._partition_column)
+        groups: dict = {}
+        for row in rows:
+            groups.setdefault(row[index], []).append(row[:index] + row[index + 1:])
+
+        return groups, columns[:index] + columns[index + 1:]
+
+    def _write(self, data: object, columns: list[str]):
+        rows = data.to_rows() if isinstance(data, _ColumnarChunk) else [tuple(row) for row in data]
+        groups, file_columns = self._split_partitions(rows, columns)
+        for partition, group in groups.items():
+            if self._file_format == 'parquet' and self._widen_schema(group):
+                for key in list(self._open_files):
+                    self._close(key)
+            open_file = self._open_files.get(partition)
+            if open_file is None:
+                open_file = self._open_files[partition] = self._open(partition, file_columns, group)
+            with self._timer('encode'):
+                if self._file_format == 'parquet':
+                    payload = self._to_arrow(group, file_columns)
+                else:
+                    payload = self._encoder.encode(group).getvalue()
+            with self._timer('commit'):
+                if self._file_format == 'parquet':
+                    open_file.handle.write_table(payload)
+                else:
+                    open_file.handle.write(payload)
+            if self._max_file_bytes and os.path.getsize(open_file.temp_path) >= self._max_file_bytes:
+                self._close(partition)
+
+    def _discard(self):
+        """
+        Close and remove the files not completed yet.
+        """
+        for open_file in self._open_files.values():
+            try:
+                open_file.handle.close()
+            finally:
+                if os.path.exists(open_file.temp_path):
+                    os.remove(open_file.temp_path)
+        self._open_files.clear()
+
+    def run(self):
+        """
+        Read chunks from the monitor and append them to the current file of their partition until the stream ends, then complete every open file.
+
+        If the pipeline is stopped or an error occurs, the files not completed yet are removed; on error all workers are stopped and the exception is re-raised.
+        """
+        self._encoder = _CsvCopyEncoder()
+        try:
+            try:
+                columns = list(self._monitor.get_columns() or [])
+                while not self._stop_event.is_set():
+                    data = self._monitor.read()
+                    if data is None:
+                        break
+                    payload = data.data if getattr(data, 'mark_committed', None) else data
+                    if payload:
+                        self._write(payload, columns)
+                        self._record_chunk(payload)
+                if self._monitor.stopped or self._stop_event.is_set():
+                    self._discard()
+                for key in list(self._open_files):
+                    self._close(key)
+            except Exception as e:
+                self.stop_all_workers(e)
+                self._discard()
+                raise Exception(e)
+        finally:
+            self._monitor.signal_end_process()
@@ -0,0 +1,171 @@
+from typing import TYPE_CHECKING
+from .base_worker import BaseWorker as _BaseWorker
+from src.monitors.monitor import Monitor as _Monitor
+from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.table.columnar_chunk import ColumnarChunk as _ColumnarChunk
+from src.utils.files.file_formats import (
+    infer_file_format as _infer_file_format,
+    expand_file_paths as _expand_file_paths,
+    hive_partitions as _hive_partitions,
+    require_pyarrow as _require_pyarrow
+)
+
+if TYPE_CHECKING:
+    import pandas as _pd
+
+
+class FileProducer(_BaseWorker):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        file_path: object,
+        chunksize: int,
+        table_manager: _TableManager = None,
+        table_target: str = None,
+        chunk_format: str = 'rows',
+        columns: list[str] = None,
+        hive_partitioning: bool = True,
+        csv_options: dict = None
+    ) -> None:
+        """
+        Initialize a FileProducer streaming the rows of CSV or Parquet files to a monitor, one chunk at a time.
+
+        The format and compression of each file are inferred from its extension (.csv, .csv.gz, .csv.bz2, .csv.xz, .parquet). Uncompressed CSV and Parquet files are memory-mapped, so multi-GB files are read without being materialized: only the current chunk is decoded. CSV values are read as text, parsed by PostgreSQL on load, and empty fields are read as NULL.
+
+        Parameters:
+            file_path (object): A file, a glob pattern, a directory (read recursively) or a list of them. Files are read in sorted order. Split them between several producers to read them in parallel.
+            chunksize (int): Number of rows per chunk.
+            table_manager (_TableManager, optional): Utility building the insert query published for 'insert' consumers. Defaults to None.
+            table_target (str, optional): Target table of the insert query. Defaults to None (no insert query is published).
+            chunk_format (str, optional): 'rows' for lists of row tuples or 'columnar' for ColumnarChunk. Defaults to 'rows'.
+            columns (list[str], optional): Columns to read, in this order. Defaults to None (every column of the first file).
+            hive_partitioning (bool, optional): Add the partition values encoded in the directories (e.g. country=BR/) as columns, as written by FileConsumer with a partition_column. Defaults to True.
+            csv_options (dict, optional): Extra keyword arguments of pandas.read_csv, e.g. {'sep': ';'}. Defaults to None.
+
+        Raises:
+            ValueError: If the chunk format is unknown.
+        """
+        super().__init__(
+            monitor=monitor,
+            is_producer=True,
+        )
+        if chunk_format not in ('rows', 'columnar'):
+            raise ValueError(f"Invalid chunk format {chunk_format}. Use 'rows' or 'columnar'.")
+        self._file_path = file_path
+        self._chunksize = chunksize
+        self._table_manager = table_manager
+        self._table_target = table_target
+        self._chunk_format = chunk_format
+        self._columns = list(columns) if columns else None
+        self._hive_partitioning = hive_partitioning
+        self._csv_options = csv_options or {}
+
+    def set_chunksize(self, chunksize: int):
+        """
+        Change the number of rows of the next chunks while the producer is running. Parquet files pick it up at the next file.
+        """
+        self._chunksize = max(int(chunksize), 1)
+
+    @property
+    def chunksize(self) -> int:
+        return self._chunksize
+
+    def _read_csv(self, file_path: str, compression: str):
+        """
+        Yield the chunks of a CSV file as DataFrames of strings.
+        """
+        import pandas as _pd
+        wanted = set(self._columns) if self._columns else None
+        options = {
+            'dtype': str,
+            'keep_default_na': False,
+            'na_values': [''],
+            'compression': compression,
+            'memory_map': compression is None,
+            'usecols': (lambda column: column in wanted) if wanted else None,
+            **self._csv_options
+        }
+        with _pd.read_csv(file_path, iterator=True, **options) as reader:
+            while True:
+                try:
+                    frame = reader.get_chunk(self._chunksize)
+                except StopIteration:
+                    return
+                yield frame
+
+    def _read_parquet(self, file_path: str):
+        """
+        Yield the record batches of a memory-mapped Parquet file as DataFrames.
+        """
+        _, pq = _require_pyarrow()
+        parquet_file = pq.ParquetFile(file_path, memory_map=True)
+        columns = None
+        if self._columns is not None:
+            columns = [c for c in self._columns if c in parquet_file.schema_arrow.names]
+        for batch in parquet_file.iter_batches(batch_size=self._chunksize, columns=columns):
+            yield batch.to_pandas(integer_object_nulls=True)
+
+    def _read_file(self, file_path: str):
+        file_format, compression = _infer_file_format(file_path)
+        frames = self._read_parquet(file_path) if file_format == 'parquet' else self._read_csv(file_path, compression)
+        partitions = _hive_partitions(file_path) if self._hive_partitioning else {}
+        for frame in frames:
+            for name, value in partitions.items():
+                if name not in frame.columns:
+                    frame[name] = value
+            yield frame
+
+    def _to_chunk(self, frame: '_pd.DataFrame', columns: list[str]) -> object:
+        frame = frame[columns]
+        if self._chunk_format == 'columnar':
+            return _ColumnarChunk.from_frame(frame)
+
+        return list(frame.astype(object).where(frame.notna(), None).itertuples(index=False, name=None))
+
+    def _file_columns(self, file_path: str) -> list[str]:
+        """
+        Read the columns of a file from its header or schema, without reading its rows.
+        """
+        file_format, compression = _infer_file_format(file_path)
+        if file_format == 'parquet':
+            _, pq = _require_pyarrow()
+            columns = list(pq.read_schema(file_path).names)
+        else:
+            import pandas as _pd
+            options = {'compression': compression, **self._csv_options}
+            columns = [str(c) for c in _pd.read_csv(file_path, nrows=0, **options).columns]
+        if self._hive_partitioning:
+            columns += [name for name in _hive_partitions(file_path) if name not in columns]
+
+        return columns
+
+    def run(self):
+        """
+        Read every file in order and write its chunks to the monitor.
+
+        The columns of the first file (or the configured ones) are published to the monitor before any chunk, with the insert query of the target table when one is configured. Any error stops the whole pipeline.
+        """
+        try:
+            files = _expand_file_paths(self._file_path)
+            columns = self._columns or self._file_columns(files[0])
+            if self._table_manager is not None and self._table_target:
+                self._monitor.set_insert_query(
+                    self._table_manager.build_insert_query(table_name=self._table_target, columns=columns)
+                )
+            self._monitor.set_columns(columns)
+
+            for file_path in files:
+                for frame in self._read_file(file_path):
+                    if self._stop_event.is_set():
+                        return
+                    with self._timer('encode'):
+                        chunk = self._to_chunk(frame, columns)
+                    if not len(chunk):
+                        continue
+                    self._record_chunk(chunk)
+                    self._monitor.write(chunk)
+        except Exception as e:
+            self.stop_all_workers(e)
+            raise Exception(f"Failed reading files {self._file_path}") from e
+        finally:
+            self._monitor.producer_end_process()
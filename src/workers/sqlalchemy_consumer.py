@@ -2,6 +2,15 @@ from sqlalchemy.engine import Engine as _Engine
 from .base_worker import BaseWorker as _BaseWorker
 from src.monitors.monitor import Monitor as _Monitor
 from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.table.copy_encoder import (
+    CsvCopyEncoder as _CsvCopyEncoder,
+    BinaryCopyEncoder as _BinaryCopyEncoder
+)
+
+
+LOAD_STRATEGIES = ('insert', 'copy_csv', 'copy_binary', 'upsert')
+
+PASSTHROUGH_STRATEGIES = ('passthrough_binary', 'passthrough_text')
 
 
 class SQLAlchemyConsumer(_BaseWorker):
@@ -10,50 +19,220 @@ class SQLAlchemyConsumer(_BaseWorker):
         monitor: _Monitor,
         engine: _Engine,
         table_manager: _TableManager,
+        load_strategy: str = 'insert',
+        table_target: str = None,
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+        page_size: int = 1000,
     ) -> None:
         """
         Initialize a SQLAlchemyConsumer with a monitor, database engine, and table manager.
-        
+
         Parameters:
             monitor (_Monitor): The monitor instance used for data coordination.
             engine (_Engine): The SQLAlchemy engine for database connections.
             table_manager (_TableManager): The manager responsible for database table operations.
+            load_strategy (str, optional): How chunks are written: 'insert' (executemany), 'copy_csv' or 'copy_binary' (COPY FROM STDIN), 'upsert' (multi-row INSERT ... ON CONFLICT pages through a prepared statement), or 'passthrough_binary' or 'passthrough_text' (COPY FROM STDIN of the CopyBlock chunks of a CopyPassthroughProducer, as they are). Defaults to 'insert'.
+            table_target (str, optional): Name of the target table. Required by every strategy except 'insert'.
+            conflict_columns (list[str], optional): Conflict key of the 'upsert' strategy.
+            update_columns (list[str], optional): Columns overwritten on conflict by the 'upsert' strategy. Defaults to every column outside the conflict key.
+            page_size (int, optional): Rows per INSERT statement of the 'upsert' strategy, capped so a statement stays within 65535 parameters. Defaults to 1000.
+
+        Raises:
+            ValueError: If the load strategy is unknown, lacks a target table, or 'upsert' is used without conflict columns.
         """
         super().__init__(
             monitor=monitor,
             is_producer=False,
         )
-        
+
+        if load_strategy not in LOAD_STRATEGIES + PASSTHROUGH_STRATEGIES:
+            raise ValueError(f"Invalid load strategy {load_strategy}. Use one of {', '.join(LOAD_STRATEGIES + PASSTHROUGH_STRATEGIES)}.")
+        if load_strategy != 'insert' and not table_target:
+            raise ValueError(f"Load strategy {load_strategy} requires table_target")
+        if load_strategy == 'upsert' and not conflict_columns:
+            raise ValueError("Load strategy upsert requires conflict_columns")
+
         self._engine = engine
         self._table_manager = table_manager
+        self._load_strategy = load_strategy
+        self._table_target = table_target
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+        self._page_size = max(page_size, 1)
+        self._prepared_statement = None
+
+    def _build_loader(self, conn, cursor):
+        """
+        Build the function that writes one chunk to the target according to the load strategy.
+        """
+        if self._load_strategy == 'insert':
+            self._insert_query_template = self._monitor.get_insert_query()
+            return self._build_insert_loader(self._insert_query_template, conn, cursor)
+
+        columns = self._monitor.get_columns()
+
+        if self._load_strategy == 'upsert':
+            return self._build_upsert_loader(columns, conn, cursor)
+
+        if self._load_strategy in PASSTHROUGH_STRATEGIES:
+            return self._build_passthrough_loader(columns, conn, cursor)
+
+        column_types = self._table_manager.get_column_types(self._engine, self._table_target)
+
+        if self._load_strategy == 'copy_binary':
+            encoder = _BinaryCopyEncoder(columns=columns, column_types=column_types)
+            copy_format = 'binary'
+        else:
+            encoder = _CsvCopyEncoder(column_types=column_types, columns=columns)
+            copy_format = 'csv'
+
+        copy_query = self._table_manager.build_copy_query(
+            table_name=self._table_target,
+            columns=columns,
+            copy_format=copy_format
+        )
+
+        def load(data):
+            with self._timer('encode'):
+                buffer = encoder.encode(data)
+            with self._timer('commit'):
+                self._table_manager.copy_insert(
+                    data=buffer,
+                    conn=conn,
+                    cursor=cursor,
+                    copy_query=copy_query
+                )
+
+        return load
+
+    def _build_passthrough_loader(self, columns: list[str], conn, cursor):
+        """
+        Build the function that writes one CopyBlock with COPY FROM STDIN, without decoding its rows.
+        """
+        copy_format = self._load_strategy[len('passthrough_'):]
+        copy_query = self._table_manager.build_copy_query(
+            table_name=self._table_target,
+            columns=columns,
+            copy_format=copy_format
+        )
+
+        def load(data):
+            if getattr(data, 'copy_format', None) != copy_format:
+                raise ValueError(f"Load strategy {self._load_strategy} expects {copy_format} CopyBlock chunks")
+            with self._timer('commit'):
+                self._table_manager.copy_insert(
+                    data=data.buffer(),
+                    conn=conn,
+                    cursor=cursor,
+                    copy_query=copy_query
+                )
+
+        return load
+
+    def _build_upsert_loader(self, columns: list[str], conn, cursor):
+        """
+        Build the function that merges one chunk with multi-row INSERT ... ON CONFLICT statements.
+
+        A statement of page_size rows is PREPAREd once on the consumer's connection, so the server parses and plans it once for the whole run and every full page only ships its values. The last partial page of a chunk goes through execute_values.
+
+        Raises:
+            ValueError: If a conflict column is not among the loaded columns.
+        """
+        missing = [c for c in self._conflict_columns if c not in columns]
+        if missing:
+            raise ValueError(f"Conflict columns {missing} are not loaded columns {columns}")
+
+        page_rows = max(min(self._page_size, 65535 // max(len(columns), 1)), 1)
+        options = {
+            'table_name': self._table_target,
+            'columns': columns,
+            'conflict_columns': self._conflict_columns,
+            'update_columns': self._update_columns,
+        }
+        upsert_query = self._table_manager.build_upsert_values_query(**options)
+        statement = f"data_tools_upsert_{self.name.rsplit('-', 1)[-1]}"
+        self._table_manager.prepare_statement(
+            conn, cursor, statement, self._table_manager.build_upsert_values_query(**options, rows=page_rows)
+        )
+        self._prepared_statement = statement
+        key_indexes = [columns.index(c) for c in self._conflict_columns] if self._update_columns != [] else None
+
+        def load(data):
+            to_rows = getattr(data, 'to_rows', None)
+            if to_rows is not None:
+                with self._timer('encode'):
+                    data = to_rows()
+            with self._timer('commit'):
+                self._table_manager.upsert_values(
+                    data=data,
+                    conn=conn,
+                    cursor=cursor,
+                    upsert_query=upsert_query,
+                    page_size=page_rows,
+                    key_indexes=key_indexes,
+                    prepared=(statement, page_rows)
+                )
+
+        return load
+
+    def _build_insert_loader(self, query: str, conn, cursor):
+        """
+        Build the function that writes one chunk with executemany, converting columnar chunks back to rows first.
+        """
+        def load(data):
+            to_rows = getattr(data, 'to_rows', None)
+            if to_rows is not None:
+                with self._timer('encode'):
+                    data = to_rows()
+            with self._timer('commit'):
+                self._table_manager.insert(
+                    data=data,
+                    insert_query_template=query,
+                    conn=conn,
+                    cursor=cursor
+                )
+
+        return load
 
     def run(self):
         """
-        Continuously reads data from the monitor and inserts it into the database until a stop event is triggered.
-        
-        If an error occurs during insertion, all workers are stopped and the exception is re-raised. After completion or error, database resources are closed and the monitor is notified that processing has ended.
+        Continuously reads data from the monitor and loads it into the database until the stream ends or a stop event is triggered.
+
+        Journaled chunks are recorded in their checkpoint journal right after their transaction commits.
+
+        If an error occurs during loading, all workers are stopped and the exception is re-raised. After completion or error, database resources are closed and the monitor is notified that processing has ended.
         """
-        self._insert_query_template = self._monitor.get_insert_query()
         conn = self._engine.raw_connection()
-        
+
         cursor = conn.cursor()
         try:
-            while not self._stop.is_set():
+            try:
+                load = self._build_loader(conn, cursor)
+            except Exception as e:
+                self.stop_all_workers(e)
+                raise
+            while not self._stop_event.is_set():
                 data = self._monitor.read()
+                if data is None:
+                    break
                 if data:
+                    mark_committed = getattr(data, 'mark_committed', None)
+                    payload = data.data if mark_committed else data
                     try:
-                        self._table_manager.insert(
-                            data=data,
-                            insert_query_template=self._insert_query_template,
-                            conn=conn,
-                            cursor=cursor
-                        )
+                        load(payload)
+                        if mark_committed:
+                            mark_committed()
+                        self._record_chunk(payload)
                     except Exception as e:
-                        self.stop_all_workers()
+                        self.stop_all_workers(e)
                         cursor.close()
                         conn.close()
                         raise Exception(e)
         finally:
+            if self._prepared_statement is not None:
+                self._table_manager.deallocate_statement(conn, cursor, self._prepared_statement)
+                self._prepared_statement = None
             cursor.close()
             conn.close()
-            self._monitor.signal_end_process()
\ No newline at end of file
+            self._monitor.signal_end_process()
@@ -0,0 +1,75 @@
+from sqlalchemy import create_engine as _create_engine
+from sqlalchemy.engine import Engine as _Engine
+from sqlalchemy.pool import NullPool as _NullPool
+from src.monitors.process_monitor import (
+    ProcessMonitor as _ProcessMonitor,
+    PROCESS_CONTEXT as _PROCESS_CONTEXT
+)
+from src.utils.table.table_manager import TableManager as _TableManager
+from .sqlalchemy_consumer import SQLAlchemyConsumer as _SQLAlchemyConsumer
+
+
+class SQLAlchemyProcessConsumer(_PROCESS_CONTEXT.Process):
+    def __init__(
+        self,
+        monitor: _ProcessMonitor,
+        engine: _Engine,
+        table_manager: _TableManager,
+        load_strategy: str = 'insert',
+        table_target: str = None,
+        conflict_columns: list[str] = None,
+        update_columns: list[str] = None,
+    ) -> None:
+        """
+        Initialize a consumer that runs a SQLAlchemyConsumer inside its own process, with its own database connection.
+
+        Engines cannot cross process boundaries, so only the engine URL is kept and a new engine is created in the child process.
+
+        Parameters:
+            monitor (_ProcessMonitor): The process monitor the consumer reads chunks from.
+            engine (_Engine): The SQLAlchemy engine whose URL is used to connect from the child process.
+            table_manager (_TableManager): The manager responsible for database table operations.
+            load_strategy (str, optional): How chunks are written, as in SQLAlchemyConsumer. Defaults to 'insert'.
+            table_target (str, optional): Name of the target table. Required by every strategy except 'insert'.
+            conflict_columns (list[str], optional): Conflict key of the 'upsert' strategy.
+            update_columns (list[str], optional): Columns overwritten on conflict by the 'upsert' strategy.
+        """
+        super().__init__(daemon=False)
+        self._monitor = monitor
+        self._engine_url = engine.url.render_as_string(hide_password=False)
+        self._table_manager = table_manager
+        self._load_strategy = load_strategy
+        self._table_target = table_target
+        self._conflict_columns = conflict_columns
+        self._update_columns = update_columns
+        self._is_producer: bool = False
+
+    def run(self):
+        """
+        Create a dedicated engine in the child process and run the consumer loop until the stream ends or the pipeline is stopped.
+        """
+        engine = _create_engine(self._engine_url, poolclass=_NullPool)
+        try:
+            consumer = _SQLAlchemyConsumer(
+                monitor=self._monitor,
+                engine=engine,
+                table_manager=self._table_manager,
+                load_strategy=self._load_strategy,
+                table_target=self._table_target,
+                conflict_columns=self._conflict_columns,
+                update_columns=self._update_columns
+            )
+            consumer.name = self.name
+            consumer.run()
+        finally:
+            engine.dispose()
+
+    def stop(self):
+        """
+        Process consumers stop through the monitor's shared stop event, so there is nothing to signal from the parent.
+        """
+        pass
+
+    @property
+    def is_producer(self):
+        return self._is_producer
@@ -4,6 +4,11 @@ from .base_worker import BaseWorker as _BaseWorker
 from src.monitors.monitor import Monitor as _Monitor
 from sqlalchemy import text
 from src.utils.table.table_manager import TableManager
+from src.utils.table.columnar_chunk import ColumnarChunk as _ColumnarChunk
+from src.utils.state.checkpoint_journal import (
+    CheckpointJournal as _CheckpointJournal,
+    JournaledChunk as _JournaledChunk
+)
 
 class SQLAlchemyProducer(_BaseWorker):
     def __init__(
@@ -14,7 +19,13 @@ class SQLAlchemyProducer(_BaseWorker):
         max_rows_buffer: int, 
         chunksize: int,
         table_manager: TableManager,
-        table_target: str
+        table_target: str,
+        snapshot_id: str = None,
+        chunk_format: str = 'rows',
+        checkpoint_journal: _CheckpointJournal = None,
+        job_id: str = None,
+        checkpoint_column: str = None,
+        range_id: int = 0
     ) -> None:
         """
         Initialize a SQLAlchemyProducer to stream query results from a database and send them to a monitor.
@@ -25,6 +36,12 @@ class SQLAlchemyProducer(_BaseWorker):
             chunksize (int): Number of rows to fetch per chunk from the database.
             table_manager (TableManager): Utility for building insert queries for the target table.
             table_target (str): Name of the target table for data insertion.
+            snapshot_id (str, optional): Snapshot exported with pg_export_snapshot() to read from, so parallel producers see the same data. Defaults to None.
+            chunk_format (str, optional): 'rows' to write the fetched rows as they are, or 'columnar' to write each chunk as a ColumnarChunk of NumPy arrays. Defaults to 'rows'.
+            checkpoint_journal (_CheckpointJournal, optional): Journal in which consumers record committed chunks. When set, the query must be ordered by checkpoint_column. Defaults to None.
+            job_id (str, optional): Identifier of the job in the checkpoint journal.
+            checkpoint_column (str, optional): Unique key column whose first and last values identify each chunk in the journal.
+            range_id (int, optional): Index of the source range read by this producer. Defaults to 0.
         """
         super().__init__(
             monitor=monitor,
@@ -36,42 +53,84 @@ class SQLAlchemyProducer(_BaseWorker):
         self._chunksize=chunksize
         self._table_manager = table_manager
         self._table_target = table_target
+        self._snapshot_id = snapshot_id
+        if chunk_format not in ('rows', 'columnar'):
+            raise ValueError(f"Invalid chunk format {chunk_format}. Use 'rows' or 'columnar'.")
+        self._chunk_format = chunk_format
+        self._checkpoint_journal = checkpoint_journal
+        self._job_id = job_id
+        self._checkpoint_column = checkpoint_column
+        self._range_id = range_id
         
 
+    def set_chunksize(self, chunksize: int):
+        """
+        Change the number of rows of the next fetched chunks while the producer is running.
+        """
+        self._chunksize = max(int(chunksize), 1)
+
+    @property
+    def chunksize(self) -> int:
+        return self._chunksize
+
     def run(self):
         """
         Executes a SQL query using SQLAlchemy, streams the results in chunks, and writes each chunk to the monitor.
         
         Establishes a streaming database connection, executes the provided query, and retrieves results in batches of the specified chunk size. For each batch, writes the data to the monitor and checks for stop signals to halt processing if necessary. Handles SQL execution errors and ensures all workers are stopped on failure. Signals completion to the monitor after all data is processed.
         """
-        with self._engine.connect().execution_options(
-            stream_results=True, max_rows_buffer=self._max_rows_buffer
-        ) as conn:
-            try:
-                cursor = conn.execute(text(self._query)).yield_per(self._chunksize) 
-            except _SQLAlchemyError as e:
-                self.stop_all_workers()
-                conn.close()
-                raise _SQLAlchemyError(
-                    f"Fail to insert data \n {e}"
+        options = {"isolation_level": "REPEATABLE READ"} if self._snapshot_id else {}
+        # Stream only the query: a streamed SET TRANSACTION SNAPSHOT would be wrapped in a DECLARE ... CURSOR and rejected.
+        query = text(self._query).execution_options(stream_results=True, max_row_buffer=self._max_rows_buffer)
+
+        try:
+            with self._engine.connect().execution_options(**options) as conn:
+                try:
+                    if self._snapshot_id:
+                        conn.begin()
+                        conn.execution_options(stream_results=False).execute(
+                            text("SET TRANSACTION SNAPSHOT :snapshot_id"), {"snapshot_id": self._snapshot_id}
+                        )
+                    cursor = conn.execute(query).yield_per(self._chunksize) 
+                except _SQLAlchemyError as e:
+                    self.stop_all_workers(e)
+                    conn.close()
+                    raise _SQLAlchemyError(
+                        f"Fail to insert data \n {e}"
+                    )
+                columns = cursor.keys()
+
+                insert_query = self._table_manager.build_insert_query(
+                    table_name=self._table_target,
+                    columns=columns
                 )
-            columns = cursor.keys()
 
-            insert_query = self._table_manager.build_insert_query(
-                table_name=self._table_target,
-                columns=columns
-            )
+                self._monitor.set_insert_query(insert_query)
+                self._monitor.set_columns(columns)
 
-            self._monitor.set_insert_query(insert_query)
+                if self._checkpoint_journal is not None:
+                    key_index = list(columns).index(self._checkpoint_column)
+                    seq = self._checkpoint_journal.get_next_seq(self._job_id, self._range_id)
 
-            while result := cursor.fetchmany():
                 try:
-                    if self._stop.is_set():
-                        raise RuntimeError("Stopping data production due to error in another worker.")
-                    else:
+                    while True:
+                        with self._timer('fetch'):
+                            result = cursor.fetchmany(self._chunksize)
+                        if not result or self._stop_event.is_set():
+                            break
+                        self._record_chunk(result)
+                        lo, hi = (result[0][key_index], result[-1][key_index]) if self._checkpoint_journal else (None, None)
+                        if self._chunk_format == 'columnar':
+                            with self._timer('encode'):
+                                result = _ColumnarChunk.from_rows(result, columns)
+                        if self._checkpoint_journal is not None:
+                            result = _JournaledChunk(
+                                result, self._checkpoint_journal, self._job_id, self._range_id, seq, lo, hi
+                            )
+                            seq += 1
                         self._monitor.write(result)
                 except Exception as e:
-                    self.stop_all_workers()
-                    raise Exception("Failed during data fetching")
-        
-        self._monitor.producer_end_process()
+                    self.stop_all_workers(e)
+                    raise Exception("Failed during data fetching") from e
+        finally:
+            self._monitor.producer_end_process()
@@ -0,0 +1,114 @@
+from .base_worker import BaseWorker as _BaseWorker
+from src.monitors.monitor import Monitor as _Monitor
+from src.utils.table.table_manager import TableManager as _TableManager
+from src.utils.table.columnar_chunk import ColumnarChunk as _ColumnarChunk
+from src.utils.transform.chunk_transform import ChunkTransform as _ChunkTransform
+
+
+class TransformWorker(_BaseWorker):
+    def __init__(
+        self,
+        monitor: _Monitor,
+        output_monitor: _Monitor,
+        transform: _ChunkTransform,
+        table_manager: _TableManager = None,
+        table_target: str = None,
+        chunk_format: str = 'rows'
+    ) -> None:
+        """
+        Initialize a TransformWorker reading chunks from one monitor, transforming each one as a whole DataFrame and writing the result to a second monitor read by the consumers.
+
+        The worker is a consumer of monitor and a producer of output_monitor: subscribe it to monitor and call output_monitor.register_producer() for it, and link the two monitors so a failure on either side stops the whole pipeline. Several transform workers can share the two monitors, independently of the number of consumers.
+
+        Parameters:
+            output_monitor (_Monitor): Monitor receiving the transformed chunks.
+            transform (_ChunkTransform): Transformations applied to every chunk.
+            table_manager (_TableManager, optional): Utility building the insert query of the transformed columns for 'insert' consumers. Defaults to None.
+            table_target (str, optional): Target table of the insert query. Defaults to None (no insert query is published).
+            chunk_format (str, optional): Format of the chunks written to output_monitor: 'rows' or 'columnar'. Defaults to 'rows'.
+
+        Raises:
+            ValueError: If the chunk format is unknown.
+        """
+        super().__init__(
+            monitor=monitor,
+            is_producer=False,
+        )
+        if chunk_format not in ('rows', 'columnar'):
+            raise ValueError(f"Invalid chunk format {chunk_format}. Use 'rows' or 'columnar'.")
+        self._output_monitor = output_monitor
+        self._transform = transform
+        self._table_manager = table_manager
+        self._table_target = table_target
+        self._chunk_format = chunk_format
+        self._published = False
+
+    @property
+    def role(self) -> str:
+        return 'transform'
+
+    def _publish(self, columns: list[str]):
+        if self._table_manager is not None and self._table_target:
+            self._output_monitor.set_insert_query(
+                self._table_manager.build_insert_query(table_name=self._table_target, columns=columns)
+            )
+        self._output_monitor.set_columns(columns)
+        self._published = True
+
+    def _apply(self, data: object, columns: list[str]) -> object:
+        """
+        Transform one chunk through a DataFrame and convert the result back to the output chunk format.
+
+        The columns of the first transformed chunk are published to the output monitor before it is written.
+        """
+        if not isinstance(data, _ColumnarChunk):
+            data = _ColumnarChunk.from_rows(data, columns)
+        frame = self._transform.apply(data.to_frame())
+        if not self._published:
+            self._publish([str(c) for c in frame.columns])
+        chunk = _ColumnarChunk.from_frame(frame)
+        if self._chunk_format == 'rows':
+            return chunk.to_rows()
+
+        return chunk
+
+    def _publish_empty(self, columns: list[str]):
+        """
+        Publish the output columns when no chunk went through this worker, so the consumers waiting for them are released. Nothing is loaded, so the input columns stand in when the transform cannot run on an empty chunk.
+        """
+        try:
+            output_columns = self._transform.output_columns(columns)
+        except Exception:
+            output_columns = columns
+        self._publish(output_columns)
+
+    def run(self):
+        """
+        Transform chunks until the input stream ends, publishing the transformed columns to the output monitor with the first chunk.
+
+        Chunks filtered down to no rows are dropped. Any error stops both monitors and is re-raised.
+        """
+        self._published = False
+        try:
+            try:
+                columns = list(self._monitor.get_columns() or [])
+                while not self._stop_event.is_set():
+                    data = self._monitor.read()
+                    if data is None:
+                        break
+                    if not len(data):
+                        continue
+                    with self._timer('transform'):
+                        chunk = self._apply(data, columns)
+                    if not len(chunk):
+                        continue
+                    self._record_chunk(chunk)
+                    self._output_monitor.write(chunk)
+                if not self._published and not self._stop_event.is_set():
+                    self._publish_empty(columns)
+            except Exception as e:
+                self.stop_all_workers(e)
+                raise Exception(f"Failed transforming chunks: {e}") from e
+        finally:
+            self._output_monitor.producer_end_process()
+            self._monitor.signal_end_process()
@@ -0,0 +1,42 @@
+import json
+
+from src.cli.runner import main
+
+
+def _write_spec(tmp_path, **overrides):
+    spec = {
+        'source': {'conn_id': 'dbdw', 'table': 'orders'},
+        'target': {'conn_id': 'dw', 'table': 'orders_copy'},
+        **overrides
+    }
+    path = tmp_path / 'orders.json'
+    path.write_text(json.dumps(spec))
+    return str(path)
+
+
+def test_validate_accepts_a_valid_spec(tmp_path, capsys):
+    path = _write_spec(tmp_path, load_strategy='copy_binary', tuning={'chunk_format': 'columnar'})
+
+    assert main(['validate', path]) == 0
+    assert '1 valid job specs' in capsys.readouterr().out
+
+
+def test_validate_rejects_an_unknown_load_strategy(tmp_path, capsys):
+    path = _write_spec(tmp_path, load_strategy='copy_bianry')
+
+    assert main(['validate', path]) == 2
+    assert 'unknown load_strategy copy_bianry' in capsys.readouterr().err
+
+
+def test_validate_rejects_passthrough_for_a_query(tmp_path, capsys):
+    path = _write_spec(tmp_path, source={'conn_id': 'dbdw', 'query': 'SELECT 1'}, load_strategy='passthrough_binary')
+
+    assert main(['validate', path]) == 2
+    assert 'unknown load_strategy passthrough_binary' in capsys.readouterr().err
+
+
+def test_validate_rejects_an_unknown_chunk_format(tmp_path, capsys):
+    path = _write_spec(tmp_path, tuning={'chunk_format': 'column'})
+
+    assert main(['validate', path]) == 2
+    assert 'unknown tuning.chunk_format column' in capsys.readouterr().err
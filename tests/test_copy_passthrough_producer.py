@@ -0,0 +1,65 @@
+import struct
+from sqlalchemy import text
+
+from src.monitors.monitor import Monitor
+from src.workers.copy_passthrough_producer import CopyPassthroughProducer
+from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread
+
+
+_BINARY_HEADER = b'PGCOPY\n\xff\r\n\x00' + struct.pack('!ii', 0, 0)
+_BINARY_TRAILER = struct.pack('!h', -1)
+
+
+def _producer(table_manager, copy_format='binary'):
+    monitor = Monitor(10)
+    producer = CopyPassthroughProducer(
+        monitor=monitor,
+        engine=None,
+        query='SELECT 1',
+        columns=['id'],
+        chunksize=100,
+        table_manager=table_manager,
+        copy_format=copy_format
+    )
+    return monitor, producer
+
+
+def test_empty_binary_copy_writes_no_block(table_manager):
+    monitor, producer = _producer(table_manager)
+
+    producer._on_row(_BINARY_HEADER + _BINARY_TRAILER)
+    producer._flush()
+
+    assert monitor.stats()['rows_written'] == 0
+
+
+def test_binary_copy_drops_header_and_trailer(table_manager):
+    monitor, producer = _producer(table_manager)
+    row = struct.pack('!hii', 1, 4, 7)
+
+    producer._on_row(_BINARY_HEADER + row)
+    producer._on_row(row)
+    producer._on_row(_BINARY_TRAILER)
+    producer._flush()
+
+    assert monitor.stats()['rows_written'] == 2
+    assert monitor.read().payload.endswith(row + row + _BINARY_TRAILER)
+
+
+def test_passthrough_copy_of_an_empty_table(pg_engine, table_name, table_manager, log_utils):
+    with pg_engine.begin() as con:
+        con.execute(text(f'CREATE TABLE {table_name} (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f'CREATE TABLE {table_name}_target (id integer PRIMARY KEY, payload text)'))
+
+    StageCopyTableMultiThread(
+        table_name_source=table_name,
+        table_name_target=f'{table_name}_target',
+        conn_input=pg_engine,
+        conn_output=pg_engine,
+        log_utils=log_utils,
+        table_manager=table_manager,
+        load_strategy='passthrough_binary'
+    ).run()
+
+    with pg_engine.connect() as con:
+        assert con.execute(text(f'SELECT count(*) FROM {table_name}_target')).scalar() == 0
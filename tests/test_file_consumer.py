@@ -0,0 +1,30 @@
+import pytest
+
+from src.monitors.monitor import Monitor
+from src.workers.file_consumer import FileConsumer
+
+
+def _write(directory, chunks, columns, **kwargs):
+    monitor = Monitor(10)
+    consumer = FileConsumer(monitor, str(directory), file_format='parquet', **kwargs)
+    monitor.subscribe(consumer)
+    monitor.register_producer()
+    monitor.set_columns(columns)
+    for chunk in chunks:
+        monitor.write(chunk)
+    monitor.producer_end_process()
+    monitor.start()
+    monitor.wait_for_completion()
+
+    return consumer.files_written
+
+
+def test_parquet_column_null_in_the_first_chunk_gets_the_type_of_later_values(tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+
+    files = _write(tmp_path, [[(1, None), (2, None)], [(3, 'x'), (4, None)], [(5, 'y')]], ['id', 'maybe'])
+
+    tables = [pq.read_table(path) for path in files]
+    assert [str(t.schema.field('maybe').type) for t in tables] == ['null', 'string']
+    assert sum(t.num_rows for t in tables) == 5
+    assert tables[1].column('maybe').to_pylist() == ['x', None, 'y']
@@ -0,0 +1,50 @@
+from sqlalchemy import text
+
+from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread
+
+
+def _create_tables(engine, name, rows):
+    with engine.begin() as con:
+        con.execute(text(f'CREATE TABLE {name} (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f'CREATE TABLE {name}_target (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f"INSERT INTO {name} SELECT g, 'row ' || g FROM generate_series(1, {rows}) g"))
+
+
+def _target_rows(engine, name):
+    with engine.connect() as con:
+        return con.execute(text(f'SELECT count(*), count(DISTINCT id) FROM {name}_target')).one()
+
+
+def test_copy_with_two_producers_imports_the_snapshot(pg_engine, table_name, table_manager, log_utils):
+    _create_tables(pg_engine, table_name, 5000)
+
+    StageCopyTableMultiThread(
+        table_name_source=table_name,
+        table_name_target=f'{table_name}_target',
+        conn_input=pg_engine,
+        conn_output=pg_engine,
+        log_utils=log_utils,
+        table_manager=table_manager,
+        producers=2,
+        split_column='id',
+        chunksize=500
+    ).run()
+
+    assert tuple(_target_rows(pg_engine, table_name)) == (5000, 5000)
+
+
+def test_copy_with_two_producers_by_ctid(pg_engine, table_name, table_manager, log_utils):
+    _create_tables(pg_engine, table_name, 5000)
+
+    StageCopyTableMultiThread(
+        table_name_source=table_name,
+        table_name_target=f'{table_name}_target',
+        conn_input=pg_engine,
+        conn_output=pg_engine,
+        log_utils=log_utils,
+        table_manager=table_manager,
+        producers=2,
+        chunksize=500
+    ).run()
+
+    assert tuple(_target_rows(pg_engine, table_name)) == (5000, 5000)
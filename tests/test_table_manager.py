@@ -0,0 +1,7 @@
+from src.utils.table.table_manager import TableManager
+
+
+def test_drop_duplicate_keys_keeps_the_last_row_of_each_key():
+    rows = [(1, 'a', 'x'), (2, 'a', 'y'), (1, 'a', 'z'), (1, 'b', 'w')]
+
+    assert TableManager().drop_duplicate_keys(rows, [0, 1]) == [(1, 'a', 'z'), (2, 'a', 'y'), (1, 'b', 'w')]
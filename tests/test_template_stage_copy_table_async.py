@@ -0,0 +1,60 @@
+import asyncio
+from sqlalchemy import text
+
+from src.templates.template_stage_copy_table_async import StageCopyTableAsync
+
+
+def _create_tables(engine, name):
+    with engine.begin() as con:
+        con.execute(text(f'CREATE TABLE {name} (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f'CREATE TABLE {name}_target (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f"INSERT INTO {name} SELECT g, 'new ' || g FROM generate_series(1, 100) g"))
+        con.execute(text(f"INSERT INTO {name}_target VALUES (1, 'old 1'), (1000, 'old 1000')"))
+
+
+def _stage(engine, name, table_manager, log_utils, **kwargs):
+    return StageCopyTableAsync(
+        table_name_source=name,
+        table_name_target=f'{name}_target',
+        conn_input=engine,
+        conn_output=engine,
+        log_utils=log_utils,
+        table_manager=table_manager,
+        chunksize=30,
+        **kwargs
+    )
+
+
+def test_upsert_merges_into_the_target(pg_engine, table_name, table_manager, log_utils):
+    _create_tables(pg_engine, table_name)
+
+    asyncio.run(_stage(pg_engine, table_name, table_manager, log_utils, load_strategy='upsert', conflict_columns=['id']).run())
+
+    with pg_engine.connect() as con:
+        rows = dict(con.execute(text(f'SELECT id, payload FROM {table_name}_target')).all())
+    assert len(rows) == 101
+    assert rows[1] == 'new 1'
+    assert rows[1000] == 'old 1000'
+
+
+def test_insert_without_truncate_keeps_the_target(pg_engine, table_name, table_manager, log_utils):
+    _create_tables(pg_engine, table_name)
+    with pg_engine.begin() as con:
+        con.execute(text(f'DELETE FROM {table_name}_target WHERE id = 1'))
+
+    asyncio.run(_stage(pg_engine, table_name, table_manager, log_utils, truncate=False).run())
+
+    with pg_engine.connect() as con:
+        assert con.execute(text(f'SELECT count(*) FROM {table_name}_target')).scalar() == 101
+
+
+def test_upsert_of_a_chunk_with_repeated_keys(pg_engine, table_name, table_manager, log_utils):
+    with pg_engine.begin() as con:
+        con.execute(text(f'CREATE TABLE {table_name} (id integer, payload text)'))
+        con.execute(text(f'CREATE TABLE {table_name}_target (id integer PRIMARY KEY, payload text)'))
+        con.execute(text(f"INSERT INTO {table_name} SELECT g % 10, 'row ' || g FROM generate_series(1, 100) g"))
+
+    asyncio.run(_stage(pg_engine, table_name, table_manager, log_utils, load_strategy='upsert', conflict_columns=['id']).run())
+
+    with pg_engine.connect() as con:
+        assert con.execute(text(f'SELECT count(*) FROM {table_name}_target')).scalar() == 10
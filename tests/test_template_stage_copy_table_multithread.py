@@ -0,0 +1,33 @@
+import json
+from sqlalchemy import text
+
+from src.templates.template_stage_copy_table_multithread import StageCopyTableMultiThread
+from src.utils.metrics.metrics_sinks import JsonSummarySink
+
+
+def test_partitioned_copy_reads_one_snapshot_and_reports_metrics(pg_engine, table_name, table_manager, log_utils, tmp_path):
+    with pg_engine.begin() as con:
+        for name in (table_name, f'{table_name}_target'):
+            con.execute(text(f'CREATE TABLE {name} (id integer, payload text) PARTITION BY RANGE (id)'))
+            con.execute(text(f'CREATE TABLE {name}_p0 PARTITION OF {name} FOR VALUES FROM (0) TO (500)'))
+            con.execute(text(f'CREATE TABLE {name}_p1 PARTITION OF {name} FOR VALUES FROM (500) TO (1000)'))
+        con.execute(text(f"INSERT INTO {table_name} SELECT g, 'row ' || g FROM generate_series(0, 999) g"))
+    summary_path = tmp_path / 'metrics.json'
+
+    StageCopyTableMultiThread(
+        table_name_source=table_name,
+        table_name_target=f'{table_name}_target',
+        conn_input=pg_engine,
+        conn_output=pg_engine,
+        log_utils=log_utils,
+        table_manager=table_manager,
+        partitioned=True,
+        producers=2,
+        split_column='id',
+        metrics_sinks=[JsonSummarySink(str(summary_path))]
+    ).run()
+
+    with pg_engine.connect() as con:
+        assert con.execute(text(f'SELECT count(*) FROM {table_name}_target_p1')).scalar() == 500
+    summary = json.loads(summary_path.read_text())
+    assert summary['roles']['consumer']['rows'] == 1000